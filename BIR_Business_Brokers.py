@@ -1,96 +1,171 @@
 import pandas as pd
 import logging
 import re
-import time
 from typing import Dict, Any, List
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from html_parser import container, make_soup
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import NoSuchElementException
+import browser_pool
+import dom_batch
+import waits
+from rate_limit import throttle
+from urllib.parse import urlsplit, urlunsplit
+import financials
+import pagination
+import parse_cache
 
 # ---------------------------------------------------------------------------
 # Logging Setup
 # ---------------------------------------------------------------------------
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
 
+# ---------------------------------------------------------------------------
+# Helper Function: Split a Listing's Text into Fields
+# ---------------------------------------------------------------------------
+LOCATION = re.compile(r'Location:\s*(.*?)(?:\n|$)', re.IGNORECASE)
+FIELD_LINES = re.compile(r'(Monthly Sales|Net Profit|Asking Price|Location):.*?(?:\n|$)', re.IGNORECASE)
+
+
+def extract_fields(text: str) -> Dict[str, str]:
+    fields = {
+        'Monthly Sales': '',
+        'Net Profit': '',
+        'Asking Price': '',
+        'Location': '',
+        'Description': ''
+    }
+
+    # Each figure is the rest of its "Label:" line
+    figures = financials.extract(text, "line")
+    fields['Monthly Sales'] = figures.get('monthly_sales', '')
+    fields['Net Profit'] = figures.get('net_profit', '')
+    fields['Asking Price'] = figures.get('asking_price', '')
+
+    location = LOCATION.search(text)
+    if location: fields['Location'] = location.group(1).strip()
+
+    cleaned = FIELD_LINES.sub('', text)
+    fields['Description'] = cleaned.strip()
+
+    return fields
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Parse One Directory Page
+# ---------------------------------------------------------------------------
+# Directory page subtrees the parser reads
+LISTING_CONTAINERS = container("div", "epl-property-blog-entry-wrapper")
+
+
+def parse_listing_page(config: Dict[str, Any], html) -> List[Dict[str, str]]:
+    soup = make_soup(config, html, only=LISTING_CONTAINERS)
+    listings = soup.find_all('div', class_='epl-property-blog-entry-wrapper')
+    logging.info("Found %d listings on this page", len(listings))
+
+    posts = []
+    for listing in listings:
+        title_tag = listing.find('h3', class_='entry-title')
+        title = title_tag.get_text(strip=True) if title_tag else ''
+
+        desc_tag = listing.find('div', class_='epl-excerpt-content')
+        full_text = desc_tag.get_text(separator='\n', strip=True) if desc_tag else ''
+        fields = extract_fields(full_text)
+
+        posts.append({
+            "listing_id": "N/A",
+            "href": "N/A",
+            "title": title,
+            "price_box": fields['Asking Price'],
+            "pub_date": "",
+            "description": fields['Description'],
+            "location": fields['Location'],
+            "business_type": "N/A",
+            "revenue": fields['Monthly Sales'],
+            "ebitda": fields['Net Profit'],
+            "contact_name": config.get('contact_name', ''),
+            "contact_number": config.get('contact_number', '')
+        })
+    return posts
+
+
 # ---------------------------------------------------------------------------
 # Helper Function: Extract Listings from the Directory Page
 # ---------------------------------------------------------------------------
 def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
-    options = Options()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-gpu')
+    # The directory is rendered server-side, so its pages can be fetched over
+    # HTTP all at once; the browser is only needed if that yields nothing.
+    posts = get_list_links_http(config)
+    if posts:
+        logging.info("Extracted total %d listings.", len(posts))
+        return posts
+    logging.info("No listings fetched over HTTP; falling back to the browser.")
+    return get_list_links_browser(config)
 
-    driver = webdriver.Chrome(service=Service(), options=options)
-    driver.get(config['listing_url'])
 
-    posts = []
+MAX_PAGES = 50
 
-    def extract_fields(text: str) -> Dict[str, str]:
-        fields = {
-            'Monthly Sales': '',
-            'Net Profit': '',
-            'Asking Price': '',
-            'Location': '',
-            'Description': ''
-        }
-
-        sales = re.search(r'Monthly Sales:\s*(.*?)(?:\n|$)', text, re.IGNORECASE)
-        profit = re.search(r'Net Profit:\s*(.*?)(?:\n|$)', text, re.IGNORECASE)
-        price = re.search(r'Asking Price:\s*(.*?)(?:\n|$)', text, re.IGNORECASE)
-        location = re.search(r'Location:\s*(.*?)(?:\n|$)', text, re.IGNORECASE)
-
-        if sales: fields['Monthly Sales'] = sales.group(1).strip()
-        if profit: fields['Net Profit'] = profit.group(1).strip()
-        if price: fields['Asking Price'] = price.group(1).strip()
-        if location: fields['Location'] = location.group(1).strip()
-
-        cleaned = re.sub(r'(Monthly Sales|Net Profit|Asking Price|Location):.*?(?:\n|$)', '', text, flags=re.IGNORECASE)
-        fields['Description'] = cleaned.strip()
-
-        return fields
-
-    while True:
-        time.sleep(2)
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        listings = soup.find_all('div', class_='epl-property-blog-entry-wrapper')
-        logging.info("Found %d listings on this page", len(listings))
-
-        for listing in listings:
-            title_tag = listing.find('h3', class_='entry-title')
-            title = title_tag.get_text(strip=True) if title_tag else ''
-
-            desc_tag = listing.find('div', class_='epl-excerpt-content')
-            full_text = desc_tag.get_text(separator='\n', strip=True) if desc_tag else ''
-            fields = extract_fields(full_text)
-
-            posts.append({
-                "listing_id": "N/A",
-                "href": "N/A",
-                "title": title,
-                "price_box": fields['Asking Price'],
-                "pub_date": "",
-                "description": fields['Description'],
-                "location": fields['Location'],
-                "business_type": "N/A",
-                "revenue": fields['Monthly Sales'],
-                "ebitda": fields['Net Profit'],
-                "contact_name": config.get('contact_name', ''),
-                "contact_number": config.get('contact_number', '')
-            })
-
-        try:
-            next_btn = driver.find_element(By.LINK_TEXT, 'Next Page »')
-            driver.execute_script("arguments[0].scrollIntoView();", next_btn)
-            time.sleep(1)
-            next_btn.click()
-        except NoSuchElementException:
+
+def get_list_links_http(config: Dict[str, Any]) -> List[Dict[str, str]]:
+    listing_url = config['listing_url']
+    # WordPress answers /page/N/ past the end with 200 and the last cards again,
+    # so the page count is capped and a repeated page ends the directory too
+    max_pages = config.get("max_pages") or MAX_PAGES
+
+    def page_url(page: int) -> str:
+        if page == 1:
+            return listing_url
+        # /page/N/ goes on the path; the ?pagination_id=... query stays
+        parts = urlsplit(listing_url)
+        return urlunsplit(parts._replace(path=parts.path.rstrip('/') + f'/page/{page}/'))
+
+    posts = []
+    previous = None
+    pages = pagination.iter_pages(config, page_url, pagination.PAGE_LINK_PATTERNS["path"],
+                                  max_pages=max_pages, timeout=30)
+    for page, url, response in pages:
+        if isinstance(response, BaseException) or response.status_code != 200:
+            logging.info("Directory page %d unavailable (%s); stopping.", page,
+                         response if isinstance(response, BaseException) else response.status_code)
             break
+        page_posts = parse_cache.cached_parse(config, url, response.content,
+                                              lambda: parse_listing_page(config, response))
+        if not page_posts:
+            break
+        # Cards carry no link of their own, so a page is identified by its cards' text
+        signature = [(p["title"], p["price_box"], p["description"]) for p in page_posts]
+        if signature == previous:
+            logging.info("Directory page %d repeats page %d; stopping.", page, page - 1)
+            break
+        previous = signature
+        posts.extend(page_posts)
+    pages.close()
+    return posts
+
+
+def get_list_links_browser(config: Dict[str, Any]) -> List[Dict[str, str]]:
+    driver = browser_pool.get_driver(config)
+    try:
+        throttle(config, config['listing_url'])
+        driver.get(config['listing_url'])
+
+        posts = []
+
+        while True:
+            waits.network_idle(config, driver)
+            # Only the listing cards cross the wire, not the whole document
+            posts.extend(parse_listing_page(config, dom_batch.outer_html(driver, "div.epl-property-blog-entry-wrapper")))
+
+            try:
+                next_btn = driver.find_element(By.LINK_TEXT, 'Next Page »')
+                driver.execute_script("arguments[0].scrollIntoView();", next_btn)
+                next_btn.click()
+                # The old page's button goes stale once the next page replaces it
+                waits.stale(config, driver, next_btn, name="next_page")
+            except NoSuchElementException:
+                break
 
-    driver.quit()
+    finally:
+        browser_pool.release(config, driver)
     logging.info("Extracted total %d listings.", len(posts))
     return posts
 
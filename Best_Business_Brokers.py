@@ -287,13 +287,14 @@
 
 
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import container, make_soup
 from typing import Dict, Any, List
+from history import known_links
+import pagination
+import parse_cache
 from urllib.parse import urljoin
-import time
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -313,149 +314,58 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history_df = config.get("history", pd.DataFrame())
     max_pages = config.get("max_pages", None)
 
     # Existing listing URLs (to avoid duplicates)
-    existing_urls = set(history_df.get("Link to Deal", []))
+    existing_urls = known_links(config)
     posts: List[Dict[str, str]] = []
     seen_listing_ids = set()
     
-    page = 1
     consecutive_empty_pages = 0
 
-    while True:
-        if max_pages and page > max_pages:
-            break
-            
-        # Construct URL for current page
-        if page == 1:
-            url = listing_url
-        else:
-            url = f"{listing_url}?wpv_paged={page}"
-        
+    def page_url(page: int) -> str:
+        return listing_url if page == 1 else f"{listing_url}?wpv_paged={page}"
+
+    # Once page 1's pager gives the page count, the rest are fetched concurrently
+    pages = pagination.iter_pages(config, page_url, pagination.PAGE_LINK_PATTERNS["wpv_paged"],
+                                  max_pages=max_pages, headers=headers, timeout=30)
+    for page, url, response in pages:
         logging.info("Scraping page %d: %s", page, url)
 
-        # Fetch the HTML page
+        # Check the fetched HTML page
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            if isinstance(response, BaseException):
+                raise response
             response.raise_for_status()
         except Exception as e:
             logging.error("Failed to fetch listing directory page %d: %s", page, e)
             consecutive_empty_pages += 1
             if consecutive_empty_pages >= 2:
                 break
-            page += 1
             continue
 
-        # Parse the page with BeautifulSoup
-        soup = BeautifulSoup(response.text, "html.parser")
-        listing_cards = soup.find_all("div", class_="listing-box")
-        logging.info("Found %d listing cards on page %d", len(listing_cards), page)
+        # Unchanged page bytes reuse last run's cards instead of re-parsing them
+        cards = parse_cache.cached_parse(config, url, response.content,
+                                         lambda: parse_listing_page(config, url, response))
 
         page_listings = []
+        for card in cards:
+            # Check for duplicates
+            identifier = card["listing_id"] if card["listing_id"] != "N/A" else card["href"]
+            if identifier and identifier in seen_listing_ids:
+                logging.debug("Skipping duplicate listing: %s", card["title"])
+                continue
 
-        # Loop over each listing card
-        for post in listing_cards:
-            try:
-                # Initialize default values
-                listing_id = "N/A"
-                title = "N/A"
-                full_url = None
-                price = "N/A"
-                price_numeric = None
-                industry = "N/A"
-                location = "N/A"
-                total_sales = "N/A"
-                status = "Available"
-                description = "N/A"
-                image_url = "N/A"
-
-                # Extract title and link
-                title_element = post.find("div", class_="listing-title")
-                if title_element:
-                    title_link = title_element.find("a")
-                    if title_link:
-                        title = _clean_text(title_link.get_text())
-                        full_url = urljoin(config["base_url"], title_link.get("href", ""))
-
-                # Extract price
-                price_element = post.find("span", class_="price-description-value")
-                if price_element:
-                    price = _clean_text(price_element.get_text())
-                    price_numeric = _extract_price(price)
-
-                # Extract business details
-                description_elements = post.find_all("div")
-                for element in description_elements:
-                    text = element.get_text(strip=True)
-                    if "Industry:" in text:
-                        industry_span = element.find("span", class_="description-value")
-                        if industry_span:
-                            industry = _clean_text(industry_span.get_text())
-                    elif "Location:" in text:
-                        location_span = element.find("span", class_="description-value")
-                        if location_span:
-                            location = _clean_text(location_span.get_text())
-                    elif "Listing ID:" in text:
-                        id_span = element.find("span", class_="description-value")
-                        if id_span:
-                            listing_id = _clean_text(id_span.get_text())
-                    elif "Total Sales:" in text:
-                        sales_span = element.find("span", class_="description-value")
-                        if sales_span:
-                            total_sales = _clean_text(sales_span.get_text())
-
-                # Extract image URL
-                image_element = post.find("img")
-                if image_element:
-                    img_src = image_element.get("data-src") or image_element.get("src")
-                    if img_src and not img_src.startswith("data:"):
-                        image_url = urljoin(config["base_url"], img_src)
-
-                # Extract description/excerpt
-                excerpt_element = post.find_next_sibling("div", class_="listing-excerpt")
-                if excerpt_element:
-                    description = _clean_text(excerpt_element.get_text())
-
-                # Extract status
-                status_elements = post.find_all("div", class_=["available-button", "new-button"])
-                if status_elements:
-                    status = _clean_text(status_elements[0].get_text())
-
-                # Check for duplicates
-                identifier = listing_id if listing_id != "N/A" else full_url
-                if identifier and identifier in seen_listing_ids:
-                    logging.debug("Skipping duplicate listing: %s", title)
-                    continue
-                
-                if identifier:
-                    seen_listing_ids.add(identifier)
-
-                # Skip if URL already exists in history
-                if full_url and full_url in existing_urls:
-                    logging.debug("Skipping existing listing: %s", title)
-                    continue
-
-                # Append the extracted data to the list
-                page_listings.append({
-                    "listing_id": listing_id,
-                    "href": full_url,
-                    "title": title,
-                    "price": price,
-                    "price_numeric": price_numeric,
-                    "industry": industry,
-                    "location": location,
-                    "total_sales": total_sales,
-                    "status": status,
-                    "description": description,
-                    "image_url": image_url,
-                })
-
-            except Exception as e:
-                logging.warning("Error extracting listing: %s", e)
+            if identifier:
+                seen_listing_ids.add(identifier)
+
+            # Skip if URL already exists in history
+            if card["href"] and card["href"] in existing_urls:
+                logging.debug("Skipping existing listing: %s", card["title"])
                 continue
 
+            page_listings.append(card)
+
         # Check if we found any listings on this page
         if not page_listings:
             consecutive_empty_pages += 1
@@ -471,14 +381,123 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
             logging.info("Added %d new listings from page %d", len(page_listings), page)
 
         logging.info("Total unique listings collected so far: %d", len(posts))
-        
-        page += 1
-        time.sleep(2)  # Be respectful to the server
 
+    pages.close()
     logging.info("Extracted %d total listings from all pages.", len(posts))
     return posts
 
 
+# ---------------------------------------------------------------------------
+# Helper Function: Parse One Directory Page
+# ---------------------------------------------------------------------------
+# Directory page subtrees the parser reads; each card's excerpt is a sibling div
+LISTING_CONTAINERS = container("div", "listing-box", "listing-excerpt")
+
+
+def parse_listing_page(config: Dict[str, Any], url: str, html) -> List[Dict[str, Any]]:
+    """
+    Extract the listing cards from one directory page's HTML.
+
+    Returns:
+        A list of dictionaries, one per card, before duplicate and history filtering.
+    """
+    # Parse only the cards and their excerpts, not the rest of the page
+    soup = make_soup(config, html, only=LISTING_CONTAINERS)
+    listing_cards = soup.find_all("div", class_="listing-box")
+    logging.info("Found %d listing cards on %s", len(listing_cards), url)
+
+    cards = []
+
+    # Loop over each listing card
+    for post in listing_cards:
+        try:
+            # Initialize default values
+            listing_id = "N/A"
+            title = "N/A"
+            full_url = None
+            price = "N/A"
+            price_numeric = None
+            industry = "N/A"
+            location = "N/A"
+            total_sales = "N/A"
+            status = "Available"
+            description = "N/A"
+            image_url = "N/A"
+
+            # Extract title and link
+            title_element = post.find("div", class_="listing-title")
+            if title_element:
+                title_link = title_element.find("a")
+                if title_link:
+                    title = _clean_text(title_link.get_text())
+                    full_url = urljoin(config["base_url"], title_link.get("href", ""))
+
+            # Extract price
+            price_element = post.find("span", class_="price-description-value")
+            if price_element:
+                price = _clean_text(price_element.get_text())
+                price_numeric = _extract_price(price)
+
+            # Extract business details
+            description_elements = post.find_all("div")
+            for element in description_elements:
+                text = element.get_text(strip=True)
+                if "Industry:" in text:
+                    industry_span = element.find("span", class_="description-value")
+                    if industry_span:
+                        industry = _clean_text(industry_span.get_text())
+                elif "Location:" in text:
+                    location_span = element.find("span", class_="description-value")
+                    if location_span:
+                        location = _clean_text(location_span.get_text())
+                elif "Listing ID:" in text:
+                    id_span = element.find("span", class_="description-value")
+                    if id_span:
+                        listing_id = _clean_text(id_span.get_text())
+                elif "Total Sales:" in text:
+                    sales_span = element.find("span", class_="description-value")
+                    if sales_span:
+                        total_sales = _clean_text(sales_span.get_text())
+
+            # Extract image URL
+            image_element = post.find("img")
+            if image_element:
+                img_src = image_element.get("data-src") or image_element.get("src")
+                if img_src and not img_src.startswith("data:"):
+                    image_url = urljoin(config["base_url"], img_src)
+
+            # Extract description/excerpt
+            excerpt_element = post.find_next_sibling("div", class_="listing-excerpt")
+            if excerpt_element:
+                description = _clean_text(excerpt_element.get_text())
+
+            # Extract status
+            status_elements = post.find_all("div", class_=["available-button", "new-button"])
+            if status_elements:
+                status = _clean_text(status_elements[0].get_text())
+
+            # Append the extracted data to the list
+            cards.append({
+                "listing_id": listing_id,
+                "href": full_url,
+                "title": title,
+                "price": price,
+                "price_numeric": price_numeric,
+                "industry": industry,
+                "location": location,
+                "total_sales": total_sales,
+                "status": status,
+                "description": description,
+                "image_url": image_url,
+            })
+
+        except Exception as e:
+            logging.warning("Error extracting listing: %s", e)
+            continue
+
+    return cards
+
+
 # ---------------------------------------------------------------------------
 # Helper Functions
 # ---------------------------------------------------------------------------
@@ -1,79 +1,99 @@
 import pandas as pd
 import logging
 from typing import Dict, Any, List
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+import api_discovery
+import browser_pool
+import dom_batch
+import waits
+from rate_limit import throttle
 
 # ---------------------------------------------------------------------------
 # Logging Setup
 # ---------------------------------------------------------------------------
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
 
+# Fields read off each "a.bl-jump-down" card; missing or empty fields read "N/A"
+CARD_FIELDS = {
+    "Title": dom_batch.field(css="div.bl-h3"),
+    "Location": dom_batch.field(css="div.bl-h5.bl-txt-dark-blue"),
+    "Tagline": dom_batch.field(xpath=".//span[@ng-bind='listing.actionPhrase']"),
+    "Price": dom_batch.field(css="div.bl-h3.sp-w-6-of-10"),
+    "Total Sales": dom_batch.field(xpath=".//div[contains(text(),'Total Sales')]/following-sibling::div"),
+    "Income": dom_batch.field(xpath=".//div[contains(text(),'Income')]/following-sibling::div"),
+    "Listing ID": dom_batch.field(xpath=".//span[contains(text(),'Listing #')]/following-sibling::span"),
+    "Tags": dom_batch.field(xpath=".//div[contains(@class,'sp-grid-item-grow')]"),
+}
+
+# Without these a JSON record cannot stand in for a card
+REQUIRED_FIELDS = ("Title", "Listing ID")
+
 
 # ---------------------------------------------------------------------------
 # Helper Function: Extract Listings with Selenium
 # ---------------------------------------------------------------------------
 def get_listings_with_selenium(config: Dict[str, Any]) -> List[Dict[str, str]]:
     url = config["listing_url"]
-    options = Options()
-    options.add_argument("--start-maximized")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    driver.get(url)
-    wait = WebDriverWait(driver, 20)
-    time.sleep(5)
-
-    # Try clicking "View More"
+    driver = browser_pool.get_driver(config)
     try:
-        view_more = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'View More')]")))
-        logging.info("Clicking 'View More' to load all listings...")
-        view_more.click()
-        time.sleep(5)
-    except Exception as e:
-        logging.warning("'View More' not found or already clicked: %s", e)
-
-    cards = driver.find_elements(By.CSS_SELECTOR, "a.bl-jump-down")
-    logging.info("Total listings found: %d", len(cards))
-
-    results = []
+        throttle(config, url)
+        driver.get(url)
+        wait = WebDriverWait(driver, 20)
+        card_locator = (By.CSS_SELECTOR, "a.bl-jump-down")
+        waits.present(config, driver, card_locator, name="listings")
 
-    def safe_text(card, by, value):
+        # Try clicking "View More"
         try:
-            element = card.find_element(by, value)
-            text = element.text.strip()
-            return text if text else "N/A"
-        except:
-            return "N/A"
-
-    for card in cards:
-        entry = {
-            "Title": safe_text(card, By.CSS_SELECTOR, "div.bl-h3"),
-            "Location": safe_text(card, By.CSS_SELECTOR, "div.bl-h5.bl-txt-dark-blue"),
-            "Tagline": safe_text(card, By.XPATH, ".//span[@ng-bind='listing.actionPhrase']"),
-            "Price": safe_text(card, By.CSS_SELECTOR, "div.bl-h3.sp-w-6-of-10"),
-            "Total Sales": safe_text(card, By.XPATH, ".//div[contains(text(),'Total Sales')]/following-sibling::div"),
-            "Income": safe_text(card, By.XPATH, ".//div[contains(text(),'Income')]/following-sibling::div"),
-            "Listing ID": safe_text(card, By.XPATH, ".//span[contains(text(),'Listing #')]/following-sibling::span"),
-            "Tags": safe_text(card, By.XPATH, ".//div[contains(@class,'sp-grid-item-grow')]")
-        }
-
-        if entry["Title"] != "N/A":
-            results.append(entry)
-
-    driver.quit()
+            view_more = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'View More')]")))
+            logging.info("Clicking 'View More' to load all listings...")
+            shown = len(driver.find_elements(*card_locator))
+            view_more.click()
+            waits.count_increase(config, driver, card_locator, shown, name="view_more")
+        except Exception as e:
+            logging.warning("'View More' not found or already clicked: %s", e)
+
+        # All cards' fields in one browser round trip
+        cards = dom_batch.extract(driver, "a.bl-jump-down", CARD_FIELDS, default="N/A")
+        logging.info("Total listings found: %d", len(cards))
+
+        results = [entry for entry in cards if entry["Title"] != "N/A"]
+
+        # The Angular app loads these from a JSON endpoint; remember it, and where
+        # each card field sits in it, for next run
+        api_discovery.discover(config, driver, [r["Title"] for r in results], cards=results)
+
+    finally:
+        browser_pool.release(config, driver)
     return results
 
 
+# ---------------------------------------------------------------------------
+# Helper Function: Listings from the site's JSON endpoint
+# ---------------------------------------------------------------------------
+def get_listings(config: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Listings over plain HTTP when a recipe is known, otherwise through the browser.
+
+    The JSON items are mapped to card fields with the field map traced at
+    discovery, so they read exactly like the cards (prices as "$1,250,000").
+    A recipe that cannot give every listing its title and Listing ID --
+    the only part of the master key that varies -- is not used.
+    """
+    items = api_discovery.fetch_items(config)
+    if items is not None:
+        results = api_discovery.map_items(config, items, list(CARD_FIELDS), required=REQUIRED_FIELDS)
+        if results is not None:
+            return results
+    return get_listings_with_selenium(config)
+
+
 # ---------------------------------------------------------------------------
 # Core Scraper Function
 # ---------------------------------------------------------------------------
 def scrape(config: Dict[str, Any]) -> pd.DataFrame:
-    posts = get_listings_with_selenium(config)
+    posts = get_listings(config)
     records = []
 
     for pdata in posts:
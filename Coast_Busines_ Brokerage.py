@@ -1,9 +1,10 @@
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
+import fetch_engine
+import parse_cache
 import time
 
 # Configure logging
@@ -24,19 +25,32 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history = config.get("history", pd.DataFrame())
-    sold_keywords = config.get("sold_keywords", ["sold", "under contract", "closed", "contingent"])
 
     try:
-        response = requests.get(listing_url, headers=headers, timeout=20)
+        response = fetch_engine.fetch(config, listing_url, headers=headers, timeout=20)
         response.raise_for_status()
         logger.info(f"Successfully fetched listing page: {response.status_code}")
     except Exception as e:
         logger.error("Failed to fetch listing page: %s", e)
         return []
 
-    existing_urls = set(history.get("Link to Deal", []).dropna()) if not history.empty else set()
-    soup = BeautifulSoup(response.text, "html.parser")
+    # Unchanged page bytes reuse last run's posts instead of re-parsing them
+    return parse_cache.cached_parse(config, listing_url, response.content,
+                                    lambda: parse_listing_page(config, response))
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Parse the Directory Page
+# ---------------------------------------------------------------------------
+def parse_listing_page(config: Dict[str, Any], html) -> List[Dict[str, str]]:
+    """
+    Extract the listings from the directory page's HTML.
+
+    Returns:
+        A list of dictionaries, each representing a listing.
+    """
+    sold_keywords = config.get("sold_keywords", ["sold", "under contract", "closed", "contingent"])
+    soup = make_soup(config, html)
     
     # Look for listing containers - these may vary, so we'll try multiple selectors
     listings = []
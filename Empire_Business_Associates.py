@@ -1,9 +1,11 @@
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
-from typing import Dict, Any, List
+from html_parser import make_soup
+from typing import Dict, Any, List, Optional
+import fetch_engine
+import financials
+from incremental import detail_due, log_skipped
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -23,22 +25,20 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history_df = config.get("history", pd.DataFrame())
 
     # Fetch the HTML page
     try:
-        response = requests.get(listing_url, headers=headers, timeout=20)
+        response = fetch_engine.fetch(config, listing_url, headers=headers, timeout=20)
         response.raise_for_status()
     except Exception as e:
         logging.error("Failed to fetch listing directory: %s", e)
         return []
 
-    # Existing listing URLs (to avoid duplicates)
-    existing_urls = set(history_df.get("Link to Deal", []))
     posts: List[Dict[str, str]] = []
+    skipped = 0
 
     # Parse the page with BeautifulSoup
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(config, response)
     
     # Get the main content area
     content_text = soup.get_text()
@@ -79,131 +79,123 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     
     logging.info("Found %d potential listing cards", len(listing_cards))
 
+    # Look for "Contact Now" or similar links in the original HTML; every card shares the first one
+    contact_links = soup.find_all("a", string=re.compile("Contact", re.IGNORECASE))
+    full_url = None
+
+    if contact_links:
+        # Use the first contact link found
+        link = contact_links[0]
+        href = link.get("href", "").strip()
+        if href:
+            if href.startswith("/"):
+                full_url = config["base_url"].rstrip("/") + href
+            elif href.startswith("http"):
+                full_url = href
+            else:
+                full_url = config["base_url"].rstrip("/") + "/" + href
+
     # Loop over each listing card
     for post in listing_cards:
-        # Initialize default values
-        ad_id = "N/A"
-        business_type = post.get('business_type', 'N/A')
-        description = post.get('description', 'N/A')
-        is_sold = post.get('is_sold', False)
-        price_match = None
-        revenue_match = None
-        ebitda_match = None
-        contact_name = "N/A"
-        contact_number = "N/A"
-        location = "Cleveland, OH"  # Default location based on the page
-        title = business_type
-
-        # Extract price information from description
-        price_patterns = [
-            r"Sales\s*\$\s*([\d,]+)",
-            r"Price\s*\$\s*([\d,]+)",
-            r"Asking\s*\$\s*([\d,]+)",
-        ]
-        
-        for pattern in price_patterns:
-            price_match = re.search(pattern, description, re.IGNORECASE)
-            if price_match:
-                break
-
-        # Extract revenue information
-        revenue_patterns = [
-            r"Revenue[:\s]*\$\s*([\d,]+)",
-            r"Annual\s*Revenue[:\s]*\$\s*([\d,]+)",
-            r"Gross\s*Revenue[:\s]*\$\s*([\d,]+)",
-        ]
-        for pattern in revenue_patterns:
-            revenue_match = re.search(pattern, description, re.IGNORECASE)
-            if revenue_match:
-                break
-
-        # Look for "Contact Now" or similar links in the original HTML
-        contact_links = soup.find_all("a", string=re.compile("Contact", re.IGNORECASE))
-        full_url = None
-        
-        if contact_links:
-            # Use the first contact link found
-            link = contact_links[0]
-            href = link.get("href", "").strip()
-            if href:
-                if href.startswith("/"):
-                    full_url = config["base_url"].rstrip("/") + href
-                elif href.startswith("http"):
-                    full_url = href
-                else:
-                    full_url = config["base_url"].rstrip("/") + "/" + href
-
-        # Skip if already processed
-        if full_url and full_url in existing_urls:
+        # Skip listings already in the master db (unless due a re-check)
+        if not detail_due(config, full_url):
+            skipped += 1
             continue
 
-        # Try to get more details if we have a contact URL
-        if full_url:
-            try:
-                detail_resp = requests.get(full_url, headers=headers, timeout=15)
-                detail_resp.raise_for_status()
-                detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-                detail_text = detail_soup.get_text()
-
-                # Extract contact information from detail page
-                contact_patterns = [
-                    r"Contact[:\s]*([^\n]+)",
-                    r"Broker[:\s]*([^\n]+)",
-                    r"Agent[:\s]*([^\n]+)",
-                ]
-                for pattern in contact_patterns:
-                    match = re.search(pattern, detail_text, re.IGNORECASE)
-                    if match:
-                        contact_name = match.group(1).strip()
-                        break
-
-                # Extract phone number
-                phone_match = re.search(r"\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}", detail_text)
-                if phone_match:
-                    contact_number = phone_match.group(0)
-
-                # Extract EBITDA/Cash Flow
-                ebitda_patterns = [
-                    r"EBITDA[:\s]*\$\s*([\d,]+)",
-                    r"Cash\s*Flow[:\s]*\$\s*([\d,]+)",
-                    r"Net\s*Income[:\s]*\$\s*([\d,]+)",
-                ]
-                for pattern in ebitda_patterns:
-                    ebitda_match = re.search(pattern, detail_text, re.IGNORECASE)
-                    if ebitda_match:
-                        break
-
-            except Exception as e:
-                logging.warning("Failed to fetch detail page for %s: %s", full_url, e)
-
-        # Format extracted values
-        price_formatted = f"${price_match.group(1)}" if price_match else "N/A"
-        revenue_formatted = f"${revenue_match.group(1)}" if revenue_match else "N/A"
-        ebitda_formatted = f"${ebitda_match.group(1)}" if ebitda_match else "N/A"
-
-        # Append the extracted data to the list
-        posts.append(
-            {
-                "listing_id": ad_id,
-                "href": full_url if full_url else "N/A",
-                "title": title,
-                "price_box": price_formatted,
-                "pub_date": "",  # No date available on this page
-                "description": description,
-                "location": location,
-                "business_type": business_type,
-                "revenue": revenue_formatted,
-                "ebitda": ebitda_formatted,
-                "contact_name": contact_name,
-                "contact_number": contact_number,
-                "is_sold": is_sold,  # Add sold status flag
-            }
-        )
+        posts.append(parse_card(post, full_url))
 
+    # Detail pages are fetched and parsed concurrently; a URL shared by several cards is fetched once
+    detail_urls = list(dict.fromkeys(p["href"] for p in posts if p["href"] != "N/A"))
+    details = dict(zip(detail_urls, fetch_engine.fan_out(config, lambda url: fetch_detail(config, url), detail_urls)))
+    for card in posts:
+        detail = details.get(card["href"])
+        if isinstance(detail, BaseException):
+            logging.warning("Failed to fetch detail page for %s: %s", card["href"], detail)
+        elif detail:
+            card.update(detail)
+
+    log_skipped(config.get("broker", listing_url), skipped, len(listing_cards))
     logging.info("Extracted %d listings from page.", len(posts))
     return posts
 
 
+# ---------------------------------------------------------------------------
+# Helper Function: Extract One Listing Card
+# ---------------------------------------------------------------------------
+def parse_card(post: Dict[str, Any], full_url: Optional[str]) -> Dict[str, Any]:
+    """
+    Build a listing from one matched section of the directory text. Contact
+    details and EBITDA stay "N/A" until the detail page fills them in.
+    """
+    # Initialize default values
+    ad_id = "N/A"
+    business_type = post.get('business_type', 'N/A')
+    description = post.get('description', 'N/A')
+    is_sold = post.get('is_sold', False)
+    location = "Cleveland, OH"  # Default location based on the page
+    title = business_type
+
+    # Extract price and revenue from the description
+    figures = financials.extract(description)
+    price_formatted = financials.dollars(figures.get("asking_price"), "N/A")
+    revenue_formatted = financials.dollars(figures.get("revenue"), "N/A")
+
+    return {
+        "listing_id": ad_id,
+        "href": full_url if full_url else "N/A",
+        "title": title,
+        "price_box": price_formatted,
+        "pub_date": "",  # No date available on this page
+        "description": description,
+        "location": location,
+        "business_type": business_type,
+        "revenue": revenue_formatted,
+        "ebitda": "N/A",
+        "contact_name": "N/A",
+        "contact_number": "N/A",
+        "is_sold": is_sold,  # Add sold status flag
+    }
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Fetch and Parse One Detail Page
+# ---------------------------------------------------------------------------
+def fetch_detail(config: Dict[str, Any], full_url: str) -> Dict[str, str]:
+    """
+    Fetch a contact/detail page and extract contact details and EBITDA.
+    Runs on a pool thread; errors propagate to the caller.
+    """
+    detail_resp = fetch_engine.fetch(config, full_url, headers=config.get("headers", {}), timeout=15)
+    detail_resp.raise_for_status()
+    detail_soup = make_soup(config, detail_resp)
+    detail_text = detail_soup.get_text()
+    detail: Dict[str, str] = {}
+
+    # Extract contact information from detail page
+    contact_patterns = [
+        r"Contact[:\s]*([^\n]+)",
+        r"Broker[:\s]*([^\n]+)",
+        r"Agent[:\s]*([^\n]+)",
+    ]
+    for pattern in contact_patterns:
+        match = re.search(pattern, detail_text, re.IGNORECASE)
+        if match:
+            detail["contact_name"] = match.group(1).strip()
+            break
+
+    # Extract phone number
+    phone_match = re.search(r"\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}", detail_text)
+    if phone_match:
+        detail["contact_number"] = phone_match.group(0)
+
+    # Extract EBITDA, falling back to cash flow and then net income
+    figures = financials.extract(detail_text)
+    earnings = figures.get("ebitda") or figures.get("cash_flow") or figures.get("net_profit")
+    if earnings:
+        detail["ebitda"] = financials.dollars(earnings)
+    return detail
+
+
 # ---------------------------------------------------------------------------
 # Core Scraper Function
 # ---------------------------------------------------------------------------
@@ -166,19 +166,21 @@
 import pandas as pd
 import logging
 import re
-import time
 import html
 import json
-from typing import Dict, Any, List
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+from html_parser import make_soup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+import api_discovery
+import browser_pool
+import fetch_engine
+import waits
+from incremental import detail_due, log_skipped
+from rate_limit import throttle
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -196,31 +198,168 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     Returns:
         A list of dictionaries, each representing a listing.
     """
-    driver = config["driver"]
+    posts = get_list_links_http(config)
+    if posts is not None:
+        return posts
+
+    # A caller-supplied driver stays the caller's; otherwise borrow one from the pool
+    driver = config.get("driver")
+    if driver is not None:
+        return collect_listings(config, driver)
+    driver = browser_pool.get_driver(config)
+    try:
+        return collect_listings(config, driver)
+    finally:
+        browser_pool.release(config, driver)
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Parse a Listing Page
+# ---------------------------------------------------------------------------
+def parse_detail(config: Dict[str, Any], url: str, page_html) -> Dict[str, str]:
+    """
+    Extract a listing's fields from its detail page. The page is server-rendered
+    (the Vue ``:acf`` props are in the HTML), so a plain HTTP fetch works as well
+    as the browser.
+    """
+    sub_soup = make_soup(config, page_html)
+
+    data = {
+        "listing_id": "N/A",
+        "href": url,
+        "title": "N/A",
+        "description": "N/A",
+        "location": "N/A",
+        "business_type": "N/A",
+        "price_box": "N/A",
+        "revenue": "N/A",
+        "ebitda": "N/A",
+        "contact_name": "N/A",
+        "contact_number": "N/A",
+        "pub_date": "",
+    }
+
+    # Status from body
+    full_text = sub_soup.get_text().lower()
+    data["status_flag"] = "sold" if "sold" in full_text else "available"
+
+    # Title
+    meta_title = sub_soup.find("meta", property="og:title")
+    if meta_title:
+        data["title"] = meta_title.get("content", "N/A").split("|")[0].strip()
+
+    # Listing ID
+    vue_tags = sub_soup.find_all(lambda tag: tag.has_attr(":acf"))
+    for tag in vue_tags:
+        try:
+            acf_raw = html.unescape(tag[":acf"])
+            acf_json = json.loads(acf_raw)
+            data["listing_id"] = f"#{acf_json.get('listing_id', 'N/A')}"
+        except:
+            pass
+
+    # Location
+    for li in sub_soup.find_all("li"):
+        if "located in" in li.text.lower():
+            match = re.search(r"located in\s+(.+)", li.text, re.IGNORECASE)
+            if match:
+                data["location"] = match.group(1).strip()
+            break
+
+    # Revenue and SDE/EBITDA
+    for row in sub_soup.find_all("tr"):
+        cols = row.find_all("td")
+        if len(cols) >= 5:
+            if "revenue" in cols[0].text.lower():
+                data["revenue"] = cols[4].text.strip()
+            if "sde" in cols[0].text.lower():
+                data["ebitda"] = cols[4].text.strip()
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Listings without a Browser
+# ---------------------------------------------------------------------------
+def get_list_links_http(config: Dict[str, Any]) -> Optional[List[Dict[str, str]]]:
+    """
+    Listing URLs from the site's saved JSON endpoint and detail pages over plain
+    HTTP. Each item's link is read from where discovery traced the cards'
+    hrefs. Returns None when there is no working recipe yet, or when every
+    detail page failed, so the caller falls back to the browser.
+    """
+    items = api_discovery.fetch_items(config)
+    if items is None:
+        return None
+    links = api_discovery.map_items(config, items, ["Link"], required=("Link",))
+    if links is None:
+        return None
+
+    urls = []
+    for link in links:
+        if "/listings/" not in link["Link"]:
+            continue
+        full_url = config["base_url"].rstrip("/") + link["Link"]
+        if full_url not in urls:
+            urls.append(full_url)
+    if not urls:
+        logging.warning("The JSON endpoint's items carry no listing links; falling back to the browser")
+        return None
+    due = [u for u in urls if detail_due(config, u)]
+
+    def fetch_detail(url: str) -> Dict[str, str]:
+        response = fetch_engine.fetch(config, url)
+        response.raise_for_status()
+        return parse_detail(config, url, response)
+
+    posts = []
+    for url, result in zip(due, fetch_engine.fan_out(config, fetch_detail, due)):
+        if isinstance(result, BaseException):
+            logging.error("Failed to fetch listing %s: %s", url, result)
+            continue
+        posts.append(result)
+    if due and not posts:
+        logging.warning("Every listing page failed over HTTP; falling back to the browser")
+        return None
+
+    log_skipped(config.get("broker", config["listing_url"]), len(urls) - len(due), len(urls))
+    logging.info("Extracted %d listings", len(posts))
+    return posts
+
+
+def collect_listings(config: Dict[str, Any], driver) -> List[Dict[str, str]]:
     wait = WebDriverWait(driver, 10)
 
     # Load initial page
+    throttle(config, config["listing_url"])
     driver.get(config["listing_url"])
-    time.sleep(3)
+    cards = (By.CSS_SELECTOR, "a[href*='/listings/']")
+    waits.present(config, driver, cards, name="listings")
 
     # Click all 'Load More' buttons
     while True:
         try:
             load_more = wait.until(EC.presence_of_element_located((By.XPATH, "//button[contains(., 'Load More')]")))
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", load_more)
-            time.sleep(1)
+            shown = len(driver.find_elements(*cards))
             load_more.click()
             logging.info("Clicked 'Load More'")
-            time.sleep(3)
+            waits.count_increase(config, driver, cards, shown, name="load_more")
         except TimeoutException:
             logging.info("No more 'Load More' button.")
             break
 
     # Parse the fully loaded page
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = make_soup(config, driver.page_source)
     listing_cards = soup.select("a[href*='/listings/']")
+
+    # The Vue app loads these cards from a JSON endpoint; remember it, and
+    # which item key holds each card's link, for next run
+    hrefs = [tag.get("href", "") for tag in listing_cards]
+    api_discovery.discover(config, driver, hrefs, cards=[{"Link": urlsplit(href).path} for href in hrefs])
+
     visited = set()
     posts = []
+    skipped = 0
 
     for tag in listing_cards:
         href = tag.get("href")
@@ -228,64 +367,18 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
             full_url = href if href.startswith("http") else config["base_url"].rstrip("/") + href
             visited.add(full_url)
 
-            # Visit each listing
+            # Skip listings already in the master db (unless due a re-check)
+            if not detail_due(config, full_url):
+                skipped += 1
+                continue
+
+            # Visit each listing, paced by the per-host rate limit
+            throttle(config, full_url)
             driver.get(full_url)
-            time.sleep(2)
-            sub_soup = BeautifulSoup(driver.page_source, "html.parser")
-
-            data = {
-                "listing_id": "N/A",
-                "href": full_url,
-                "title": "N/A",
-                "description": "N/A",
-                "location": "N/A",
-                "business_type": "N/A",
-                "price_box": "N/A",
-                "revenue": "N/A",
-                "ebitda": "N/A",
-                "contact_name": "N/A",
-                "contact_number": "N/A",
-                "pub_date": "",
-            }
-
-            # Status from body
-            full_text = sub_soup.get_text().lower()
-            data["status_flag"] = "sold" if "sold" in full_text else "available"
-
-            # Title
-            meta_title = sub_soup.find("meta", property="og:title")
-            if meta_title:
-                data["title"] = meta_title.get("content", "N/A").split("|")[0].strip()
-
-            # Listing ID
-            vue_tags = sub_soup.find_all(lambda tag: tag.has_attr(":acf"))
-            for tag in vue_tags:
-                try:
-                    acf_raw = html.unescape(tag[":acf"])
-                    acf_json = json.loads(acf_raw)
-                    data["listing_id"] = f"#{acf_json.get('listing_id', 'N/A')}"
-                except:
-                    pass
-
-            # Location
-            for li in sub_soup.find_all("li"):
-                if "located in" in li.text.lower():
-                    match = re.search(r"located in\s+(.+)", li.text, re.IGNORECASE)
-                    if match:
-                        data["location"] = match.group(1).strip()
-                    break
-
-            # Revenue and SDE/EBITDA
-            for row in sub_soup.find_all("tr"):
-                cols = row.find_all("td")
-                if len(cols) >= 5:
-                    if "revenue" in cols[0].text.lower():
-                        data["revenue"] = cols[4].text.strip()
-                    if "sde" in cols[0].text.lower():
-                        data["ebitda"] = cols[4].text.strip()
-
-            posts.append(data)
+            waits.network_idle(config, driver, name="detail")
+            posts.append(parse_detail(config, full_url, driver.page_source))
 
+    log_skipped(config.get("broker", config["listing_url"]), skipped, len(visited))
     logging.info("Extracted %d listings", len(posts))
     return posts
 
@@ -298,7 +391,7 @@ def scrape(config: Dict[str, Any]) -> pd.DataFrame:
     Scrape listings using Selenium and return a structured DataFrame.
     """
     required_keys = [
-        "listing_url", "base_url", "driver", "broker",
+        "listing_url", "base_url", "broker",
         "phase", "contact_name", "contact_number", "headers", "history"
     ]
     missing = [k for k in required_keys if k not in config]
@@ -339,12 +432,6 @@ def scrape(config: Dict[str, Any]) -> pd.DataFrame:
 # Main Entry Point
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
-    # Setup Selenium driver
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
     default_config: Dict[str, Any] = {
         "listing_url": "https://exitconsultinggroup.com/listings/",
         "base_url": "https://exitconsultinggroup.com",
@@ -354,11 +441,9 @@ if __name__ == "__main__":
         "phase": "initial",
         "contact_name": "N/A",
         "contact_number": "N/A",
-        "driver": driver
     }
 
     df = scrape(default_config)
-    driver.quit()
 
     df.to_csv("exit_consulting_listings.csv", index=False)
     print("\n✅ Done! Saved to 'exit_consulting_listings.csv'")
@@ -142,14 +142,15 @@
 
 
 import pandas as pd
-import time
 import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import NoSuchElementException, ElementNotInteractableException
 from typing import Dict, Any, List
+from history import known_links
+import browser_pool
+import waits
+from rate_limit import throttle
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -187,9 +188,10 @@ def extract_detail_info(driver):
 # ---------------------------------------------------------------------------
 # Helper Function: Process all listings on current page - EXACT copy from code 1
 # ---------------------------------------------------------------------------
-def process_current_page(driver, all_data):
+def process_current_page(config, driver, all_data):
     """Process current page listings - EXACT copy from code 1"""
-    time.sleep(2)
+    listing_locator = (By.CSS_SELECTOR, ".job_listings .job_listing")
+    waits.present(config, driver, listing_locator, name="listings")
     listings = driver.find_elements(By.CSS_SELECTOR, ".job_listings .job_listing")
     total = len(listings)
 
@@ -213,7 +215,7 @@ def process_current_page(driver, all_data):
 
             print(f"[INFO] Clicking: {title} — {location}")
             ActionChains(driver).move_to_element(item).click().perform()
-            time.sleep(3)
+            waits.present(config, driver, (By.CSS_SELECTOR, ".job_description"), name="detail")
 
             # Extract info
             detail_data = extract_detail_info(driver)
@@ -226,30 +228,25 @@ def process_current_page(driver, all_data):
 
         # Return to listings page
         driver.back()
-        time.sleep(3)
 
         # Wait for listings to reappear before continuing
-        try:
-            driver.find_element(By.CSS_SELECTOR, ".job_listings .job_listing")
-        except:
-            print("[WARN] Listings not found after back. Waiting extra.")
-            time.sleep(3)
+        if not waits.present(config, driver, listing_locator, name="back"):
+            print("[WARN] Listings not found after back.")
 
 
 # ---------------------------------------------------------------------------
 # Helper Function: Paginate using the "→" button - EXACT copy from code 1
 # ---------------------------------------------------------------------------
-def go_through_all_pages(driver, all_data):
+def go_through_all_pages(config, driver, all_data):
     """Navigate through all pages - EXACT copy from code 1"""
     page = 1
     while True:
         print(f"[INFO] Scraping Page {page}")
-        process_current_page(driver, all_data)
+        process_current_page(config, driver, all_data)
 
         try:
             next_button = driver.find_element(By.XPATH, "//a[contains(text(),'→')]")
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-            time.sleep(1)
 
             if not next_button.is_displayed():
                 print("[INFO] → button not visible. Stopping.")
@@ -257,7 +254,7 @@ def go_through_all_pages(driver, all_data):
 
             next_button.click()
             page += 1
-            time.sleep(3)
+            waits.stale(config, driver, next_button, name="next_page")
 
         except NoSuchElementException:
             print("[INFO] No more pages.")
@@ -280,28 +277,24 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history_df = config.get("history", pd.DataFrame())
 
     # Existing listing URLs (to avoid duplicates)
-    existing_urls = set(history_df.get("Link to Deal", []))
+    existing_urls = known_links(config)
     
     # Setup ChromeDriver - EXACT copy from code 1
-    options = Options()
-    options.add_argument("--start-maximized")
-    # options.add_argument("--headless")
-    driver = webdriver.Chrome(options=options)
+    driver = browser_pool.get_driver(config)
     
     all_data = []  # This will store the raw data from code 1
     
     try:
+        throttle(config, listing_url)
         driver.get(listing_url)
-        time.sleep(3)
 
         # Run your exact code 1 logic
-        go_through_all_pages(driver, all_data)
+        go_through_all_pages(config, driver, all_data)
         
     finally:
-        driver.quit()
+        browser_pool.release(config, driver)
 
     print(f"[✅ DONE] Extracted {len(all_data)} listings")
 
@@ -1,7 +1,7 @@
 import pandas as pd
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
 import os
 
@@ -26,7 +26,7 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
             continue
 
         with open(file_path, "r", encoding="utf-8") as file:
-            soup = BeautifulSoup(file, "html.parser")
+            soup = make_soup(config, file)
             listings = soup.select("li.type-rent.col-md-12")
             logging.info("Found %d listings in %s", len(listings), file_path)
 
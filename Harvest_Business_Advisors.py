@@ -1,12 +1,14 @@
 import pandas as pd
 import requests
 import logging
-import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import time
+from selenium.webdriver.common.by import By
+import browser_pool
+import dom_batch
+import financials
+import waits
+from rate_limit import throttle
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -17,29 +19,23 @@ logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(m
 # Helper Function: Extract Listings from the Directory Page (Selenium-Based)
 # ---------------------------------------------------------------------------
 def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
-    options = Options()
-    options.headless = True
-    options.add_argument("--window-size=1920,1080")
-    driver = webdriver.Chrome(options=options)
+    driver = browser_pool.get_driver(config)
 
     try:
+        throttle(config, config["listing_url"])
         driver.get(config["listing_url"])
-        time.sleep(5)  # wait for initial load
+        waits.network_idle(config, driver)  # wait for initial load
 
-        # Infinite scroll to load all listings
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+        # Infinite scroll to load all listings, until a scroll brings no more cards
+        cards_locator = (By.CSS_SELECTOR, "div.gallery-item-common-info")
+        while waits.scroll_grew(config, driver, cards_locator):
+            pass
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        # Only the listing cards cross the wire, not the whole document
+        soup = make_soup(config, dom_batch.outer_html(driver, "div.gallery-item-common-info"))
 
     finally:
-        driver.quit()
+        browser_pool.release(config, driver)
 
     listings = []
     cards = soup.find_all("div", class_="gallery-item-common-info")
@@ -58,21 +54,20 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
             description = desc_tag.get_text(" ", strip=True) if desc_tag else "N/A"
 
             # Extract key financials
-            asking_price = re.search(r"Asking Price:\s*\$[\d,]+", description)
-            gross_revenue = re.search(r"Gross Revenue:\s*\$[\d,]+", description)
-            profit = re.search(r"(Adjusted Profit|Seller[’']?s Discretionary Earnings):\s*\$[\d,]+", description)
+            figures = financials.extract(description)
+            profit = figures.get("net_profit") or figures.get("sde")
 
             listings.append({
                 "listing_id": "N/A",
                 "href": full_url,
                 "title": title,
-                "price_box": asking_price.group().split(":")[1].strip() if asking_price else "N/A",
+                "price_box": financials.dollars(figures.get("asking_price"), "N/A"),
                 "pub_date": "",
                 "description": description,
                 "location": "N/A",
                 "business_type": "N/A",
-                "revenue": gross_revenue.group().split(":")[1].strip() if gross_revenue else "N/A",
-                "ebitda": profit.group().split(":")[1].strip() if profit else "N/A",
+                "revenue": financials.dollars(figures.get("revenue"), "N/A"),
+                "ebitda": financials.dollars(profit, "N/A"),
                 "contact_name": config.get("contact_name", ""),
                 "contact_number": config.get("contact_number", "")
             })
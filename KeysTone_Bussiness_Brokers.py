@@ -1,9 +1,11 @@
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
+import fetch_engine
+import financials
+import parse_cache
 import time
 
 # Configure logging
@@ -78,73 +80,6 @@ def extract_location(text: str) -> str:
     
     return ""
 
-def extract_price(text: str) -> str:
-    """Extract price/asking price information"""
-    patterns = [
-        r'Price:\s*\$\s*([\d,]+)',
-        r'PRICE:\s*\$\s*([\d,]+)',
-        r'Ask:\s*\$\s*([\d,]+)',
-        r'ASK:\s*\$\s*([\d,]+)',
-        r'Asking:\s*\$\s*([\d,]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return f"${match.group(1)}"
-    
-    return ""
-
-def extract_financial_metric(text: str, metric: str) -> str:
-    """Extract specific financial metrics"""
-    patterns = {
-        'revenue': [
-            r'F20\d{2}\s+revenue.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)',
-            r'revenue.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)',
-            r'sales.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)'
-        ],
-        'ebitda': [
-            r'EBITDA.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)',
-            r'ebitda.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)'
-        ],
-        'cash flow': [
-            r'normalized cash flow.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)',
-            r'cash flow.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)'
-        ],
-        'sde': [
-            r'SDE.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)',
-            r'Seller\'s Discretionary Earnings.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)',
-            r'discretionary earnings.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)'
-        ],
-        'gross profit': [
-            r'gross profit.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)'
-        ],
-        'ebit': [
-            r'EBIT.*?\$\s*([\d,]+(?:\.\d+)?(?:mm|k)?)'
-        ]
-    }
-    
-    metric_key = metric.lower()
-    if metric_key not in patterns:
-        return ""
-    
-    for pattern in patterns[metric_key]:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            value = match.group(1)
-            return format_financial_value(value)
-    
-    return ""
-
-def format_financial_value(value: str) -> str:
-    """Format financial values consistently"""
-    if 'mm' in value.lower():
-        return f"${value}"
-    elif 'k' in value.lower():
-        return f"${value}"
-    else:
-        return f"${value}"
-
 def extract_year_founded(text: str) -> str:
     """Extract founding year"""
     patterns = [
@@ -290,16 +225,16 @@ def parse_listing_block(block: str) -> Dict[str, Any]:
     # Extract location
     listing['Location'] = extract_location(full_text)
     
-    # Extract price/ask
-    listing['Price'] = extract_price(full_text)
-    
-    # Extract financial metrics
-    listing['Revenue'] = extract_financial_metric(full_text, 'revenue')
-    listing['Cash Flow'] = extract_financial_metric(full_text, 'cash flow')
-    listing['EBITDA'] = extract_financial_metric(full_text, 'ebitda')
-    listing['SDE'] = extract_financial_metric(full_text, 'sde')
-    listing['Gross Profit'] = extract_financial_metric(full_text, 'gross profit')
-    listing['EBIT'] = extract_financial_metric(full_text, 'ebit')
+    # Extract price/ask and financial metrics in one pass; the price sits right
+    # after its label, the other metrics anywhere later on the line
+    figures = financials.extract(full_text, "loose", modes={"asking_price": "amount"})
+    listing['Price'] = financials.dollars(figures.get('asking_price'))
+    listing['Revenue'] = financials.dollars(figures.get('revenue'))
+    listing['Cash Flow'] = financials.dollars(figures.get('cash_flow'))
+    listing['EBITDA'] = financials.dollars(figures.get('ebitda'))
+    listing['SDE'] = financials.dollars(figures.get('sde'))
+    listing['Gross Profit'] = financials.dollars(figures.get('gross_profit'))
+    listing['EBIT'] = financials.dollars(figures.get('ebit'))
     
     # Extract other details
     listing['Year Founded'] = extract_year_founded(full_text)
@@ -325,22 +260,35 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history = config.get("history", pd.DataFrame())
-    sold_keywords = config.get("sold_keywords", ["sold", "under contract", "closed", "contingent"])
 
     try:
-        response = requests.get(listing_url, headers=headers, timeout=30)
+        response = fetch_engine.fetch(config, listing_url, headers=headers, timeout=30)
         response.raise_for_status()
         logger.info(f"Successfully fetched listing page: {response.status_code}")
-        logger.info(f"Page size: {len(response.text):,} characters")
+        logger.info(f"Page size: {len(response.content):,} bytes")
     except Exception as e:
         logger.error("Failed to fetch listing page: %s", e)
         return []
 
-    existing_urls = set(history.get("Link to Deal", []).dropna()) if not history.empty else set()
+    # Unchanged page bytes reuse last run's posts instead of re-parsing them
+    return parse_cache.cached_parse(config, listing_url, response.content,
+                                    lambda: parse_listing_page(config, response))
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Parse the Directory Page
+# ---------------------------------------------------------------------------
+def parse_listing_page(config: Dict[str, Any], html) -> List[Dict[str, str]]:
+    """
+    Extract the listings from the directory page's HTML.
+
+    Returns:
+        A list of dictionaries, each representing a listing.
+    """
+    sold_keywords = config.get("sold_keywords", ["sold", "under contract", "closed", "contingent"])
     
     # Extract business listings from the specific website structure
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(config, html)
     text_content = soup.get_text()
     
     # Split the content by common separators used on this site
@@ -1,13 +1,12 @@
 import pandas as pd
 import logging
 from typing import Dict, Any, List
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.action_chains import ActionChains
-import time
+import browser_pool
+import dom_batch
+from rate_limit import throttle
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -19,78 +18,77 @@ logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(m
 # Helper Function: Extract Listings with Selenium
 # ---------------------------------------------------------------------------
 def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
-    options = Options()
-    # options.add_argument("--headless")  # Uncomment to run in headless mode
-    driver = webdriver.Chrome(service=Service(), options=options)
-    driver.get(config["listing_url"])
-    wait = WebDriverWait(driver, 10)
-    actions = ActionChains(driver)
-
-    listings = []
-    page = 1
-
-    def extract_listings():
-        cards = driver.find_elements(By.CSS_SELECTOR, "ul.listings > li")
-        for card in cards:
-            try: title = card.find_element(By.CSS_SELECTOR, "h4 a").text.strip()
-            except: title = ""
-            try: price = card.find_element(By.XPATH, ".//td[contains(text(),'PRICE:')]/following-sibling::td").text.strip()
-            except: price = ""
-            try: revenue = card.find_element(By.XPATH, ".//td[contains(text(),'REVENUE:')]/following-sibling::td").text.strip()
-            except: revenue = ""
-            try: profit = card.find_element(By.XPATH, ".//td[contains(text(),'PROFIT:')]/following-sibling::td").text.strip()
-            except: profit = ""
-            try: location = card.find_element(By.XPATH, ".//td[contains(text(),'LOCATION:')]/following-sibling::td").text.strip()
-            except: location = ""
-            try: listed_by = card.find_element(By.XPATH, ".//td[contains(text(),'LISTED BY:')]/following-sibling::td").text.strip()
-            except: listed_by = ""
-
-            listings.append({
-                "listing_id": "",  # Not available
-                "href": "",        # No individual deal links on this site
-                "title": title,
-                "price_box": price,
-                "pub_date": "",
-                "description": "",
-                "location": location,
-                "business_type": "",
-                "revenue": revenue,
-                "ebitda": profit,
-                "contact_name": listed_by,
-                "contact_number": "",
-            })
-
-    while True:
-        logging.info(f"Extracting page {page}")
-        wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "ul.listings > li")) > 0)
-        first_title = driver.find_element(By.CSS_SELECTOR, "ul.listings h4 a").text.strip()
-        extract_listings()
-
-        try:
-            # Detect and click the “Next” → pagination button
-            next_button = None
-            for a in driver.find_elements(By.CSS_SELECTOR, "div.pagination a"):
-                if "→" in a.text and a.is_displayed():
-                    next_button = a
+    driver = browser_pool.get_driver(config)
+    try:
+        throttle(config, config["listing_url"])
+        driver.get(config["listing_url"])
+        wait = WebDriverWait(driver, 10)
+        actions = ActionChains(driver)
+
+        listings = []
+        page = 1
+
+        def labelled(label):
+            return dom_batch.field(xpath=f".//td[contains(text(),'{label}')]/following-sibling::td")
+
+        card_fields = {
+            "title": dom_batch.field(css="h4 a"),
+            "price": labelled("PRICE:"),
+            "revenue": labelled("REVENUE:"),
+            "profit": labelled("PROFIT:"),
+            "location": labelled("LOCATION:"),
+            "listed_by": labelled("LISTED BY:"),
+        }
+
+        def extract_listings():
+            # Every card on the page in one browser round trip
+            for card in dom_batch.extract(driver, "ul.listings > li", card_fields):
+                listings.append({
+                    "listing_id": "",  # Not available
+                    "href": "",        # No individual deal links on this site
+                    "title": card["title"],
+                    "price_box": card["price"],
+                    "pub_date": "",
+                    "description": "",
+                    "location": card["location"],
+                    "business_type": "",
+                    "revenue": card["revenue"],
+                    "ebitda": card["profit"],
+                    "contact_name": card["listed_by"],
+                    "contact_number": "",
+                })
+
+        while True:
+            logging.info(f"Extracting page {page}")
+            wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "ul.listings > li")) > 0)
+            first_title = driver.find_element(By.CSS_SELECTOR, "ul.listings h4 a").text.strip()
+            extract_listings()
+
+            try:
+                # Detect and click the “Next” → pagination button
+                next_button = None
+                for a in driver.find_elements(By.CSS_SELECTOR, "div.pagination a"):
+                    if "→" in a.text and a.is_displayed():
+                        next_button = a
+                        break
+
+                if not next_button:
+                    logging.info("No 'Next' button found. Pagination complete.")
                     break
 
-            if not next_button:
-                logging.info("No 'Next' button found. Pagination complete.")
-                break
-
-            actions.move_to_element(next_button).perform()
-            next_button.click()
-            WebDriverWait(driver, 10).until(
-                lambda d: d.find_element(By.CSS_SELECTOR, "ul.listings h4 a").text.strip() != first_title
-            )
-            time.sleep(1)
-            page += 1
+                actions.move_to_element(next_button).perform()
+                next_button.click()
+                WebDriverWait(driver, 10).until(
+                    lambda d: d.find_element(By.CSS_SELECTOR, "ul.listings h4 a").text.strip() != first_title
+                )
+                page += 1
 
-        except Exception as e:
-            logging.warning("Stopping pagination due to error or end: %s", e)
-            break
+            except Exception as e:
+                logging.warning("Stopping pagination due to error or end: %s", e)
+                break
 
-    driver.quit()
+    finally:
+        browser_pool.release(config, driver)
     logging.info("Extracted %d listings across all pages.", len(listings))
     return listings
 
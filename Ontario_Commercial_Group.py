@@ -1,9 +1,11 @@
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
+import fetch_engine
+from history import known_links
+import parse_cache
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -23,22 +25,38 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history_df = config.get("history", pd.DataFrame())
 
     # Fetch the HTML page
     try:
-        response = requests.get(listing_url, headers=headers, timeout=20)
+        response = fetch_engine.fetch(config, listing_url, headers=headers, timeout=20)
         response.raise_for_status()
     except Exception as e:
         logging.error("Failed to fetch listing directory: %s", e)
         return []
 
-    # Existing listing URLs (to avoid duplicates)
-    existing_urls = set(history_df.get("Link to Deal", []))
+    # Unchanged page bytes reuse last run's posts instead of re-parsing them
+    posts = parse_cache.cached_parse(config, listing_url, response.content,
+                                     lambda: parse_listing_page(config, response))
+
+    # Skip listings whose URL already exists in history
+    existing_urls = known_links(config)
+    return [post for post in posts if post["href"] not in existing_urls]
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Parse the Directory Page
+# ---------------------------------------------------------------------------
+def parse_listing_page(config: Dict[str, Any], html) -> List[Dict[str, str]]:
+    """
+    Extract the listings from the directory page's HTML.
+
+    Returns:
+        A list of dictionaries, each representing a listing.
+    """
     posts: List[Dict[str, str]] = []
 
     # Parse the page with BeautifulSoup
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(config, html)
     listing_boxes = soup.find_all("div", class_="listing-box")
     logging.info("Found %d listing boxes", len(listing_boxes))
 
@@ -112,11 +130,6 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
         if excerpt_tag:
             excerpt = excerpt_tag.get_text(strip=True)
 
-        # Skip if this URL already exists in history
-        if learn_more_link in existing_urls:
-            logging.debug("Skipping duplicate listing: %s", title)
-            continue
-
         # Append the extracted data to the list
         posts.append({
             "listing_id": listing_id,
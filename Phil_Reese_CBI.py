@@ -1,9 +1,11 @@
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
+import fetch_engine
+import financials
+import parse_cache
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -23,22 +25,34 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history_df = config.get("history", pd.DataFrame())
 
     # Fetch the HTML page
     try:
-        response = requests.get(listing_url, headers=headers, timeout=20)
+        response = fetch_engine.fetch(config, listing_url, headers=headers, timeout=20)
         response.raise_for_status()
     except Exception as e:
         logging.error("Failed to fetch listing directory: %s", e)
         return []
 
-    # Existing listing URLs (to avoid duplicates)
-    existing_urls = set(history_df.get("Link to Deal", []))
+    # Unchanged page bytes reuse last run's posts instead of re-parsing them
+    return parse_cache.cached_parse(config, listing_url, response.content,
+                                    lambda: parse_listing_page(config, response))
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Parse the Directory Page
+# ---------------------------------------------------------------------------
+def parse_listing_page(config: Dict[str, Any], html) -> List[Dict[str, str]]:
+    """
+    Extract the listings from the directory page's HTML.
+
+    Returns:
+        A list of dictionaries, each representing a listing.
+    """
     posts: List[Dict[str, str]] = []
 
     # Parse the page with BeautifulSoup
-    soup = BeautifulSoup(response.content, "html.parser")
+    soup = make_soup(config, html)
     listings = soup.find_all("div", class_="listing")
     logging.info("Found %d listing containers", len(listings))
 
@@ -91,28 +105,13 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
                 if listing_match:
                     listing_number = listing_match.group(1)
                 
-                # Extract price
-                price_patterns = [
-                    r'Price:\s*\$?([\d,]+)',
-                    r'Price:\s*([^<\n]+)',
-                    r'Price:\s*(.+?)(?:Nets|$)'
-                ]
-                for pattern in price_patterns:
-                    price_match = re.search(pattern, details_text, re.IGNORECASE)
-                    if price_match:
-                        price = price_match.group(1).strip()
-                        break
-                
-                # Extract net income
-                net_patterns = [
-                    r'Nets?\s*\$?([\d,]+)',
-                    r'Nets?\s*([^<\n]+)'
-                ]
-                for pattern in net_patterns:
-                    net_match = re.search(pattern, details_text, re.IGNORECASE)
-                    if net_match:
-                        net_income = net_match.group(1).strip()
-                        break
+                # Extract price and net income ("$" optional); a price that is not
+                # an amount ("Price: Call for details Nets ...") is kept as written
+                figures = financials.extract(details_text, "number")
+                if "asking_price" not in figures:
+                    figures["asking_price"] = financials.extract(details_text, "field").get("asking_price", price)
+                price = figures["asking_price"]
+                net_income = figures.get("net_profit", net_income)
             
             # Find business description
             desc_paragraph = h3.find_next('p')
@@ -286,7 +285,7 @@ def scrape_local_html(config: Dict[str, Any]) -> pd.DataFrame:
         logging.error("No HTML content provided")
         return pd.DataFrame()
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(config, html_content)
     listings = soup.find_all('div', class_='listing')
     posts = []
     
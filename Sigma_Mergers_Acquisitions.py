@@ -1,6 +1,6 @@
 import pandas as pd
 import logging
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
 
 # ---------------------------------------------------------------------------
@@ -23,7 +23,7 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
 
     try:
         with open(html_file, "r", encoding="utf-8") as file:
-            soup = BeautifulSoup(file, "html.parser")
+            soup = make_soup(config, file)
     except Exception as e:
         logging.error("Failed to load HTML file: %s", e)
         return []
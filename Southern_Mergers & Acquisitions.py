@@ -1,6 +1,6 @@
 import pandas as pd
 import logging
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
 
 # ---------------------------------------------------------------------------
@@ -23,7 +23,7 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     # Load HTML from file
     try:
         with open(file_path, "r", encoding="utf-8") as f:
-            soup = BeautifulSoup(f, "html.parser")
+            soup = make_soup(config, f)
     except Exception as e:
         logging.error("Failed to open HTML file: %s", e)
         return []
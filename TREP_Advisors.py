@@ -1,9 +1,10 @@
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
+import fetch_engine
+import parse_cache
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -17,20 +18,33 @@ logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(m
 def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history_df = config.get("history", pd.DataFrame())
 
     try:
-        response = requests.get(listing_url, headers=headers, timeout=20)
+        response = fetch_engine.fetch(config, listing_url, headers=headers, timeout=20)
         response.raise_for_status()
     except Exception as e:
         logging.error("Failed to fetch listing directory: %s", e)
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    # Unchanged page bytes reuse last run's posts instead of re-parsing them
+    return parse_cache.cached_parse(config, listing_url, response.content,
+                                    lambda: parse_listing_page(config, response))
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Parse the Directory Page
+# ---------------------------------------------------------------------------
+def parse_listing_page(config: Dict[str, Any], html) -> List[Dict[str, str]]:
+    """
+    Extract the listings from the directory page's HTML.
+
+    Returns:
+        A list of dictionaries, each representing a listing.
+    """
+    soup = make_soup(config, html)
     rows = soup.select("table tbody tr")
     logging.info("Found %d table rows", len(rows))
 
-    existing_urls = set(history_df.get("Link to Deal", []))
     posts = []
 
     for row in rows:
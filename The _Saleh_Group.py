@@ -132,19 +132,18 @@
 
 
 
-import time
 import logging
 import pandas as pd
 import re
 from bs4 import BeautifulSoup
-from selenium import webdriver
+from html_parser import make_soup
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from typing import List, Dict, Any
+import browser_pool
+from rate_limit import throttle
 
 # -----------------------------------------------------------------------------
 # Logging Setup
@@ -189,14 +188,13 @@ def extract_listing_data(soup: BeautifulSoup) -> Dict[str, str]:
 # -----------------------------------------------------------------------------
 def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     listing_url = config["listing_url"]
-    driver_options = webdriver.ChromeOptions()
-    driver_options.add_argument("--headless")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=driver_options)
+    driver = browser_pool.get_driver(config)
     wait = WebDriverWait(driver, 15)
     actions = ActionChains(driver)
 
     all_data = []
     try:
+        throttle(config, listing_url)
         driver.get(listing_url)
         while True:
             link_selector = "h1.entry-title > a"
@@ -211,9 +209,10 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
                 link = current_links[i]
 
                 try:
+                    throttle(config, listing_url)
                     actions.move_to_element(link).pause(0.3).click(link).perform()
                     wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.entry-title")))
-                    soup = BeautifulSoup(driver.page_source, "html.parser")
+                    soup = make_soup(config, driver.page_source)
                     data = extract_listing_data(soup)
                     data["Link"] = driver.current_url
                     all_data.append(data)
@@ -223,20 +222,19 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
 
                 driver.back()
                 wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, link_selector)))
-                time.sleep(1)
 
             # Move to previous page
             try:
                 prev = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Previous posts")))
+                throttle(config, listing_url)
                 actions.move_to_element(prev).pause(0.3).click(prev).perform()
                 logging.info("Navigated to previous page.")
-                time.sleep(2)
             except Exception:
                 logging.info("No more 'Previous posts'.")
                 break
 
     finally:
-        driver.quit()
+        browser_pool.release(config, driver)
     return all_data
 
 # -----------------------------------------------------------------------------
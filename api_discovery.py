@@ -0,0 +1,440 @@
+import base64
+import json
+import logging
+import math
+import os
+import threading
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import browser_pool
+import fetch_engine
+
+# ---------------------------------------------------------------------------
+# JSON endpoint discovery for browser-rendered directories
+#
+# Some directories are JavaScript apps that fetch their listings as JSON.
+# After a browser run, discover() reads the session's network log, asks
+# Chrome for the body of every JSON response, and looks for a list of
+# objects that mentions the listings the scraper just saw on screen. The
+# winning endpoint is saved as a recipe: which URLs to GET, with what
+# headers, and the path from the JSON root down to the list. Recipes are
+# plain JSON under runs/, so no credential is ever written to one: an
+# endpoint the browser called with an Authorization, API key or cookie
+# header is not recorded, and the site keeps using the browser.
+#
+# On later runs fetch_items() replays the recipe through the fetch engine
+# and hands the raw items to the scraper; no browser starts. A recipe that
+# errors or comes back empty is dropped and the scraper falls back to its
+# browser flow, which discovers a fresh one.
+#
+# A recipe replays the URLs the browser fetched on the day it was found,
+# so it cannot follow a directory that grows past them (another "Load
+# More" page). It is therefore also dropped when the replay returns a
+# different number of items than discovery saw, and once it is
+# RECIPE_MAX_AGE old: the next browser run records the URLs afresh.
+#
+# A scraper that reads its listings off cards can also pass the cards to
+# discover(): each card is paired with the JSON item that mentions it, and
+# every card field is traced to the item key whose value renders to exactly
+# what the card showed -- as text, as a dollar amount ("$1,250,000" from
+# 1250000), or as a URL path ("/listings/x/" from an absolute link). The
+# field map is saved with the recipe, and map_items() turns
+# replayed items into card-shaped records with it. Nothing is guessed from
+# key names: a field the map could not trace reads "N/A", and a recipe
+# that cannot fill a field the scraper requires sends it back to the browser.
+#
+# Only GET endpoints are recorded; a directory that POSTs its query keeps
+# using the browser.
+# ---------------------------------------------------------------------------
+
+JsonPath = List[Any]
+
+MIN_MATCH_SHARE = 0.5
+
+# Long enough to save most runs a browser, short enough to pick up new pages
+RECIPE_MAX_AGE = timedelta(days=7)
+
+# Headers that describe the request and are safe to store and resend
+REPLAY_HEADERS = {"accept", "x-requested-with", "referer"}
+# Headers that carry the browser session's credentials
+CREDENTIAL_HEADERS = {"authorization", "proxy-authorization", "cookie", "x-api-key", "x-auth-token", "x-csrf-token"}
+
+
+class ApiRecipes:
+    """Site host -> recipe, kept between runs in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._recipes: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._recipes = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable API recipes {path}: {e}")
+        # Files written before credentials were kept out may still hold them
+        stale = [site for site, recipe in self._recipes.items()
+                 if any(k.lower() not in REPLAY_HEADERS for k in recipe.get("headers", {}))]
+        for site in stale:
+            del self._recipes[site]
+        if stale:
+            logging.info(f"Dropped API recipes that stored credentials: {', '.join(sorted(stale))}")
+            self._persist()
+
+    def get(self, site: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._recipes.get(site)
+
+    def put(self, site: str, recipe: Dict[str, Any]) -> None:
+        with self._lock:
+            self._recipes[site] = recipe
+        self._persist()
+
+    def drop(self, site: str) -> None:
+        with self._lock:
+            self._recipes.pop(site, None)
+        self._persist()
+
+    def _persist(self) -> None:
+        # Written on every change so a recipe survives a run that crashes later
+        try:
+            self.save()
+        except OSError as e:
+            logging.warning(f"Failed to save API recipes to {self.path}: {e}")
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self._recipes, indent=1, sort_keys=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+def _site(config: Dict[str, Any]) -> str:
+    return urlsplit(config.get("listing_url", "")).netloc.lower()
+
+
+# ---------------------------------------------------------------------------
+# JSON helpers
+# ---------------------------------------------------------------------------
+def _lists(node: Any, path: JsonPath) -> Iterable[Tuple[JsonPath, List[Dict[str, Any]]]]:
+    """Every list of objects inside ``node``, with its path."""
+    if isinstance(node, list):
+        if node and all(isinstance(x, dict) for x in node):
+            yield path, node
+        for i, child in enumerate(node[:50]):
+            yield from _lists(child, path + [i])
+    elif isinstance(node, dict):
+        for key, child in node.items():
+            yield from _lists(child, path + [key])
+
+
+def _at(node: Any, path: JsonPath) -> Any:
+    for step in path:
+        node = node[step]
+    return node
+
+
+def _strings(node: Any) -> Iterable[str]:
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, dict):
+        for child in node.values():
+            yield from _strings(child)
+    elif isinstance(node, list):
+        for child in node:
+            yield from _strings(child)
+
+
+def _matches(item: Dict[str, Any], needles: List[str]) -> bool:
+    text = " ".join(_strings(item)).lower()
+    return any(n in text for n in needles)
+
+
+def _leaves(node: Any, path: JsonPath) -> Iterable[Tuple[JsonPath, Any]]:
+    """Every scalar inside ``node``, with its path."""
+    if isinstance(node, dict):
+        for key, child in node.items():
+            yield from _leaves(child, path + [key])
+    elif isinstance(node, list):
+        for i, child in enumerate(node):
+            yield from _leaves(child, path + [i])
+    elif node is not None and not isinstance(node, bool):
+        yield path, node
+
+
+# ---------------------------------------------------------------------------
+# Card field formats
+# ---------------------------------------------------------------------------
+def _as_text(value: Any) -> Optional[str]:
+    return " ".join(str(value).split()) or None
+
+
+def _as_money(value: Any) -> Optional[str]:
+    try:
+        amount = float(str(value).replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return None
+    if not math.isfinite(amount):
+        return None
+    return f"${amount:,.0f}" if amount == int(amount) else f"${amount:,.2f}"
+
+
+def _as_path(value: Any) -> Optional[str]:
+    return urlsplit(str(value).strip()).path or None
+
+
+FORMATS: Dict[str, Callable[[Any], Optional[str]]] = {"text": _as_text, "money": _as_money, "path": _as_path}
+
+
+def _same(rendered: Optional[str], shown: str) -> bool:
+    # innerText applies CSS text-transform, so the card's case is not the data's
+    return rendered is not None and rendered.lower() == " ".join(shown.split()).lower()
+
+
+def _learn_fields(items: List[Dict[str, Any]], cards: List[Tuple[str, Dict[str, str]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Card field -> {"path", "format"} of the item value it was rendered from.
+
+    Each (needle, card) pair is matched to the first item mentioning the
+    needle; a field's path and format have to agree on at least
+    ``MIN_MATCH_SHARE`` of the paired cards.
+    """
+    votes: Dict[str, Counter] = {}
+    paired = 0
+    for needle, card in cards:
+        item = next((i for i in items if _matches(i, [needle])), None)
+        if item is None:
+            continue
+        paired += 1
+        leaves = list(_leaves(item, []))
+        for name, shown in card.items():
+            if not shown or shown == "N/A":
+                continue
+            for path, value in leaves:
+                fmt = next((f for f, render in FORMATS.items() if _same(render(value), shown)), None)
+                if fmt:
+                    votes.setdefault(name, Counter())[(json.dumps(path), fmt)] += 1
+    fields = {}
+    for name, counter in votes.items():
+        (path, fmt), hits = counter.most_common(1)[0]
+        if hits >= MIN_MATCH_SHARE * paired:
+            fields[name] = {"path": json.loads(path), "format": fmt}
+    return fields
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+def _json_responses(driver) -> List[Dict[str, Any]]:
+    """GET requests of this lease whose response was JSON, with their parsed bodies."""
+    requests_sent: Dict[str, Dict[str, Any]] = {}
+    responses = []
+    for entry in browser_pool.network_log(driver):
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        params = message.get("params", {})
+        if message.get("method") == "Network.requestWillBeSent":
+            requests_sent[params.get("requestId")] = params.get("request", {})
+        elif message.get("method") == "Network.responseReceived":
+            response = params.get("response", {})
+            request = requests_sent.get(params.get("requestId"), {})
+            if "json" in response.get("mimeType", "") and request.get("method", "GET") == "GET":
+                responses.append({"id": params.get("requestId"), "url": response.get("url"),
+                                  "headers": request.get("headers", {})})
+    found = []
+    for response in responses:
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": response["id"]})
+            text = base64.b64decode(body["body"]).decode("utf-8") if body.get("base64Encoded") else body["body"]
+            response["json"] = json.loads(text)
+        except Exception:
+            # Evicted from Chrome's buffer, or not really JSON
+            continue
+        found.append(response)
+    return found
+
+
+def discover(config: Dict[str, Any], driver, needles: List[str],
+             cards: Optional[List[Dict[str, str]]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find the JSON endpoint behind what the browser just showed and save it.
+
+    Args:
+        config: The scraper config; ``config["api_recipes"]`` is where the
+            recipe goes. Without one nothing is recorded.
+        driver: The browser, still on the lease that loaded the listings.
+        needles: Strings that identify the listings on screen (titles or
+            links); an endpoint has to mention most of them.
+        cards: The fields read off each listing, in the same order as
+            ``needles``; when given, the recipe records where every field
+            comes from in the JSON (see ``map_items()``).
+
+    Returns:
+        The saved recipe, or None when no endpoint qualified.
+    """
+    recipes: Optional[ApiRecipes] = config.get("api_recipes")
+    shown = [(n.strip().lower(), card) for n, card in zip(needles, cards or [{}] * len(needles))
+             if n and n.strip() and n != "N/A"]
+    needles = [n for n, _ in shown]
+    if recipes is None or not needles:
+        return None
+
+    # Best list per URL path; the app may have fetched several pages of it
+    best: Dict[str, Dict[str, Any]] = {}
+    for response in _json_responses(driver):
+        for path, items in _lists(response["json"], []):
+            hits = sum(1 for item in items if _matches(item, needles))
+            if not hits:
+                continue
+            endpoint = urlsplit(response["url"])._replace(query="", fragment="").geturl()
+            current = best.get(endpoint)
+            if current is None or (current["path"] == path and response["url"] not in current["urls"]):
+                if current is None:
+                    best[endpoint] = {"path": path, "urls": [response["url"]], "hits": hits,
+                                      "headers": response["headers"], "items": list(items)}
+                else:
+                    current["urls"].append(response["url"])
+                    current["hits"] += hits
+                    current["items"].extend(items)
+            elif hits > current["hits"]:
+                best[endpoint] = {"path": path, "urls": [response["url"]], "hits": hits,
+                                  "headers": response["headers"], "items": list(items)}
+
+    if not best:
+        logging.info(f"No JSON endpoint found behind {config.get('listing_url')}")
+        return None
+    endpoint, winner = max(best.items(), key=lambda kv: kv[1]["hits"])
+    if winner["hits"] < MIN_MATCH_SHARE * len(needles):
+        logging.info(f"Best JSON endpoint {endpoint} only matched {winner['hits']}/{len(needles)} listings")
+        return None
+
+    credentials = sorted(k for k in winner["headers"] if k.lower() in CREDENTIAL_HEADERS)
+    if credentials:
+        logging.info(f"Not saving JSON endpoint {endpoint}: the browser sent it {', '.join(credentials)}")
+        return None
+
+    recipe = {
+        "urls": winner["urls"],
+        "path": winner["path"],
+        # Only headers that describe the request, not the browser's transport
+        "headers": {k: v for k, v in winner["headers"].items() if k.lower() in REPLAY_HEADERS},
+        "matched": winner["hits"],
+        "items": len({json.dumps(item, sort_keys=True, default=str) for item in winner["items"]}),
+        "discovered_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    if cards is not None:
+        recipe["fields"] = _learn_fields(winner["items"], shown)
+        logging.info(f"API fields traced for {_site(config)}: {', '.join(sorted(recipe['fields'])) or 'none'}")
+    recipes.put(_site(config), recipe)
+    logging.info(f"Saved API recipe for {_site(config)}: {endpoint} ({winner['hits']} listings matched)")
+    return recipe
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+def fetch_items(config: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Listing objects from the site's saved recipe, fetched over plain HTTP.
+
+    Returns:
+        The items (possibly from several URLs, duplicates removed), or None
+        when there is no recipe, it has expired, or it no longer matches
+        what discovery saw -- the caller should then use its browser flow.
+    """
+    recipes: Optional[ApiRecipes] = config.get("api_recipes")
+    recipe = recipes.get(_site(config)) if recipes is not None else None
+    if recipe is None:
+        return None
+    try:
+        age = datetime.now() - datetime.fromisoformat(recipe["discovered_at"])
+    except (KeyError, TypeError, ValueError):
+        age = RECIPE_MAX_AGE
+    if age >= RECIPE_MAX_AGE:
+        logging.info(f"API recipe for {_site(config)} has expired; rediscovering through the browser")
+        recipes.drop(_site(config))
+        return None
+
+    headers = dict(config.get("headers", {}))
+    headers.update(recipe.get("headers", {}))
+    items, seen = [], set()
+    try:
+        for response in fetch_engine.fetch_all(config, recipe["urls"], headers=headers):
+            if isinstance(response, BaseException):
+                raise response
+            response.raise_for_status()
+            for item in _at(response.json(), recipe["path"]):
+                key = json.dumps(item, sort_keys=True, default=str)
+                if key not in seen:
+                    seen.add(key)
+                    items.append(item)
+    except Exception as e:
+        logging.warning(f"API recipe for {_site(config)} stopped working ({e}); falling back to the browser")
+        recipes.drop(_site(config))
+        return None
+    if not items:
+        logging.warning(f"API recipe for {_site(config)} returned no listings; falling back to the browser")
+        recipes.drop(_site(config))
+        return None
+    if len(items) != recipe.get("items"):
+        # The directory changed shape since discovery: pages may have been
+        # added past the recorded URLs, so let the browser see it again
+        logging.info(f"API recipe for {_site(config)} returned {len(items)} listings, discovery saw "
+                     f"{recipe.get('items')}; rediscovering through the browser")
+        recipes.drop(_site(config))
+        return None
+    logging.info(f"Fetched {len(items)} listings for {_site(config)} from its JSON endpoint")
+    return items
+
+
+def map_items(config: Dict[str, Any], items: List[Dict[str, Any]], names: Sequence[str],
+              required: Sequence[str] = (), default: str = "N/A") -> Optional[List[Dict[str, str]]]:
+    """
+    Replayed items as card records, through the field map saved at discovery.
+
+    Args:
+        config: The scraper config.
+        items: What ``fetch_items()`` returned.
+        names: The card fields to fill; one the map lacks reads ``default``.
+        required: Fields every record must have. When the map cannot fill
+            one of them for every item the recipe is dropped and None is
+            returned, so the caller uses its browser flow.
+
+    Returns:
+        One record per item, or None.
+    """
+    recipes: Optional[ApiRecipes] = config.get("api_recipes")
+    recipe = recipes.get(_site(config)) if recipes is not None else None
+    fields = (recipe or {}).get("fields", {})
+    records = []
+    for item in items:
+        record = {}
+        for name in names:
+            value = None
+            if name in fields:
+                try:
+                    raw = _at(item, fields[name]["path"])
+                except (KeyError, IndexError, TypeError):
+                    raw = None
+                if raw is not None and not isinstance(raw, (dict, list)):
+                    value = FORMATS[fields[name]["format"]](raw)
+            record[name] = value or default
+        records.append(record)
+    unresolved = [name for name in required if any(r[name] == default for r in records)]
+    if unresolved:
+        logging.warning(f"API recipe for {_site(config)} cannot fill {', '.join(unresolved)}; "
+                        f"falling back to the browser")
+        if recipes is not None:
+            recipes.drop(_site(config))
+        return None
+    return records
@@ -1,9 +1,10 @@
 import pandas as pd
-import requests
 import logging
 import re
-from bs4 import BeautifulSoup
+from html_parser import make_soup
 from typing import Dict, Any, List
+import fetch_engine
+from incremental import detail_due, log_skipped
 
 # ---------------------------------------------------------------------------
 # Logging Setup
@@ -23,141 +24,166 @@ def get_list_links(config: Dict[str, Any]) -> List[Dict[str, str]]:
     """
     listing_url = config["listing_url"]
     headers = config.get("headers", {})
-    history_df = config.get("history", pd.DataFrame())
 
     # Fetch the HTML page
     try:
-        response = requests.get(listing_url, headers=headers, timeout=20)
+        response = fetch_engine.fetch(config, listing_url, headers=headers, timeout=20)
         response.raise_for_status()
     except Exception as e:
         logging.error("Failed to fetch listing directory: %s", e)
         return []
 
-    # Existing listing URLs (to avoid duplicates)
-    existing_urls = set(history_df.get("Link to Deal", []).dropna())
     posts: List[Dict[str, str]] = []
+    skipped = 0
 
     # Parse the page with BeautifulSoup
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(config, response)
     listing_cards = soup.find_all("div", class_="listing-right-box")
     logging.info("Found %d listing cards", len(listing_cards))
 
     # Loop over each listing card
     for post in listing_cards:
-        # Initialize default values
-        ad_id = "N/A"
-        business_type = "N/A"
-        price_match = None
-        revenue_match = None
-        ebitda_match = None
-        contact_name = "N/A"
-        contact_number = "N/A"
-
-
-        # Extract the title
-        title_tag = post.find("h2")
-        title = title_tag.get_text(strip=True) if title_tag else "N/A"
-
-        # Extract the full listing link (href)
-        link_tag = post.find("a", href=True) if title_tag else None
-        full_url = link_tag["href"].strip() if link_tag else None
-
-        # Extract the Ad ID
-        listing_info_tag = post.find("div", class_="listing-unit-text")
-        if listing_info_tag:
-            text = listing_info_tag.get_text()
-            match = re.search(r"Ad ID:\s*(\d+)", text)
-            if match:
-                ad_id = match.group(1)
-
-        # Extract the Business Type
-        if listing_info_tag:
-            match = re.search(r"Business Type:\s*(.+)", listing_info_tag.get_text())
-            if match:
-                business_type = match.group(1)
-
-        # Extract the Location
-        location = "N/A"
-        if listing_info_tag:
-            lines = listing_info_tag.get_text(separator="\n").split("\n")
-            for line in lines:
-                if "Location:" in line:
-                    match = re.search(r"Location:\s*(.*)", line)
-                    if match:
-                        extracted = match.group(1).strip()
-                        location = extracted if extracted else "N/A"
-                    break
-
-
-        # Extract the price (Asking Price)
-        price_box = post.find("div", class_="price-box")
-        if price_box:
-            price_match = re.search(r"\$[\d,]+", price_box.get_text())
-
-        # Extract the description
-        description = "N/A"
-        if full_url:
-            try:
-                detail_resp = requests.get(full_url, headers=headers, timeout=15)
-                detail_resp.raise_for_status()
-                detail_soup = BeautifulSoup(detail_resp.text, "html.parser")
-
-                # Attempt to grab the full content inside the post
-                desc_section = detail_soup.find("div", class_="listing-inner-sec fran-info")
-                if desc_section:
-                    paragraphs = desc_section.find_all("p")
-                    description = "\n\n".join(p.get_text(strip=True) for p in paragraphs)
-            except Exception as e:
-                logging.warning("Failed to fetch detail page for %s: %s", full_url, e)
-
-         # Extract Contact Info
-        contact_header = detail_soup.find("h2", string=re.compile(r"Contact Information", re.IGNORECASE))
-        if contact_header:
-            for sibling in contact_header.find_next_siblings("p"):
-                text = sibling.get_text(strip=True)
-                name_match = re.search(r"Name:\s*(.+)", text)
-                phone_match = re.search(r"\(?\d{3}\)?[-\s]?\d{3}[-\s]?\d{4}", text)
-
-                if name_match:
-                    contact_name = name_match.group(1)
-                if phone_match:
-                    contact_number = phone_match.group(0)
-
-
-        # Extract Annual Gross Revenue
-        revenue_strong = post.find("strong", string=re.compile("Annual Gross Revenue"))
-        if revenue_strong and revenue_strong.parent:
-            revenue_match = re.search(r"\$[\d,]+", revenue_strong.parent.text)
-
-        # Extract Annual EBITDA/Cash Flow
-        ebitda_strong = post.find("strong", string=re.compile("Annual EBITDA/Cash Flow"))
-        if ebitda_strong and ebitda_strong.parent:
-            ebitda_match = re.search(r"\$[\d,]+", ebitda_strong.parent.text)
-
-        
-
-        # Append the extracted data to the list
-        posts.append(
-            {
-                "listing_id": ad_id,
-                "href": full_url,
-                "title": title,
-                "price_box": price_match.group() if price_match else "N/A",
-                "pub_date": "",  # No date available on this page
-                "description": description,
-                "location": location,
-                "business_type": business_type,
-                "revenue": revenue_match.group() if revenue_match else "N/A",
-                "ebitda": ebitda_match.group() if ebitda_match else "N/A",
-                "contact_name": contact_name,
-                "contact_number": contact_number,
-            }
-        )
-
+        card = parse_card(post)
+
+        # Skip listings already in the master db (unless due a re-check)
+        if not detail_due(config, card["href"]):
+            skipped += 1
+            continue
+
+        posts.append(card)
+
+    # Detail pages are fetched and parsed concurrently; a URL listed twice is fetched once
+    detail_urls = list(dict.fromkeys(p["href"] for p in posts if p["href"]))
+    details = dict(zip(detail_urls, fetch_engine.fan_out(config, lambda url: fetch_detail(config, url), detail_urls)))
+    for card in posts:
+        detail = details.get(card["href"])
+        if isinstance(detail, BaseException):
+            logging.warning("Failed to fetch detail page for %s: %s", card["href"], detail)
+        elif detail:
+            card.update(detail)
+
+    log_skipped(config.get("broker", listing_url), skipped, len(listing_cards))
     logging.info("Extracted %d listings from page.", len(posts))
     return posts
 
 
+# ---------------------------------------------------------------------------
+# Helper Function: Extract One Listing Card
+# ---------------------------------------------------------------------------
+def parse_card(post) -> Dict[str, str]:
+    """
+    Extract the fields shown on a directory card. Description and contact
+    details stay "N/A" until the detail page fills them in.
+    """
+    # Initialize default values
+    ad_id = "N/A"
+    business_type = "N/A"
+    price_match = None
+    revenue_match = None
+    ebitda_match = None
+
+    # Extract the title
+    title_tag = post.find("h2")
+    title = title_tag.get_text(strip=True) if title_tag else "N/A"
+
+    # Extract the full listing link (href)
+    link_tag = post.find("a", href=True) if title_tag else None
+    full_url = link_tag["href"].strip() if link_tag else None
+
+    # Extract the Ad ID
+    listing_info_tag = post.find("div", class_="listing-unit-text")
+    if listing_info_tag:
+        text = listing_info_tag.get_text()
+        match = re.search(r"Ad ID:\s*(\d+)", text)
+        if match:
+            ad_id = match.group(1)
+
+    # Extract the Business Type
+    if listing_info_tag:
+        match = re.search(r"Business Type:\s*(.+)", listing_info_tag.get_text())
+        if match:
+            business_type = match.group(1)
+
+    # Extract the Location
+    location = "N/A"
+    if listing_info_tag:
+        lines = listing_info_tag.get_text(separator="\n").split("\n")
+        for line in lines:
+            if "Location:" in line:
+                match = re.search(r"Location:\s*(.*)", line)
+                if match:
+                    extracted = match.group(1).strip()
+                    location = extracted if extracted else "N/A"
+                break
+
+
+    # Extract the price (Asking Price)
+    price_box = post.find("div", class_="price-box")
+    if price_box:
+        price_match = re.search(r"\$[\d,]+", price_box.get_text())
+
+    # Extract Annual Gross Revenue
+    revenue_strong = post.find("strong", string=re.compile("Annual Gross Revenue"))
+    if revenue_strong and revenue_strong.parent:
+        revenue_match = re.search(r"\$[\d,]+", revenue_strong.parent.text)
+
+    # Extract Annual EBITDA/Cash Flow
+    ebitda_strong = post.find("strong", string=re.compile("Annual EBITDA/Cash Flow"))
+    if ebitda_strong and ebitda_strong.parent:
+        ebitda_match = re.search(r"\$[\d,]+", ebitda_strong.parent.text)
+
+    return {
+        "listing_id": ad_id,
+        "href": full_url,
+        "title": title,
+        "price_box": price_match.group() if price_match else "N/A",
+        "pub_date": "",  # No date available on this page
+        "description": "N/A",
+        "location": location,
+        "business_type": business_type,
+        "revenue": revenue_match.group() if revenue_match else "N/A",
+        "ebitda": ebitda_match.group() if ebitda_match else "N/A",
+        "contact_name": "N/A",
+        "contact_number": "N/A",
+    }
+
+
+# ---------------------------------------------------------------------------
+# Helper Function: Fetch and Parse One Detail Page
+# ---------------------------------------------------------------------------
+def fetch_detail(config: Dict[str, Any], full_url: str) -> Dict[str, str]:
+    """
+    Fetch a listing's detail page and extract its description and contact.
+    Runs on a pool thread; errors propagate to the caller.
+    """
+    detail_resp = fetch_engine.fetch(config, full_url, headers=config.get("headers", {}), timeout=15)
+    detail_resp.raise_for_status()
+    # Whole page: where the "Contact Information" heading sits is not pinned
+    # down by a captured page, so no containers are declared for it
+    detail_soup = make_soup(config, detail_resp)
+    detail: Dict[str, str] = {}
+
+    # Attempt to grab the full content inside the post
+    desc_section = detail_soup.find("div", class_="listing-inner-sec fran-info")
+    if desc_section:
+        paragraphs = desc_section.find_all("p")
+        detail["description"] = "\n\n".join(p.get_text(strip=True) for p in paragraphs)
+
+    # Extract Contact Info
+    contact_header = detail_soup.find("h2", string=re.compile(r"Contact Information", re.IGNORECASE))
+    if contact_header:
+        for sibling in contact_header.find_next_siblings("p"):
+            text = sibling.get_text(strip=True)
+            name_match = re.search(r"Name:\s*(.+)", text)
+            phone_match = re.search(r"\(?\d{3}\)?[-\s]?\d{3}[-\s]?\d{4}", text)
+
+            if name_match:
+                detail["contact_name"] = name_match.group(1)
+            if phone_match:
+                detail["contact_number"] = phone_match.group(0)
+    return detail
+
+
 # ---------------------------------------------------------------------------
 # Core Scraper Function
 # ---------------------------------------------------------------------------
@@ -0,0 +1,353 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import statistics
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configure logging before any scraper module's own basicConfig(level=DEBUG) runs
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+
+import html_parser  # noqa: E402
+import registry  # noqa: E402
+import run_metrics  # noqa: E402
+from fetch_engine import FetchEngine  # noqa: E402
+from history import EMPTY_HISTORY  # noqa: E402
+from run_metrics import SiteMetrics  # noqa: E402
+from benchmarks.fixtures import (FIXTURE_ROOT, FixtureTransport, RecordingTransport, SiteFixture,  # noqa: E402
+                                 StandInServer, load_corpus, slug)
+
+# ---------------------------------------------------------------------------
+# Scraper benchmark suite
+#
+#   python -m benchmarks.bench_scrapers --capture [--site NAME] [--html SITE=PATH[,PATH]]
+#       Run the HTTP scrapers live once and store every page they fetch
+#       under benchmarks/fixtures/. Local-file scrapers get the saved HTML
+#       passed with --html copied in instead. The listing count of the
+#       capture run is stored with each fixture; replays are checked
+#       against it (tests/test_fixture_replay.py).
+#
+#   python -m benchmarks.bench_scrapers [--serve] [--repeat N] [--json PATH]
+#       Replay each scraper against its fixture and report listings/sec,
+#       time per page and peak memory. --serve answers through a local
+#       stand-in HTTP server rather than straight from disk. --parser picks
+#       the HTML parser backend the scrapers use.
+#
+#   python -m benchmarks.bench_scrapers --parser-diff
+#       Run each scraper on full-page trees from the default HTML parser
+#       (html.parser), then with its declared containers on every installed
+#       backend, and compare the records; exits non-zero if any run
+#       differs. Passing on the captured corpus is what clears lxml for
+#       production use.
+#
+# Selenium scrapers drive their own browser and are reported as skipped,
+# except those in HTTP_PATHS, whose plain-HTTP directory path is captured
+# and replayed on its own (listing pages only, no browser fallback).
+# ---------------------------------------------------------------------------
+
+# Config key each local-file scraper reads its saved HTML from, and whether it takes a list
+LOCAL_INPUTS = {
+    "Golden Gate Business Advisors": ("html_files", True),
+    "Sigma Mergers Acquisitions": ("html_file", False),
+    "Southern Mergers & Acquisitions": ("local_html_file", False),
+}
+
+# Selenium site -> its module's function that reads the directory over HTTP
+HTTP_PATHS = {
+    "BIR Business Brokers": "get_list_links_http",
+}
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36"
+
+
+def _site_config(base: Dict[str, Any], fetch_engine: FetchEngine,
+                 parser: str = html_parser.DEFAULT) -> Dict[str, Any]:
+    config = {
+        "headers": {"User-Agent": USER_AGENT},
+        "history": EMPTY_HISTORY,
+        "mode": "default",
+        "broker": "benchmark",
+        "phase": "benchmark",
+        "contact_name": "benchmark",
+        "contact_number": "benchmark",
+        # Record and replay every detail page, not just the unseen ones
+        "incremental": False,
+    }
+    config.update(base)
+    config["fetch_engine"] = fetch_engine
+    config["html_parser"] = parser
+    return config
+
+
+def _entry(site: str, spec: registry.ScraperSpec):
+    """What the benchmark runs for ``site``: scrape(), or the HTTP path of a Selenium scraper."""
+    scraper = registry.load_scraper(site)
+    if scraper is None or spec.engine != "selenium":
+        return scraper
+    collect = getattr(sys.modules[scraper.__module__], HTTP_PATHS[site])
+    return lambda config: pd.DataFrame(collect(config))
+
+
+def _benchable(site: str, spec: Optional[registry.ScraperSpec]) -> bool:
+    return spec is not None and (spec.engine != "selenium" or site in HTTP_PATHS)
+
+
+def _run_once(scraper, config: Dict[str, Any], metrics: SiteMetrics) -> int:
+    with run_metrics.collecting(metrics):
+        df = scraper(config)
+        returned = len(df) if df is not None else 0
+        run_metrics.finish_scrape(metrics, returned)
+    return returned
+
+
+# ---------------------------------------------------------------------------
+# Capture
+# ---------------------------------------------------------------------------
+def capture(sitelist_path: str, sites: List[str], html_inputs: Dict[str, List[str]], root: str) -> None:
+    with open(sitelist_path, newline="", encoding="utf-8") as f:
+        rows = {row["Site Name"]: row for row in csv.DictReader(f)}
+
+    for site_name, row in rows.items():
+        if sites and site_name not in sites:
+            continue
+        spec = registry.find(site_name)
+        canonical = next((name for name, s in registry.SCRAPERS.items() if s is spec), site_name)
+        if not _benchable(canonical, spec):
+            logging.warning("Not capturing %s: %s", site_name, "no scraper" if spec is None else "Selenium site")
+            continue
+        base = {"listing_url": row.get("Listing URL", ""), "base_url": row.get("Base URL", "")}
+        recorder = RecordingTransport(os.path.join(root, slug(canonical)), canonical, spec.engine, base)
+
+        if spec.engine == "local":
+            key, as_list = LOCAL_INPUTS[canonical]
+            paths = html_inputs.get(site_name) or html_inputs.get(canonical)
+            if not paths:
+                logging.warning("Not capturing %s: pass its saved HTML with --html", site_name)
+                continue
+            recorder.add_local_input(key, paths, as_list)
+            recorder.save()
+            # The saved HTML is the capture; count what the scraper finds in it
+            fixture = SiteFixture(recorder.directory)
+            engine = FetchEngine(transport=FixtureTransport(fixture))
+            try:
+                recorder.manifest["listings"] = _run_once(_entry(canonical, spec),
+                                                          _site_config(fixture.config(), engine),
+                                                          SiteMetrics(canonical))
+            finally:
+                engine.close()
+        else:
+            engine = FetchEngine(transport=recorder)
+            try:
+                recorder.manifest["listings"] = _run_once(_entry(canonical, spec), _site_config(base, engine),
+                                                          SiteMetrics(canonical))
+            except Exception as e:
+                logging.error("Live run of %s failed, keeping the pages fetched so far: %s", canonical, e)
+            finally:
+                engine.close()
+        recorder.save()
+        print(f"captured {canonical}: {len(recorder.manifest['pages'])} pages, "
+              f"{recorder.manifest['listings']} listings")
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+def bench_site(fixture: SiteFixture, repeat: int, server_url: Optional[str], per_host: int,
+               parser: str = html_parser.DEFAULT) -> Dict[str, Any]:
+    site = fixture.site
+    spec = registry.find(site)
+    if spec is None:
+        return {"site": site, "skipped": "no scraper registered"}
+    if not _benchable(site, spec):
+        return {"site": site, "engine": spec.engine, "skipped": "Selenium scraper drives a live browser"}
+    scraper = _entry(site, spec)
+    if scraper is None:
+        return {"site": site, "engine": spec.engine, "skipped": "scraper failed to import"}
+
+    def one_run(measure_memory: bool = False):
+        transport = FixtureTransport(fixture, server_url)
+        engine = FetchEngine(transport=transport, per_host=per_host)
+        metrics = SiteMetrics(site, spec.engine)
+        if measure_memory:
+            tracemalloc.start()
+        try:
+            listings = _run_once(scraper, _site_config(fixture.config(), engine, parser), metrics)
+            peak = tracemalloc.get_traced_memory()[1] if measure_memory else 0
+        finally:
+            if measure_memory:
+                tracemalloc.stop()
+            engine.close()
+        return listings, transport, metrics, peak
+
+    walls, parse_seconds = [], []
+    listings, pages, missing = 0, 0, 0
+    for _ in range(max(1, repeat)):
+        listings, transport, metrics, _ = one_run()
+        walls.append(metrics.wall)
+        parse_seconds.append(metrics.stages()["parse"])
+        pages = transport.served
+        missing = len(transport.missing)
+    # tracemalloc slows allocation-heavy code, so memory gets its own run
+    _, _, _, peak = one_run(measure_memory=True)
+
+    wall = statistics.median(walls)
+    return {
+        "site": site,
+        "engine": spec.engine,
+        "parser": html_parser.resolve(parser),
+        "listings": listings,
+        "pages": pages,
+        "missing_pages": missing,
+        "wall_seconds": round(wall, 4),
+        "best_wall_seconds": round(min(walls), 4),
+        "parse_seconds": round(statistics.median(parse_seconds), 4),
+        "listings_per_second": round(listings / wall, 1) if wall else None,
+        "ms_per_page": round(1000 * wall / pages, 2) if pages else None,
+        "peak_memory_mib": round(peak / (1024 * 1024), 2),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Parser differential
+# ---------------------------------------------------------------------------
+def _records(fixture: SiteFixture, scraper, parser: str, partial: bool = True) -> List[Dict[str, str]]:
+    engine = FetchEngine(transport=FixtureTransport(fixture, None))
+    config = _site_config(fixture.config(), engine, parser)
+    config["partial_parse"] = partial
+    try:
+        with run_metrics.collecting(SiteMetrics(fixture.site)):
+            df = scraper(config)
+    finally:
+        engine.close()
+    if df is None:
+        return []
+    return df.fillna("").astype(str).to_dict("records")
+
+
+def parser_diff_site(fixture: SiteFixture, backends: List[str]) -> Dict[str, Any]:
+    """Compare each backend's container-only records with full-page ones from the default backend."""
+    site = fixture.site
+    spec = registry.find(site)
+    if not _benchable(site, spec):
+        return {"site": site, "skipped": "no scraper registered" if spec is None else "Selenium scraper"}
+    scraper = _entry(site, spec)
+    if scraper is None:
+        return {"site": site, "skipped": "scraper failed to import"}
+
+    reference = _records(fixture, scraper, html_parser.DEFAULT, partial=False)
+    result = {"site": site, "records": len(reference), "differences": {}}
+    for backend in backends:
+        records = _records(fixture, scraper, backend)
+        differences = []
+        if len(records) != len(reference):
+            differences.append(f"{len(records)} records vs {len(reference)}")
+        for i, (expected, actual) in enumerate(zip(reference, records)):
+            for column in sorted(set(expected) | set(actual)):
+                if expected.get(column) != actual.get(column):
+                    differences.append(f"record {i} {column}: {expected.get(column)!r} != {actual.get(column)!r}")
+        if differences:
+            result["differences"][backend] = differences
+    return result
+
+
+def parser_diff(corpus: Dict[str, SiteFixture]) -> int:
+    backends = html_parser.available_backends()
+    print(f"Comparing container-only parses on {', '.join(backends)} against full {html_parser.DEFAULT} trees")
+    failed = 0
+    for fixture in corpus.values():
+        r = parser_diff_site(fixture, backends)
+        if "skipped" in r:
+            print(f"{r['site']:<42} skipped: {r['skipped']}")
+            continue
+        if not r["differences"]:
+            print(f"{r['site']:<42} identical ({r['records']} records)")
+            continue
+        failed += 1
+        for backend, differences in r["differences"].items():
+            print(f"{r['site']:<42} {backend}: {len(differences)} differences")
+            for line in differences[:10]:
+                print(f"    {line}")
+    return 1 if failed else 0
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    header = f"{'site':<42} {'listings':>8} {'pages':>6} {'wall s':>8} {'lst/s':>8} {'ms/page':>8} {'peak MiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['site']:<42} skipped: {r['skipped']}")
+            continue
+        print(f"{r['site']:<42} {r['listings']:>8} {r['pages']:>6} {r['wall_seconds']:>8.3f} "
+              f"{r['listings_per_second'] or 0:>8.1f} {r['ms_per_page'] or 0:>8.2f} {r['peak_memory_mib']:>9.2f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against the offline fixture corpus")
+    parser.add_argument("--capture", action="store_true", help="record fixtures from the live sites instead")
+    parser.add_argument("--sitelist", default="sitelist.csv", help="sitelist to take URLs from when capturing")
+    parser.add_argument("--html", action="append", default=[], metavar="SITE=PATH[,PATH]",
+                        help="saved HTML for a local-file scraper (capture only; repeatable)")
+    parser.add_argument("--fixtures", default=FIXTURE_ROOT, help="fixture corpus directory")
+    parser.add_argument("--site", action="append", default=[], help="limit to this site (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per scraper; the median is reported")
+    parser.add_argument("--serve", action="store_true", help="replay through a local stand-in HTTP server")
+    parser.add_argument("--per-host", type=int, default=4, help="fetch engine per-host cap during replay")
+    parser.add_argument("--json", default=None, metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--parser", default=html_parser.DEFAULT, choices=("auto",) + html_parser.BACKENDS,
+                        help="HTML parser backend the scrapers use during replay (default: %(default)s)")
+    parser.add_argument("--parser-diff", action="store_true",
+                        help="compare the scrapers' records across every installed HTML parser backend")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.capture:
+        html_inputs = {}
+        for item in args.html:
+            site, _, paths = item.partition("=")
+            html_inputs[site] = [p for p in paths.split(",") if p]
+        capture(args.sitelist, args.site, html_inputs, args.fixtures)
+        return
+
+    corpus = load_corpus(args.fixtures)
+    if args.site:
+        corpus = {name: f for name, f in corpus.items() if name in args.site}
+    if not corpus:
+        print(f"No fixtures under {args.fixtures}; record some with --capture first.")
+        return
+    if args.parser_diff:
+        return parser_diff(corpus)
+
+    def run_all(server_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [bench_site(fixture, args.repeat, server_url, args.per_host, args.parser)
+                for fixture in corpus.values()]
+
+    # Sites without a fixture are listed too, so gaps in the corpus stay visible
+    results = []
+    if args.serve:
+        with StandInServer(args.fixtures) as server:
+            results = run_all(server.url)
+    else:
+        results = run_all()
+    for site_name, spec in registry.SCRAPERS.items():
+        if site_name not in corpus and (not args.site or site_name in args.site):
+            reason = "no fixture captured" if _benchable(site_name, spec) else "Selenium scraper drives a live browser"
+            results.append({"site": site_name, "skipped": reason})
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
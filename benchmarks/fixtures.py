@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import requests
+
+from cassette import make_response
+
+# ---------------------------------------------------------------------------
+# Offline fixture corpus
+#
+# One directory per site under benchmarks/fixtures/:
+#
+#     <slug>/manifest.json   site name, engine, listing/base URL, headers,
+#                            extra config (local HTML inputs), the number
+#                            of listings the capture run returned, and a
+#                            map of every URL the scraper fetched to its
+#                            page file
+#     <slug>/pages/0001.html ...
+#
+# RecordingTransport fills a corpus from a live run; FixtureTransport serves
+# it back through the fetch engine, either straight from disk or through a
+# local stand-in HTTP server so the full requests stack is exercised.
+# ---------------------------------------------------------------------------
+
+FIXTURE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def slug(site_name: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", site_name.lower()).strip("_")
+
+
+class SiteFixture:
+    """A site's manifest plus its stored pages."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+
+    @property
+    def site(self) -> str:
+        return self.manifest["site"]
+
+    def config(self) -> Dict[str, Any]:
+        """Scraper config fields stored with the fixture, local file paths made absolute."""
+        config = {
+            "listing_url": self.manifest.get("listing_url", ""),
+            "base_url": self.manifest.get("base_url", ""),
+            "headers": self.manifest.get("headers", {}),
+        }
+        for key, value in self.manifest.get("config", {}).items():
+            if isinstance(value, list):
+                config[key] = [os.path.join(self.directory, v) for v in value]
+            else:
+                config[key] = os.path.join(self.directory, value)
+        return config
+
+    def page(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.manifest.get("pages", {}).get(url)
+
+    def page_path(self, entry: Dict[str, Any]) -> str:
+        return os.path.join(self.directory, entry["file"])
+
+
+def load_corpus(root: str = FIXTURE_ROOT) -> Dict[str, SiteFixture]:
+    """Every site fixture under ``root``, keyed by site name."""
+    corpus: Dict[str, SiteFixture] = {}
+    if not os.path.isdir(root):
+        return corpus
+    for name in sorted(os.listdir(root)):
+        if os.path.exists(os.path.join(root, name, "manifest.json")):
+            fixture = SiteFixture(os.path.join(root, name))
+            corpus[fixture.site] = fixture
+    return corpus
+
+
+class FixtureTransport:
+    """
+    Fetch-engine transport that answers from a site fixture.
+
+    With ``server_url`` set, pages are requested from the stand-in server
+    instead of read from disk. URLs missing from the manifest get a 404.
+    """
+
+    def __init__(self, fixture: SiteFixture, server_url: Optional[str] = None):
+        self.fixture = fixture
+        self.server_url = server_url
+        self.served = 0
+        self.missing: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                 **kwargs) -> requests.Response:
+        entry = self.fixture.page(url)
+        with self._lock:
+            if entry is None:
+                self.missing.append(url)
+            else:
+                self.served += 1
+        if entry is None:
+            return make_response(url, b"", status=404)
+        if self.server_url:
+            local_url = f"{self.server_url}/{quote(os.path.basename(self.fixture.directory))}/{entry['file']}"
+            response = requests.get(local_url, headers=headers, timeout=timeout)
+            response.status_code = entry.get("status", 200)
+            response.url = url
+            response.encoding = entry.get("encoding")
+            return response
+        with open(self.fixture.page_path(entry), "rb") as f:
+            body = f.read()
+        return make_response(url, body, entry.get("status", 200), entry.get("encoding"),
+                             {"Content-Type": entry.get("content_type", "text/html")})
+
+
+class RecordingTransport:
+    """Fetch-engine transport that performs live GETs and stores each response in a new site fixture."""
+
+    def __init__(self, directory: str, site: str, engine: str, base_config: Dict[str, Any]):
+        self.directory = directory
+        self.manifest: Dict[str, Any] = {
+            "site": site,
+            "engine": engine,
+            "listings": None,
+            "listing_url": base_config.get("listing_url", ""),
+            "base_url": base_config.get("base_url", ""),
+            "headers": base_config.get("headers", {}),
+            "config": {},
+            "pages": {},
+        }
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+
+    def __call__(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                 **kwargs) -> requests.Response:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        with self._lock:
+            pages = self.manifest["pages"]
+            if url not in pages:
+                name = f"pages/{len(pages) + 1:04d}.html"
+                with open(os.path.join(self.directory, name), "wb") as f:
+                    f.write(response.content)
+                pages[url] = {
+                    "file": name,
+                    "status": response.status_code,
+                    "encoding": response.encoding,
+                    "content_type": response.headers.get("Content-Type", "text/html"),
+                }
+        return response
+
+    def add_local_input(self, key: str, paths: List[str], as_list: bool) -> None:
+        """Copy the saved HTML a local-file scraper reads into the fixture."""
+        names = []
+        for path in paths:
+            name = f"pages/{os.path.basename(path)}"
+            shutil.copyfile(path, os.path.join(self.directory, name))
+            names.append(name)
+        self.manifest["config"][key] = names if as_list else names[0]
+
+    def save(self) -> None:
+        with open(os.path.join(self.directory, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        logging.info("Saved %d pages for %s to %s", len(self.manifest["pages"]), self.manifest["site"],
+                     self.directory)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer:
+    """Serves the fixture root over HTTP on 127.0.0.1 for the duration of a ``with`` block."""
+
+    def __init__(self, root: str = FIXTURE_ROOT):
+        self.root = root
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StandInServer":
+        handler = lambda *args, **kwargs: _QuietHandler(*args, directory=self.root, **kwargs)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,354 @@
+import functools
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+import run_metrics
+
+# ---------------------------------------------------------------------------
+# Shared Chrome pool for the Selenium scrapers
+#
+# main owns one BrowserPool and puts it in every scraper config. A scraper
+# takes a driver with get_driver(config) and gives it back with
+# release(config, driver) instead of starting and quitting its own Chrome.
+# Each lease gets a fresh tab with the cookies cleared, so sites never see
+# each other's state, while the browser process and its HTTP cache are
+# reused across sites.
+#
+# A browser is retired after ``max_pages`` page loads or once its process
+# tree passes ``max_rss_mb``. A driver that is never returned (its scraper
+# raised first) is reclaimed by main after the site finishes, and retiring
+# a browser kills any Chrome processes that outlive driver.quit().
+#
+# Without a pool in the config (standalone runs) get_driver() starts a
+# private Chrome and release() quits it, as the scrapers used to.
+#
+# Every browser, pooled or private, runs the same lean profile: headless,
+# the "eager" page-load strategy (driver.get returns at DOMContentLoaded;
+# the waits module covers whatever renders later), and images, media,
+# fonts and known tracker hosts blocked through CDP request interception.
+# Stylesheets are kept: visibility checks such as element_to_be_clickable
+# depend on layout. What the blocking saved is estimated from Chrome's
+# performance log and added to the site's run metrics.
+# ---------------------------------------------------------------------------
+
+# Dropped before they reach the network; matched by Network.setBlockedURLs
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg", "*.mov",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*hs-analytics.net*",
+    "*hs-scripts.com*", "*segment.com*", "*newrelic.com*", "*nr-data.net*", "*youtube.com/embed*",
+    "*frog.wix.com*", "*static.ads-twitter.com*", "*bat.bing.com*",
+]
+
+# Typical transfer size by resource type, to estimate what a blocked request would have cost
+TYPICAL_BYTES = {"Image": 45_000, "Media": 400_000, "Font": 35_000, "Script": 60_000}
+DEFAULT_TYPICAL_BYTES = 20_000
+
+
+@functools.lru_cache(maxsize=1)
+def _driver_path() -> Optional[str]:
+    """chromedriver location, resolved once per process instead of once per scraper."""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+    except Exception as e:
+        # Selenium Manager (selenium >= 4.6) finds or downloads a driver itself
+        logging.debug(f"webdriver_manager unavailable ({e}); leaving chromedriver to Selenium")
+        return None
+
+
+def chrome_options() -> Options:
+    options = Options()
+    options.add_argument("--headless=new")
+    options.page_load_strategy = "eager"
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+def block_resources(driver: webdriver.Chrome) -> None:
+    """Apply the blocklist to the current tab; CDP settings do not carry over to new tabs."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+
+def start_browser() -> webdriver.Chrome:
+    path = _driver_path()
+    service = Service(path) if path else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options())
+    block_resources(driver)
+    return driver
+
+
+def network_log(driver: webdriver.Chrome) -> List[Dict[str, Any]]:
+    """
+    The performance log entries of the current lease so far. Chrome hands
+    each entry out once, so they are buffered on the driver for every reader
+    (API discovery, then record_savings) to see.
+    """
+    buffered = getattr(driver, "_scraper_network_log", None)
+    if buffered is None:
+        buffered = []
+        driver._scraper_network_log = buffered
+    try:
+        buffered.extend(driver.get_log("performance"))
+    except Exception as e:
+        logging.debug(f"No performance log: {e}")
+    return buffered
+
+
+def record_savings(driver: webdriver.Chrome) -> None:
+    """
+    Add what was downloaded and blocked during the lease to the current
+    site's metrics and clear the log buffer. Blocked bytes are priced at
+    ``TYPICAL_BYTES``; time saved at the throughput this session achieved.
+    """
+    entries = list(network_log(driver))
+    driver._scraper_network_log = []
+    downloaded, blocked, blocked_bytes = 0, 0, 0
+    started: Dict[str, float] = {}
+    busy = 0.0
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            started[params.get("requestId")] = params.get("timestamp", 0.0)
+        elif method == "Network.loadingFinished":
+            downloaded += int(params.get("encodedDataLength", 0))
+            began = started.pop(params.get("requestId"), None)
+            if began is not None:
+                busy += max(0.0, params.get("timestamp", began) - began)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+            blocked_bytes += TYPICAL_BYTES.get(params.get("type"), DEFAULT_TYPICAL_BYTES)
+    # Summed per-request times overstate the wall time, so this errs on the low side
+    throughput = downloaded / busy if busy > 0 else 0.0
+    seconds = blocked_bytes / throughput if throughput else 0.0
+    run_metrics.record_browser_traffic(downloaded, blocked, blocked_bytes, seconds)
+
+
+# ---------------------------------------------------------------------------
+# Process tree helpers (Linux /proc; elsewhere they find nothing)
+# ---------------------------------------------------------------------------
+def _children() -> Dict[int, List[int]]:
+    tree: Dict[int, List[int]] = {}
+    try:
+        pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return tree
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # The command name may contain spaces; fields resume after its ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        tree.setdefault(ppid, []).append(pid)
+    return tree
+
+
+def _process_tree(root: int) -> List[int]:
+    tree = _children()
+    pids, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(tree.get(pid, []))
+    return pids
+
+
+def _tree_rss_mb(root: int) -> float:
+    total = 0
+    for pid in _process_tree(root):
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) if total else 0.0
+
+
+def _service_pid(driver: webdriver.Chrome) -> Optional[int]:
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def quit_browser(driver: webdriver.Chrome) -> None:
+    """Quit ``driver`` and kill whatever part of its Chrome process tree survives."""
+    root = _service_pid(driver)
+    # Collected first: once chromedriver exits its children are re-parented and lost
+    pids = _process_tree(root) if root else []
+    try:
+        driver.quit()
+    except Exception as e:
+        logging.warning(f"driver.quit() failed: {e}")
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (OSError, AttributeError):
+            pass
+
+
+class _Browser:
+    """One Chrome with its page-load count."""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages = 0
+        self.started = time.time()
+
+
+class BrowserPool:
+    """Up to ``size`` Chrome instances lent out one site at a time."""
+
+    def __init__(self, size: int = 2, max_pages: int = 300, max_rss_mb: Optional[float] = 1500):
+        """
+        Args:
+            size: Browsers alive at once; leases beyond that wait.
+            max_pages: Page loads after which a browser is replaced.
+            max_rss_mb: Resident memory of a browser's process tree past
+                which it is replaced.
+        """
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: List[_Browser] = []
+        self._leased: Dict[int, _Browser] = {}
+        self._owners: Dict[int, int] = {}
+        self.started = 0
+        self.retired = 0
+
+    def acquire(self) -> webdriver.Chrome:
+        """A driver on a fresh tab with no cookies; blocks while all browsers are leased."""
+        self._slots.acquire()
+        try:
+            with self._lock:
+                browser = self._idle.pop() if self._idle else None
+            if browser is not None:
+                try:
+                    self._reset(browser)
+                except Exception as e:
+                    logging.warning(f"Idle browser unusable ({e}); starting a new one")
+                    quit_browser(browser.driver)
+                    browser = None
+            if browser is None:
+                browser = _Browser(start_browser())
+                with self._lock:
+                    self.started += 1
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._leased[id(browser.driver)] = browser
+            self._owners[id(browser.driver)] = threading.get_ident()
+        return browser.driver
+
+    def _reset(self, browser: _Browser) -> None:
+        driver = browser.driver
+        old_handles = list(driver.window_handles)
+        driver.switch_to.new_window("tab")
+        fresh = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh)
+        # delete_all_cookies() only reaches the current origin; this clears every site's
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        block_resources(driver)
+        # Whatever the previous site left in the log is not this site's traffic
+        driver.get_log("performance")
+        driver._scraper_network_log = []
+
+    def release(self, driver: webdriver.Chrome, broken: bool = False) -> None:
+        """Return a leased driver; a broken or worn-out browser is retired instead."""
+        with self._lock:
+            browser = self._leased.pop(id(driver), None)
+            self._owners.pop(id(driver), None)
+        if browser is None:
+            return
+        try:
+            if not broken:
+                record_savings(driver)
+                try:
+                    browser.pages += int(driver.execute_script("return window.history.length") or 1)
+                except Exception:
+                    broken = True
+            root = _service_pid(driver)
+            rss = _tree_rss_mb(root) if root and self.max_rss_mb and not broken else 0.0
+            if broken or browser.pages >= self.max_pages or (self.max_rss_mb and rss > self.max_rss_mb):
+                logging.info(f"Retiring browser after {browser.pages} pages ({rss:.0f} MiB)"
+                             f"{' as broken' if broken else ''}")
+                quit_browser(driver)
+                with self._lock:
+                    self.retired += 1
+            else:
+                with self._lock:
+                    self._idle.append(browser)
+        finally:
+            self._slots.release()
+
+    def reclaim(self) -> None:
+        """Retire every driver the calling thread still holds (its scraper raised before releasing)."""
+        me = threading.get_ident()
+        with self._lock:
+            stranded = [self._leased[d].driver for d, owner in self._owners.items() if owner == me]
+        for driver in stranded:
+            logging.warning("Reclaiming a browser its scraper never released")
+            self.release(driver, broken=True)
+
+    @contextmanager
+    def lease(self) -> Iterator[webdriver.Chrome]:
+        driver = self.acquire()
+        ok = False
+        try:
+            yield driver
+            ok = True
+        finally:
+            self.release(driver, broken=not ok)
+
+    def close(self) -> None:
+        with self._lock:
+            browsers = self._idle + list(self._leased.values())
+            self._idle, self._leased, self._owners = [], {}, {}
+        for browser in browsers:
+            quit_browser(browser.driver)
+        logging.info(f"Browser pool: {self.started} browsers started, {self.retired} retired early")
+
+
+def get_driver(config: Dict[str, Any]) -> webdriver.Chrome:
+    """A driver from ``config["browser_pool"]``, or a private Chrome for standalone runs."""
+    pool: Optional[BrowserPool] = config.get("browser_pool")
+    if pool is not None:
+        return pool.acquire()
+    return start_browser()
+
+
+def release(config: Dict[str, Any], driver: webdriver.Chrome) -> None:
+    """Counterpart of ``get_driver``: back to the pool, or quit when private."""
+    pool: Optional[BrowserPool] = config.get("browser_pool")
+    if pool is not None:
+        pool.release(driver)
+    else:
+        record_savings(driver)
+        quit_browser(driver)
@@ -0,0 +1,135 @@
+import base64
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+# ---------------------------------------------------------------------------
+# HTTP cassettes
+#
+# A cassette is a directory of gzip-compressed JSON-lines shards, one per
+# recording process, each line one GET and its full response. In "record"
+# mode the Cassette is a fetch-engine transport that forwards every request
+# and stores the response; in "replay" mode it answers from the recording
+# without touching the network, so a whole monthly run can be repeated
+# offline at full speed.
+#
+# Every record is written as its own gzip member, so a shard cut short by a
+# crash still replays up to its last complete response.
+# ---------------------------------------------------------------------------
+
+
+def make_response(url: str, body: bytes, status: int = 200, encoding: Optional[str] = None,
+                  headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    """A real ``requests.Response`` carrying ``body``, as the scrapers expect."""
+    response = requests.Response()
+    response._content = body
+    response.status_code = status
+    response.url = url
+    response.encoding = encoding
+    response.headers.update(headers or {"Content-Type": "text/html"})
+    return response
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised on replay for a URL the cassette never recorded."""
+
+
+class Cassette:
+    """Record/replay transport for the fetch engine."""
+
+    def __init__(self, path: str, mode: str = "replay", transport=None):
+        """
+        Args:
+            path: Cassette directory.
+            mode: "record" or "replay".
+            transport: What a recording forwards to. Defaults to ``requests.get``.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.transport = transport or requests.get
+        self._init_runtime()
+        if mode == "record":
+            os.makedirs(path, exist_ok=True)
+        elif not os.path.isdir(path):
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+    def _init_runtime(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._served: Dict[str, int] = defaultdict(int)
+        self.recorded = 0
+        self.misses = 0
+
+    # Cassettes travel inside the fetch engine to worker processes; each
+    # process records its own shard and loads its own replay index.
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"path": self.path, "mode": self.mode, "transport": self.transport}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def __call__(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                 **kwargs) -> requests.Response:
+        if self.mode == "replay":
+            return self._replay(url)
+        response = self.transport(url, headers=headers, timeout=timeout, **kwargs)
+        self._record(url, response)
+        return response
+
+    # -- recording ---------------------------------------------------------
+    def _shard_path(self) -> str:
+        return os.path.join(self.path, f"{os.getpid()}.jsonl.gz")
+
+    def _record(self, url: str, response: requests.Response) -> None:
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "encoding": response.encoding,
+            "headers": dict(response.headers),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "body": base64.b64encode(response.content or b"").decode("ascii"),
+        }
+        member = gzip.compress((json.dumps(entry) + "\n").encode("utf-8"))
+        with self._lock:
+            with open(self._shard_path(), "ab") as f:
+                f.write(member)
+            self.recorded += 1
+
+    # -- replay ------------------------------------------------------------
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for shard in sorted(glob.glob(os.path.join(self.path, "*.jsonl.gz"))):
+            try:
+                with gzip.open(shard, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        entries[entry["url"]].append(entry)
+            except (EOFError, OSError, ValueError) as e:
+                logging.warning(f"Stopped reading truncated cassette shard {shard}: {e}")
+        logging.info(f"Loaded {sum(len(v) for v in entries.values())} responses from cassette {self.path}")
+        return entries
+
+    def _replay(self, url: str) -> requests.Response:
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            recorded = self._entries.get(url)
+            if not recorded:
+                self.misses += 1
+                raise CassetteMiss(f"{url} is not in cassette {self.path}")
+            # Repeated GETs of one URL replay in recorded order; the last one repeats
+            entry = recorded[min(self._served[url], len(recorded) - 1)]
+            self._served[url] += 1
+        return make_response(url, base64.b64decode(entry["body"]), entry["status"], entry["encoding"],
+                             entry["headers"])
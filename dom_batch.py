@@ -0,0 +1,102 @@
+from typing import Dict, List, Optional
+
+# ---------------------------------------------------------------------------
+# One-round-trip DOM extraction for the Selenium scrapers
+#
+# Every find_element() and .text is a separate WebDriver command, so a card
+# loop costs cards x fields round trips to the browser, and page_source
+# serialises the whole document (scripts, styles, navigation) only for
+# BeautifulSoup to throw most of it away. The helpers here run a single
+# execute_script per page instead:
+#
+#     extract()     -- every card's fields as a list of dicts, for scrapers
+#                      that read the cards through Selenium
+#     outer_html()  -- just the listing cards' outerHTML, for scrapers that
+#                      parse with BeautifulSoup
+#
+# A field is a CSS selector or an XPath relative to the card, the same
+# strings the scrapers used with find_element(); values are the element's
+# trimmed innerText (what WebElement.text returns) or one of its attributes.
+# ---------------------------------------------------------------------------
+
+_EXTRACT_JS = """
+const cards = document.querySelectorAll(arguments[0]);
+const fields = arguments[1];
+const results = [];
+for (const card of cards) {
+    const row = {};
+    for (const [name, spec] of Object.entries(fields)) {
+        let el = null;
+        try {
+            if (spec.xpath) {
+                el = document.evaluate(spec.xpath, card, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)
+                    .singleNodeValue;
+            } else {
+                el = spec.css ? card.querySelector(spec.css) : card;
+            }
+        } catch (e) {
+            el = null;
+        }
+        let value = null;
+        if (el) {
+            value = spec.attr ? el.getAttribute(spec.attr) : (el.innerText || el.textContent);
+        }
+        row[name] = value == null ? null : String(value).trim();
+    }
+    results.push(row);
+}
+return results;
+"""
+
+_OUTER_HTML_JS = """
+return Array.from(document.querySelectorAll(arguments[0]), el => el.outerHTML).join("\\n");
+"""
+
+
+def field(css: Optional[str] = None, xpath: Optional[str] = None, attr: Optional[str] = None) -> Dict[str, str]:
+    """
+    Describe one card field.
+
+    Args:
+        css: Selector relative to the card; omit both ``css`` and ``xpath``
+            to read the card element itself.
+        xpath: XPath relative to the card (``.//td[...]``), for lookups CSS
+            cannot express, such as a label's following sibling.
+        attr: Read this attribute instead of the element's text.
+    """
+    spec = {}
+    if css:
+        spec["css"] = css
+    if xpath:
+        spec["xpath"] = xpath
+    if attr:
+        spec["attr"] = attr
+    return spec
+
+
+def extract(driver, card_selector: str, fields: Dict[str, Dict[str, str]],
+            default: str = "") -> List[Dict[str, str]]:
+    """
+    Read every card's fields in one ``execute_script``.
+
+    Args:
+        driver: The Selenium driver, on the page to read.
+        card_selector: CSS selector matching one element per listing card.
+        fields: Output name -> ``field(...)`` spec.
+        default: Value for a field whose element is missing or has no text,
+            matching what the scraper's old try/except fallback returned.
+
+    Returns:
+        One dict per card, in document order.
+    """
+    rows = driver.execute_script(_EXTRACT_JS, card_selector, fields) or []
+    return [{name: row.get(name) or default for name in fields} for row in rows]
+
+
+def outer_html(driver, selector: str) -> str:
+    """
+    The outerHTML of every element matching ``selector``, joined, in one
+    ``execute_script``. Feed it to BeautifulSoup in place of ``page_source``;
+    selectors that matched inside the page still match inside the fragment.
+    """
+    return driver.execute_script(_OUTER_HTML_JS, selector) or ""
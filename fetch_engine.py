@@ -0,0 +1,251 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+from urllib.parse import urlsplit
+
+import requests
+
+import run_metrics
+from http_client import HttpClient
+from rate_limit import RateLimiter
+
+# ---------------------------------------------------------------------------
+# Shared fetch engine for the requests-based scrapers
+#
+# Scrapers keep doing their own parsing; they only hand their URLs to the
+# engine. Requests run on an asyncio loop whose blocking transport calls are
+# spread over a thread pool, with a per-host cap that holds across every
+# site and thread using the same engine. An optional RateLimiter paces each
+# host; async fetches wait for it on the loop, not in a pool thread.
+#
+# Async fetches also queue for their host slot on the loop: a request is
+# handed to the pool only once it may be sent, so a URL waiting behind the
+# cap holds no thread and its deadline has not started yet.
+# ---------------------------------------------------------------------------
+
+Transport = Callable[..., requests.Response]
+T = TypeVar("T")
+
+# How often a coroutine at the head of its host's queue retries for a slot
+# held by another thread or event loop
+SLOT_POLL = 0.01
+
+
+class FetchEngine:
+    """Concurrent GETs with per-host concurrency caps and timeouts."""
+
+    def __init__(self, transport: Optional[Transport] = None, per_host: int = 4,
+                 timeout: float = 20.0, deadline: Optional[float] = None, max_workers: int = 32,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            transport: Callable with the ``requests.get(url, headers=, timeout=)``
+                signature. Defaults to a pooled ``HttpClient`` the engine owns.
+            per_host: Maximum requests in flight to any one host.
+            timeout: Connect/read timeout handed to the transport.
+            deadline: For async fetches, how long the caller waits for a
+                request once it has been sent (time queued for the host cap
+                or the rate limit does not count). Defaults to twice
+                ``timeout``. The transport's timeout is capped at it, but a
+                transport that retries keeps going after the caller has
+                given up; the abandoned request keeps its pool thread and
+                host slot until it ends, and its response is dropped.
+            max_workers: Size of the thread pool running transport calls.
+            limiter: Per-host politeness limiter consulted before every request.
+        """
+        self._owns_transport = transport is None
+        self.transport = transport or HttpClient()
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_workers = max_workers
+        self.limiter = limiter
+        self._init_runtime()
+
+    def _init_runtime(self) -> None:
+        self._lock = threading.Lock()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        # Event loop -> host -> queue of that loop's coroutines waiting for the host
+        self._loop_queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # Engines travel inside scraper configs, which may be pickled for worker
+    # processes; locks and threads are rebuilt on the other side.
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for key in ("_lock", "_host_slots", "_loop_queues", "_executor"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _loop_queue(self, loop: asyncio.AbstractEventLoop, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            queues = self._loop_queues.setdefault(loop, {})
+            if host not in queues:
+                queues[host] = asyncio.Semaphore(self.per_host)
+            return queues[host]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+            return self._executor
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        """Blocking GET that honours the rate limit and the per-host cap."""
+        if self.limiter is not None:
+            self.limiter.wait(url)
+        return self._get(url, headers, timeout)
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]], timeout: Optional[float]) -> requests.Response:
+        with self._slot(url):
+            return self._send(url, headers, timeout)
+
+    def _send(self, url: str, headers: Optional[Dict[str, str]], timeout: Optional[float]) -> requests.Response:
+        """One transport call; the caller holds the host slot."""
+        started = time.perf_counter()
+        try:
+            response = self.transport(url, headers=headers or {},
+                                      timeout=timeout if timeout is not None else self.timeout)
+        except Exception:
+            run_metrics.record_fetch(time.perf_counter() - started, 0, ok=False)
+            raise
+        # Bodies the HTTP cache revalidated with a 304 were not downloaded
+        nbytes = 0 if getattr(response, "from_cache", False) else len(response.content or b"")
+        run_metrics.record_fetch(time.perf_counter() - started, nbytes)
+        return response
+
+    async def aget(self, url: str, headers: Optional[Dict[str, str]] = None,
+                   timeout: Optional[float] = None) -> requests.Response:
+        """Awaitable GET; raises ``asyncio.TimeoutError`` once sent and past the deadline."""
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = self.deadline if self.deadline is not None else 2 * timeout
+        if self.limiter is not None:
+            # Throttled hosts wait here, leaving the pool free for other hosts
+            await self.limiter.await_turn(url)
+        loop = asyncio.get_running_loop()
+        slot = self._slot(url)
+        # This loop's requests queue in order; the head polls for a slot that
+        # sync callers and other loops share
+        async with self._loop_queue(loop, url):
+            while not slot.acquire(blocking=False):
+                await asyncio.sleep(SLOT_POLL)
+            # Carry the caller's context (the current site's metrics) into the worker thread
+            context = contextvars.copy_context()
+            try:
+                call = self._pool().submit(context.run, self._send, url, headers, min(timeout, deadline))
+            except BaseException:
+                slot.release()
+                raise
+            # Freed when the transport returns, not when the caller stops waiting
+            call.add_done_callback(lambda _: slot.release())
+            return await asyncio.wait_for(asyncio.wrap_future(call), deadline)
+
+    async def aget_all(self, urls: Sequence[str], headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional[float] = None) -> List[Union[requests.Response, BaseException]]:
+        return await asyncio.gather(*(self.aget(u, headers, timeout) for u in urls), return_exceptions=True)
+
+    def get_all(self, urls: Sequence[str], headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> List[Union[requests.Response, BaseException]]:
+        """
+        Fetch every URL concurrently.
+
+        Returns one entry per URL, in input order: the response, or the
+        exception that fetching it raised.
+        """
+        if not urls:
+            return []
+        return asyncio.run(self.aget_all(urls, headers, timeout))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        if self._owns_transport and hasattr(self.transport, "close"):
+            self.transport.close()
+
+
+_default_engine: Optional[FetchEngine] = None
+_default_lock = threading.Lock()
+
+
+def get_engine(config: Dict[str, Any]) -> FetchEngine:
+    """The engine main put in ``config``, or a process-wide default for standalone runs."""
+    engine = config.get("fetch_engine")
+    if engine is not None:
+        return engine
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = FetchEngine()
+        return _default_engine
+
+
+def fetch(config: Dict[str, Any], url: str, headers: Optional[Dict[str, str]] = None,
+          timeout: Optional[float] = None) -> requests.Response:
+    """Drop-in for ``requests.get`` inside a scraper; uses ``config["headers"]`` by default."""
+    return get_engine(config).get(url, headers if headers is not None else config.get("headers", {}), timeout)
+
+
+def fetch_all(config: Dict[str, Any], urls: Sequence[str], headers: Optional[Dict[str, str]] = None,
+              timeout: Optional[float] = None) -> List[Union[requests.Response, BaseException]]:
+    """Concurrent ``fetch`` of many URLs; see ``FetchEngine.get_all``."""
+    results = get_engine(config).get_all(urls, headers if headers is not None else config.get("headers", {}), timeout)
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            logging.debug("Fetch failed for %s: %s", url, result)
+    return results
+
+
+def fan_out(config: Dict[str, Any], work: Callable[[Any], T], items: Sequence[Any],
+            max_workers: Optional[int] = None) -> List[Union[T, BaseException]]:
+    """
+    Run ``work(item)`` for every item on a bounded thread pool.
+
+    Meant for per-listing detail enrichment: ``work`` fetches (through
+    ``fetch``, so the per-host cap and rate limit hold) and parses one page.
+
+    Args:
+        config: The scraper config, for its fetch engine.
+        work: Called once per item, from a pool thread.
+        items: The inputs, in the order results should come back.
+        max_workers: Pool size. Defaults to the engine's per-host cap, since
+            detail pages of one site all share a host.
+
+    Returns:
+        One entry per item, in input order: what ``work`` returned, or the
+        exception it raised.
+    """
+    if not items:
+        return []
+    workers = max_workers or getattr(get_engine(config), "per_host", 4)
+
+    def run(item):
+        try:
+            return work(item)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items)), thread_name_prefix="details") as pool:
+        # Each call carries the caller's context, so fetches count toward its site
+        futures = [pool.submit(contextvars.copy_context().run, run, item) for item in items]
+        return [f.result() for f in futures]
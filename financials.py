@@ -0,0 +1,114 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Shared financial-figure extraction
+#
+# Listing text names its figures with a handful of labels ("Asking Price:",
+# "Gross Revenue", "SDE", "Nets") followed by an amount. extract() finds
+# every label in one pass of a single precompiled pattern -- one named
+# group per label -- and then reads the value right after each label it
+# hit, so a scraper gets all its metrics for the cost of one scan instead
+# of a search per pattern per metric.
+#
+# Within a metric, labels carry a rank: a lower rank wins even when it
+# appears later in the text (a fiscal-year revenue line beats a bare
+# "revenue"), and among labels of the same rank the first one in the text
+# wins. A label only counts when a value follows it in the chosen mode:
+#
+#     amount  -- "$" and a number right after the label: "Price: $450,000"
+#     number  -- a number right after the label, "$" optional: "Nets 120,000"
+#     loose   -- the first "$" amount later on the same line:
+#                "EBITDA for 2023 was $1.2mm"
+#     line    -- the rest of the line after "label:", whatever it says:
+#                "Net Profit: Ask broker"
+#     field   -- like line, but stopping where the next label starts:
+#                "Price: Call broker Nets $90,000" gives "Call broker"
+#
+# Amounts are returned without the "$" ("450,000", "1.2mm", "500k").
+# ---------------------------------------------------------------------------
+
+# (metric, rank, label regex); matched case-insensitively, never inside a longer word,
+# but digits may touch a label ("Listing #12Price:" from get_text(strip=True))
+LABELS: List[Tuple[str, int, str]] = [
+    ("asking_price", 0, r"asking\s+price"),
+    ("asking_price", 0, r"list(?:ing)?\s+price"),
+    ("asking_price", 0, r"price"),
+    ("asking_price", 0, r"asking"),
+    ("asking_price", 0, r"ask"),
+    ("monthly_sales", 0, r"monthly\s+sales"),
+    ("revenue", 0, r"F20\d{2}\s+revenue"),
+    ("revenue", 1, r"(?:annual|gross|total)\s+revenue"),
+    ("revenue", 1, r"revenue"),
+    ("revenue", 2, r"(?:annual|gross|total)\s+sales"),
+    ("revenue", 2, r"sales"),
+    ("ebitda", 0, r"(?:adjusted\s+)?ebitda"),
+    ("ebit", 0, r"ebit"),
+    ("sde", 0, r"sde"),
+    ("sde", 1, r"seller[’']?s\s+discretionary\s+earnings"),
+    ("sde", 2, r"discretionary\s+earnings"),
+    ("cash_flow", 0, r"normalized\s+cash\s+flow"),
+    ("cash_flow", 1, r"cash\s+flow"),
+    ("gross_profit", 0, r"gross\s+profit"),
+    ("net_profit", 0, r"(?:net|adjusted)\s+profit"),
+    ("net_profit", 0, r"net\s+income"),
+    ("net_profit", 1, r"nets?"),
+    ("down_payment", 0, r"down\s+payment"),
+]
+
+METRICS = tuple(dict.fromkeys(metric for metric, _, _ in LABELS))
+
+# Longer labels first, so "asking price" wins over "asking" and "ebitda" over "ebit"
+_ORDER = sorted(range(len(LABELS)), key=lambda i: -len(LABELS[i][2]))
+_LABEL_PATTERN = re.compile(
+    "|".join(rf"(?P<l{i}>(?<![a-z]){LABELS[i][2]}(?![a-z]))" for i in _ORDER),
+    re.IGNORECASE,
+)
+
+_AMOUNT = r"(\d[\d,]*(?:\.\d+)?(?:mm|k)?)"
+_VALUE_PATTERNS = {
+    "amount": re.compile(rf"[:\s]*\$\s*{_AMOUNT}", re.IGNORECASE),
+    "number": re.compile(rf"[:\s]*\$?\s*{_AMOUNT}", re.IGNORECASE),
+    "loose": re.compile(rf"[^\n]*?\$\s*{_AMOUNT}", re.IGNORECASE),
+    "line": re.compile(r"[ \t]*:\s*([^\n]*)"),
+}
+_VALUE_PATTERNS["field"] = _VALUE_PATTERNS["line"]
+
+
+def dollars(value: Optional[str], default: str = "") -> str:
+    """An extracted amount as "$450,000", or ``default`` when it was not found."""
+    return f"${value}" if value else default
+
+
+def extract(text: str, mode: str = "amount", modes: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Every financial metric named in ``text``, in one scan.
+
+    Args:
+        text: Listing text.
+        mode: How a value follows its label: "amount", "number", "loose",
+            "line" or "field".
+        modes: Metric -> mode, for metrics that read differently from the rest.
+
+    Returns:
+        Metric name (one of ``METRICS``) -> value, for the metrics found.
+    """
+    modes = modes or {}
+    best: Dict[str, Tuple[int, str]] = {}
+    for match in _LABEL_PATTERN.finditer(text or ""):
+        metric, rank, _ = LABELS[int(match.lastgroup[1:])]
+        if metric in best and best[metric][0] <= rank:
+            continue
+        metric_mode = modes.get(metric, mode)
+        value = _VALUE_PATTERNS[metric_mode].match(text, match.end())
+        if not value:
+            continue
+        end = value.end(1)
+        if metric_mode == "field":
+            following = _LABEL_PATTERN.search(text, value.start(1), end)
+            if following:
+                end = following.start()
+        found = text[value.start(1):end].strip()
+        if found:
+            best[metric] = (rank, found)
+    return {metric: value for metric, (rank, value) in best.items()}
@@ -0,0 +1,82 @@
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# ---------------------------------------------------------------------------
+# Per-broker history lookups
+#
+# main groups the master db's primary keys by broker once per run and hands
+# each scraper its broker's BrokerHistory through config["history"], so a
+# site's setup no longer scans or copies the whole master table.
+# ---------------------------------------------------------------------------
+
+
+class BrokerHistory:
+    """Primary keys already in the master db for one broker."""
+
+    __slots__ = ("links", "keys", "checked")
+
+    def __init__(self, links: FrozenSet[str] = frozenset(), keys: FrozenSet[Tuple[str, ...]] = frozenset(),
+                 checked: Optional[Mapping[str, str]] = None):
+        self.links = links
+        self.keys = keys
+        # link -> ISO time its record was last written, where the store knows it
+        self.checked = checked or {}
+
+    def __contains__(self, link: str) -> bool:
+        return link in self.links
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def empty(self) -> bool:
+        return not self.keys
+
+
+EMPTY_HISTORY = BrokerHistory()
+
+
+def build_history_index(rows: Iterable[Sequence[str]], primary_keys: List[str],
+                        broker_key: str = "Broker Name", link_key: str = "Link to Deal",
+                        checked: Iterable[Tuple[str, str, str]] = ()) -> Dict[str, BrokerHistory]:
+    """
+    Group primary-key tuples (in ``primary_keys`` order) into one BrokerHistory per broker.
+
+    ``checked`` holds optional (broker, link, last written) triples, as
+    returned by a master store's ``iter_checked()``.
+    """
+    broker_pos = primary_keys.index(broker_key)
+    link_pos = primary_keys.index(link_key)
+    links: Dict[str, set] = {}
+    keys: Dict[str, set] = {}
+    for row in rows:
+        key = tuple("" if v is None else str(v) for v in row)
+        broker = key[broker_pos]
+        keys.setdefault(broker, set()).add(key)
+        if key[link_pos]:
+            links.setdefault(broker, set()).add(key[link_pos])
+    checked_at: Dict[str, Dict[str, str]] = {}
+    for broker, link, when in checked:
+        if when:
+            checked_at.setdefault(broker, {})[link] = when
+    return {
+        broker: BrokerHistory(frozenset(links.get(broker, ())), frozenset(broker_keys), checked_at.get(broker))
+        for broker, broker_keys in keys.items()
+    }
+
+
+def known_links(config: Dict[str, Any]) -> AbstractSet[str]:
+    """
+    "Link to Deal" values already recorded for this site's broker.
+
+    Accepts the BrokerHistory main passes as well as the DataFrame that the
+    standalone ``__main__`` configs still use.
+    """
+    history = config.get("history")
+    if history is None:
+        return frozenset()
+    if isinstance(history, BrokerHistory):
+        return history.links
+    column = history.get("Link to Deal", [])
+    if hasattr(column, "dropna"):
+        column = column.dropna()
+    return frozenset(link for link in column if link)
@@ -0,0 +1,129 @@
+import functools
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
+
+# bs4 is imported where it is used: main and the parse cache import this
+# module for its settings, and must not load bs4 in a run that parses nothing
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, SoupStrainer
+
+# ---------------------------------------------------------------------------
+# HTML parser backend selection
+#
+# Every scraper builds its soup through make_soup(), which picks the tree
+# builder BeautifulSoup runs on from ``config["html_parser"]``:
+#
+#     html.parser  -- the pure-Python parser the scrapers were written on
+#                     (default)
+#     lxml         -- libxml2's C parser; several times faster on our pages
+#     auto         -- lxml when it is installed, else html.parser
+#
+# The scrapers keep the BeautifulSoup API -- find, find_all, select,
+# get_text -- whichever backend built the tree, so the choice is a config
+# switch rather than a rewrite. Backends can still disagree on broken
+# markup (unclosed tags, stray </div>s), and a changed title or ID changes
+# a listing's master key, so lxml stays opt-in: switch a deployment over
+# only once the benchmark suite's --parser-diff mode, which runs every
+# scraper on every installed backend against the captured fixture corpus,
+# reports no differing record.
+#
+# Fetched pages are parsed from their raw bytes. When the server declared a
+# charset it is handed to the parser directly, skipping both requests'
+# response.text decode and its charset detection; otherwise the parser
+# reads the page's own <meta charset>.
+#
+# A scraper that only reads part of a page declares its containers with
+# container() and passes them as ``only``: the parser then builds tree
+# nodes for those elements and their descendants alone, so the rest of
+# the page costs a tokeniser pass but no objects. Everything the scraper
+# finds has to sit inside a declared container. --parser-diff checks this
+# by comparing against full-tree parses. ``config["partial_parse"] = False``
+# turns it off.
+# ---------------------------------------------------------------------------
+
+# Fastest first; "auto" takes the first one installed
+BACKENDS = ("lxml", "html.parser")
+
+# What a config without "html_parser" gets
+DEFAULT = "html.parser"
+
+_CHARSET = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def is_available(backend: str) -> bool:
+    """Whether BeautifulSoup can build trees with ``backend`` here."""
+    from bs4 import BeautifulSoup
+    try:
+        BeautifulSoup("<p></p>", backend)
+    except Exception:
+        return False
+    return True
+
+
+def available_backends() -> List[str]:
+    return [b for b in BACKENDS if is_available(b)]
+
+
+@functools.lru_cache(maxsize=None)
+def resolve(name: Optional[str]) -> str:
+    """The installed backend ``name`` ("auto", a backend, or None for ``DEFAULT``) stands for."""
+    if not name:
+        name = DEFAULT
+    if name == "auto":
+        return available_backends()[0] if available_backends() else "html.parser"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser {name!r}; expected auto or one of {', '.join(BACKENDS)}")
+    if not is_available(name):
+        logging.warning(f"HTML parser {name} is not installed; using html.parser")
+        return "html.parser"
+    return name
+
+
+def backend_for(config: Optional[Dict[str, Any]]) -> str:
+    return resolve((config or {}).get("html_parser"))
+
+
+def container(names: Union[str, Sequence[str]], *classes: str) -> "SoupStrainer":
+    """
+    Declare the subtrees a scraper reads: ``names`` elements (a tag name or
+    list of them) carrying any of ``classes``, with everything inside them.
+
+    Classes are matched as whole words of the class attribute, so
+    ``container("div", "listing-box")`` also keeps ``<div class="listing-box featured">``.
+    """
+    from bs4 import SoupStrainer
+    if not classes:
+        return SoupStrainer(names)
+    pattern = re.compile(r"(?:^|\s)(?:%s)(?:\s|$)" % "|".join(re.escape(c) for c in classes))
+    return SoupStrainer(names, attrs={"class": pattern})
+
+
+def declared_charset(response) -> Optional[str]:
+    """The charset named in the response's Content-Type header, if any."""
+    match = _CHARSET.search(response.headers.get("Content-Type", "") or "")
+    return match.group(1) if match else None
+
+
+def make_soup(config: Optional[Dict[str, Any]], markup: Any, only: Optional["SoupStrainer"] = None) -> "BeautifulSoup":
+    """
+    Parse ``markup`` with the backend ``config`` selects.
+
+    Args:
+        config: The scraper config; ``config["html_parser"]`` names the
+            backend. None (or no key) means ``DEFAULT``.
+        markup: A fetched ``requests.Response`` (parsed from its bytes), or
+            anything BeautifulSoup accepts -- str, bytes or an open file.
+        only: Containers from ``container()``; build the tree for them alone.
+
+    Returns:
+        The BeautifulSoup tree.
+    """
+    from bs4 import BeautifulSoup
+    backend = backend_for(config)
+    if not (config or {}).get("partial_parse", True):
+        only = None
+    if hasattr(markup, "content") and hasattr(markup, "headers"):
+        return BeautifulSoup(markup.content, backend, from_encoding=declared_charset(markup), parse_only=only)
+    return BeautifulSoup(markup, backend, parse_only=only)
@@ -0,0 +1,184 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+import run_metrics
+from cassette import make_response
+
+# ---------------------------------------------------------------------------
+# Conditional-GET response cache
+#
+# Sits between the fetch engine and the HTTP client. A 200 response that
+# carries an ETag or Last-Modified is stored (body gzipped on disk, metadata
+# in a small SQLite index); the next GET of the same URL is sent with
+# If-None-Match / If-Modified-Since, and a 304 is answered from the stored
+# body without downloading it again. A 200 without either validator drops
+# whatever was stored for the URL, so a page that stopped sending them is
+# not revalidated against an old body. The cache is bounded to ``max_bytes``
+# of stored bodies and evicts least-recently-used entries past that.
+# ---------------------------------------------------------------------------
+
+
+class HttpCache:
+    """Fetch-engine transport adding conditional GETs over ``transport``."""
+
+    def __init__(self, directory: str, transport, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            directory: Where the index and bodies are kept.
+            transport: The transport that performs the real GETs.
+            max_bytes: Upper bound on the stored (compressed) bodies.
+        """
+        self.directory = directory
+        self.transport = transport
+        self.max_bytes = max_bytes
+        self._init_runtime()
+
+    def _init_runtime(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.join(self.directory, "bodies"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite"), timeout=30,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS entries (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+                          "encoding TEXT, headers TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.conn.commit()
+        self._total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    # The cache travels inside the fetch engine to worker processes, which
+    # open their own connection to the shared index.
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"directory": self.directory, "transport": self.transport, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def _body_path(self, url: str) -> str:
+        return os.path.join(self.directory, "bodies", hashlib.sha1(url.encode("utf-8")).hexdigest() + ".gz")
+
+    def _lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute("SELECT etag, last_modified, encoding, headers FROM entries WHERE url = ?",
+                                    (url,)).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "encoding": row[2], "headers": json.loads(row[3])}
+
+    def _store(self, url: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self._forget(url)
+            return
+        data = gzip.compress(response.content or b"")
+        path = self._body_path(url)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        # Transfer-level headers no longer describe the stored body
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        with self._lock:
+            old = self.conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (url, etag, last_modified, response.encoding, json.dumps(headers), len(data),
+                                   time.time()))
+            self._total += len(data) - (old[0] if old else 0)
+            self._evict()
+
+    def _forget(self, url: str) -> None:
+        with self._lock:
+            old = self.conn.execute("SELECT size FROM entries WHERE url = ?", (url,)).fetchone()
+            if old is None:
+                return
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._total -= old[0]
+        try:
+            os.remove(self._body_path(url))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        # Called with the lock held
+        while self._total > self.max_bytes:
+            oldest = self.conn.execute("SELECT url, size FROM entries ORDER BY last_used LIMIT 64").fetchall()
+            if not oldest:
+                self._total = 0
+                return
+            with self.conn:
+                for url, size in oldest:
+                    self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+                    try:
+                        os.remove(self._body_path(url))
+                    except OSError:
+                        pass
+                    self._total -= size
+                    if self._total <= self.max_bytes:
+                        break
+
+    def _cached_response(self, url: str, entry: Dict[str, Any]) -> Optional[requests.Response]:
+        try:
+            with open(self._body_path(url), "rb") as f:
+                body = gzip.decompress(f.read())
+        except (OSError, EOFError):
+            return None
+        with self._lock:
+            with self.conn:
+                self.conn.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+        response = make_response(url, body, 200, entry["encoding"], entry["headers"])
+        response.from_cache = True
+        return response
+
+    def __call__(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                 **kwargs) -> requests.Response:
+        entry = self._lookup(url)
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry["etag"]:
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.transport(url, headers=request_headers, timeout=timeout, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            cached = self._cached_response(url, entry)
+            if cached is not None:
+                self._count(hit=True)
+                return cached
+            # Body lost from disk: fetch it again unconditionally
+            response = self.transport(url, headers=headers or {}, timeout=timeout, **kwargs)
+        self._count(hit=False)
+        if response.status_code == 200:
+            try:
+                self._store(url, response)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Could not cache {url}: {e}")
+        return response
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        run_metrics.record_cache(hit)
+
+    def close(self) -> None:
+        logging.info(f"HTTP cache: {self.hits} hits, {self.misses} misses, "
+                     f"{self._total / (1024 * 1024):.1f} MiB stored in {self.directory}")
+        with self._lock:
+            self.conn.close()
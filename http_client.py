@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import run_metrics
+
+# ---------------------------------------------------------------------------
+# Pooled HTTP client
+#
+# One requests.Session per host, so every page and detail page of a site
+# reuses the same keep-alive connections instead of paying a fresh TCP+TLS
+# handshake. Responses are requested compressed (brotli when a brotli
+# decoder is installed), cookies are kept per host and saved between runs,
+# and transient failures are retried a bounded number of times with
+# jittered exponential backoff. Retries are counted in the run metrics.
+#
+# HttpClient has the requests.get(url, headers=, timeout=) signature, so
+# it plugs into the fetch engine as its transport.
+# ---------------------------------------------------------------------------
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes "br" when this is importable)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class HttpClient:
+    """Per-host pooled sessions with retry/backoff and persistent cookies."""
+
+    def __init__(self, pool_size: int = 8, retries: int = 3, backoff: float = 0.5, backoff_max: float = 20.0,
+                 retry_statuses: Iterable[int] = RETRY_STATUSES, cookie_path: Optional[str] = None):
+        """
+        Args:
+            pool_size: Keep-alive connections kept open per host.
+            retries: Extra attempts after the first for a transient failure.
+            backoff: Base delay; attempt ``n`` waits up to ``backoff * 2**n``.
+            backoff_max: Cap on any single wait, ``Retry-After`` included.
+            retry_statuses: HTTP statuses treated as transient.
+            cookie_path: JSON file cookies are loaded from and saved to.
+        """
+        self.pool_size = pool_size
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.cookie_path = cookie_path
+        self._init_runtime()
+
+    def _init_runtime(self) -> None:
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._saved_cookies = self._read_cookies()
+
+    # Clients travel inside the fetch engine to worker processes; sessions
+    # and sockets are rebuilt there (and cookies only saved by the parent).
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for key in ("_lock", "_sessions", "_saved_cookies"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def _read_cookies(self) -> Dict[str, list]:
+        if not self.cookie_path or not os.path.exists(self.cookie_path):
+            return {}
+        try:
+            with open(self.cookie_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cookie file {self.cookie_path}: {e}")
+            return {}
+
+    def session(self, url: str) -> requests.Session:
+        """The pooled session for ``url``'s host."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+                now = time.time()
+                for c in self._saved_cookies.get(host, []):
+                    if c.get("expires") is None or c["expires"] > now:
+                        session.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"],
+                                            expires=c.get("expires"), secure=c.get("secure", False))
+                self._sessions[host] = session
+            return session
+
+    def _delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        # "Full jitter": spreads retries from many threads instead of synchronising them
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+            **kwargs) -> requests.Response:
+        """GET with retries; returns the last response or raises the last transient error."""
+        session = self.session(url)
+        for attempt in range(self.retries + 1):
+            response, error = None, None
+            try:
+                response = session.get(url, headers=headers, timeout=timeout, **kwargs)
+                if response.status_code not in self.retry_statuses:
+                    return response
+            except RETRY_EXCEPTIONS as e:
+                error = e
+            if attempt == self.retries:
+                run_metrics.record_retry(0.0, gave_up=True)
+                if error is not None:
+                    raise error
+                return response
+            delay = self._delay(attempt, response)
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            logging.debug(f"Retrying {url} in {delay:.1f}s after {reason} (attempt {attempt + 1}/{self.retries})")
+            run_metrics.record_retry(delay)
+            time.sleep(delay)
+
+    __call__ = get
+
+    def save_cookies(self) -> None:
+        if not self.cookie_path:
+            return
+        with self._lock:
+            jars = dict(self._saved_cookies)
+            for host, session in self._sessions.items():
+                jars[host] = [
+                    {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path,
+                     "expires": c.expires, "secure": c.secure}
+                    for c in session.cookies
+                ]
+        directory = os.path.dirname(self.cookie_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cookie_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(jars, f, indent=1)
+        os.replace(tmp_path, self.cookie_path)
+
+    def close(self) -> None:
+        """Save cookies and release every pooled connection."""
+        try:
+            self.save_cookies()
+        except OSError as e:
+            logging.warning(f"Failed to save cookies to {self.cookie_path}: {e}")
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
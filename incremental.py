@@ -0,0 +1,62 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import run_metrics
+from history import BrokerHistory, known_links
+
+# ---------------------------------------------------------------------------
+# Incremental detail-page policy
+#
+# Most listings a site shows this month were already scraped in an earlier
+# month. Scrapers that visit one detail page per listing ask detail_due()
+# first and skip the visit (and the listing) when it is already in the
+# master db. With config["refresh_days"] set, a known listing is re-checked
+# once its master record is older than that many days, so status changes
+# such as "Sold" still come through.
+#
+# Config keys (all optional):
+#     incremental   -- False fetches every detail page, as before (default True)
+#     refresh_days  -- re-check known listings this old; None never re-checks
+# ---------------------------------------------------------------------------
+
+
+def detail_due(config: Dict[str, Any], url: Optional[str], now: Optional[datetime] = None) -> bool:
+    """
+    Whether the detail page at ``url`` should be fetched this run.
+
+    Args:
+        config: The scraper config; reads ``history``, ``incremental`` and
+            ``refresh_days``.
+        url: The listing's "Link to Deal".
+        now: Reference time for the refresh check. Defaults to now.
+
+    Returns:
+        True for new listings, for known listings that are due a re-check,
+        and for every listing when incremental mode is off.
+    """
+    if not url or not config.get("incremental", True):
+        return True
+    if url not in known_links(config):
+        return True
+
+    refresh_days = config.get("refresh_days")
+    if refresh_days is None:
+        return False
+    history = config.get("history")
+    checked = history.checked.get(url) if isinstance(history, BrokerHistory) else None
+    if not checked:
+        # Age unknown (e.g. the Excel store keeps no write times): treat as due
+        return True
+    try:
+        last = datetime.fromisoformat(checked)
+    except ValueError:
+        return True
+    return (now or datetime.now()) - last >= timedelta(days=refresh_days)
+
+
+def log_skipped(site: str, skipped: int, total: int) -> None:
+    """One summary line per site instead of one per skipped listing."""
+    run_metrics.record_skipped(skipped)
+    if skipped:
+        logging.info("%s: skipped %d of %d detail pages already in the master db", site, skipped, total)
@@ -1,8 +1,23 @@
 import pandas as pd
 import logging
-import importlib
+import argparse
+import registry
+from concurrent.futures import ThreadPoolExecutor
+from worker_pool import RecyclingPool, to_columnar, from_columnar
+from fetch_engine import FetchEngine
+from cassette import Cassette
+from http_client import HttpClient
+from http_cache import HttpCache
+from parse_cache import ParseCache
+from html_parser import BACKENDS as HTML_PARSERS, DEFAULT as DEFAULT_HTML_PARSER
+from rate_limit import RateLimiter
+from master_store import open_store
+from history import build_history_index, EMPTY_HISTORY
+from run_journal import RunJournal
+import run_metrics
+from run_metrics import SiteMetrics
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 # Setup logging
 logging.basicConfig(
@@ -18,20 +33,115 @@ headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
 }
 
-def load_scraper(site_name):
-    try:
-        module_name = f"scrapers.{site_name.lower().split('&')[0].strip().replace(' ', '_')}"
-        scraper_module = importlib.import_module(module_name)
-        return scraper_module.scrape
-    except (ModuleNotFoundError, AttributeError) as e:
-        logging.error(f"{module_name}.py not found for {site_name}: {e}")
-        return None
-
-def main():
+def scrape_site(site_name, config: Dict[str, Any],
+                metrics: Optional[SiteMetrics] = None) -> Tuple[str, Any, Optional[pd.DataFrame]]:
+    """Import the site's scraper, run it and return its (status, count, listings) triple."""
+    scraper_func = registry.load_scraper(site_name)
+    if scraper_func is None:
+        return "scraper_not_found", "0", None
+    with run_metrics.collecting(metrics or SiteMetrics(site_name)) as metrics:
+        try:
+            new_listings = scraper_func(config)
+            is_frame = isinstance(new_listings, pd.DataFrame)
+            run_metrics.finish_scrape(metrics, len(new_listings) if is_frame else 0)
+            if is_frame and not new_listings.empty:
+                logging.debug(f"{site_name}: Scraped {len(new_listings)} listings")
+                return "success", len(new_listings), new_listings
+            logging.warning(f"{site_name}: No new listings or invalid result")
+            return "no_new_listings", "0", None
+        except Exception as e:
+            logging.exception(f"Exception during scraping {site_name}: {e}")
+            return "exception", "0", None
+        finally:
+            # A scraper that raised before releasing its browser would leave it leased
+            if config.get("browser_pool") is not None:
+                config["browser_pool"].reclaim()
+
+def scrape_site_columnar(site_name, config: Dict[str, Any]):
+    """Worker-process entry point: like scrape_site, but returns listings as column lists plus raw metrics."""
+    metrics = SiteMetrics(site_name)
+    status, count, new_listings = scrape_site(site_name, config, metrics)
+    return status, count, to_columnar(new_listings), metrics.raw()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape all enabled sites in sitelist.csv")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="number of HTTP-only sites scraped at the same time (default: 1, sequential)")
+    parser.add_argument("--selenium-jobs", type=int, default=None,
+                        help="number of Selenium sites scraped at the same time (default: min(jobs, 2))")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="run HTTP-only sites in this many worker processes instead of threads")
+    parser.add_argument("--max-sites-per-worker", type=int, default=4,
+                        help="replace a worker process after it has scraped this many sites (default: 4)")
+    parser.add_argument("--max-worker-rss-mb", type=float, default=1024,
+                        help="replace a worker process once its resident memory passes this many MiB (default: 1024)")
+    parser.add_argument("--browser-max-pages", type=int, default=300,
+                        help="replace a pooled Chrome after this many page loads (default: 300)")
+    parser.add_argument("--browser-max-rss-mb", type=float, default=1500,
+                        help="replace a pooled Chrome once its processes use this many MiB (default: 1500)")
+    parser.add_argument("--per-host", type=int, default=4,
+                        help="maximum concurrent HTTP requests to one host (default: 4)")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="requests per second allowed to any host without a pace of its own in the "
+                             "registry; 0 leaves those hosts unpaced (default: 0)")
+    parser.add_argument("--no-site-rates", action="store_true",
+                        help="ignore the per-site paces in the registry")
+    parser.add_argument("--burst", type=int, default=2,
+                        help="requests a host may receive back to back before --rate applies (default: 2)")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="retries for a transient HTTP failure, with jittered backoff (default: 3)")
+    parser.add_argument("--http-cache", default="runs/http_cache", metavar="DIR",
+                        help="conditional-GET response cache directory (default: runs/http_cache)")
+    parser.add_argument("--http-cache-mb", type=float, default=512,
+                        help="size bound of the HTTP cache; least recently used pages are evicted (default: 512)")
+    parser.add_argument("--no-http-cache", action="store_true", help="always download full responses")
+    parser.add_argument("--no-api-recipes", action="store_true",
+                        help="always scrape browser sites in the browser, without looking for their JSON endpoints")
+    parser.add_argument("--html-parser", default=DEFAULT_HTML_PARSER, choices=("auto",) + HTML_PARSERS,
+                        help="HTML parser backend for the scrapers; auto prefers lxml when installed. "
+                             "Use lxml only once bench_scrapers --parser-diff passes (default: %(default)s)")
+    parser.add_argument("--no-partial-parse", action="store_true",
+                        help="build full-page trees even where a scraper declares the containers it reads")
+    parser.add_argument("--no-parse-cache", action="store_true",
+                        help="re-parse every page even when its bytes match the last parse")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record-cassette", default=None, metavar="DIR",
+                          help="store every HTTP response of this run in a compressed cassette")
+    cassette.add_argument("--replay-cassette", default=None, metavar="DIR",
+                          help="answer every HTTP request from a recorded cassette instead of the network")
+    parser.add_argument("--store", choices=["sqlite", "excel"], default="sqlite",
+                        help="master db backend (default: sqlite; seeded from master_db.xlsx on first use)")
+    parser.add_argument("--export-excel", nargs="?", const="master_db.xlsx", default=None, metavar="PATH",
+                        help="also export the full master db to Excel after the run (default path: master_db.xlsx)")
+    parser.add_argument("--refresh-days", type=float, default=None, metavar="DAYS",
+                        help="re-fetch detail pages of known listings last written more than DAYS ago "
+                             "(default: never re-fetch known listings)")
+    parser.add_argument("--full-details", action="store_true",
+                        help="fetch every listing's detail page, even for listings already in the master db")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip sites that already completed earlier in this month's run")
+    parser.add_argument("--reuse-ttl", type=float, default=12, metavar="HOURS",
+                        help="reuse a site's journaled result if it finished less than HOURS ago (default: 12, 0 disables)")
+    parser.add_argument("--prometheus-file", default=None, metavar="PATH",
+                        help="also write the run metrics as a Prometheus textfile (e.g. for node_exporter)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = max(1, args.jobs)
+    selenium_jobs = max(1, args.selenium_jobs if args.selenium_jobs is not None else min(jobs, 2))
+
     sitelist_path = "sitelist.csv"
     master_db_path = "master_db.xlsx"
+    master_sqlite_path = "master_db.sqlite"
     now = datetime.now()
     monthly_output_path = f"{now.strftime('%Y-%m')}_listings.xlsx"
+    journal_path = f"runs/{now.strftime('%Y-%m')}_journal.jsonl"
+    metrics_path = f"runs/{now.strftime('%Y-%m-%d_%H%M%S')}_metrics.json"
+    cookie_path = "runs/cookies.json"
+    parse_cache_path = "runs/parse_cache.sqlite"
+    wait_times_path = "runs/wait_times.json"
+    api_recipes_path = "runs/api_recipes.json"
 
     # Load sitelist
     try:
@@ -40,75 +150,200 @@ def main():
         logging.critical(f"Failed to load sitelist: {e}")
         return
 
-    # Load master db
-    try:
-        master_db = pd.read_excel(master_db_path)
-    except FileNotFoundError:
-        logging.warning(f"{master_db_path} not found. Starting with empty master db.")
-        master_db = pd.DataFrame()
-
     # Primary keys for identifying unique listings
     primary_keys = ["Link to Deal", "Broker Name", "Listing ID", "Published Date"]
 
+    # Load master db keys
+    if args.store == "sqlite":
+        store = open_store("sqlite", master_sqlite_path, primary_keys, excel_path=master_db_path)
+    else:
+        store = open_store("excel", master_db_path, primary_keys)
+    # Known keys grouped by broker once, instead of a master-table scan per site
+    history_index = build_history_index(store.iter_keys(), primary_keys, checked=store.iter_checked())
+
     new_rows = []
     status_updates = []
     update_counts = []
     token = now.strftime('%b-%y')
+    http_client = HttpClient(retries=args.retries, cookie_path=cookie_path)
+    transport = http_client
+    http_cache = None
+    # Cassettes hold full bodies, so the cache (and its 304s) stays out of record and replay
+    if args.record_cassette:
+        transport = Cassette(args.record_cassette, "record", transport=http_client)
+    elif args.replay_cassette:
+        transport = Cassette(args.replay_cassette, "replay")
+        logging.info(f"Replaying HTTP traffic from {args.replay_cassette}; Selenium sites still go to the network")
+    elif not args.no_http_cache:
+        http_cache = HttpCache(args.http_cache, http_client, max_bytes=int(args.http_cache_mb * 1024 * 1024))
+        transport = http_cache
+    # Only brokers that were always paced are paced by default (registry
+    # rate=); the rest keep their unthrottled speed unless --rate is given.
+    # Replayed traffic never reaches a server, so it is not paced at all.
+    site_rates = {} if args.no_site_rates else registry.host_rates(
+        (row["Site Name"], (row["Listing URL"], row["Base URL"])) for _, row in sitelist.iterrows())
+    rate_limiter = None
+    if not args.replay_cassette and (args.rate > 0 or site_rates):
+        rate_limiter = RateLimiter(args.rate, args.burst, overrides=site_rates)
+    fetch_engine = FetchEngine(transport=transport, per_host=args.per_host, limiter=rate_limiter)
+    parse_cache = None if args.no_parse_cache else ParseCache(parse_cache_path)
+    # Browser pool, wait times and API recipes; created with the first Selenium site
+    selenium_support: Optional[Dict[str, Any]] = None
+    journal = RunJournal(journal_path)
+
+    # Per-row outcome as (status, count, listings), filled in sitelist order below
+    results: Dict[Any, Tuple[str, Any, Optional[pd.DataFrame]]] = {}
+    site_metrics: Dict[Any, SiteMetrics] = {}
+    pending = []
+
+    def finish(idx, site_name, outcome):
+        # Journal each site as soon as it completes, so a crash loses only in-flight sites
+        results[idx] = outcome
+        status, count, new_listings = outcome
+        site_metrics[idx].status = status
+        try:
+            journal.record(site_name, status, count, new_listings)
+        except Exception as e:
+            logging.error(f"Failed to journal {site_name}: {e}")
 
     for idx, row in sitelist.iterrows():
+        site_name = row["Site Name"]
+        site_metrics[idx] = SiteMetrics(site_name, registry.engine(site_name) or "")
         if str(row['to_scrape']).strip().upper() != "TRUE":
-            update_counts.append("0")
-            status_updates.append((idx, "skipped"))
+            results[idx] = ("skipped", "0", None)
+            site_metrics[idx].status = "skipped"
             continue
 
-        site_name = row["Site Name"]
         site_url = row["Listing URL"]
         base_url = row["Base URL"]
         contact = row["Contact Name"]
         contact_num = row["Contact Number"]
         mode = row.get("mode", "default")
 
-        logging.info(f"Scraping {site_name} ({site_url})")
+        # Scraper modules are imported lazily, by whichever worker runs the site
+        spec = registry.find(site_name)
+        if spec is None:
+            logging.error(f"No scraper registered for {site_name}")
+            results[idx] = ("scraper_not_found", "0", None)
+            site_metrics[idx].status = "scraper_not_found"
+            continue
 
-        scraper_func = load_scraper(site_name)
-        if scraper_func is None:
-            status_updates.append((idx, "scraper_not_found"))
-            update_counts.append("0")
+        previous = journal.reusable(site_name, args.resume, args.reuse_ttl, now)
+        if previous is not None:
+            logging.info(f"Reusing journaled result for {site_name} ({previous[0]}, {previous[1]} listings)")
+            results[idx] = previous
+            site_metrics[idx].status = previous[0]
+            site_metrics[idx].reused = True
+            site_metrics[idx].listings_found = len(previous[2]) if previous[2] is not None else 0
             continue
 
-        # Filter master db history for this broker
-        if not master_db.empty:
-            history = master_db[master_db["Broker Name"] == site_name][primary_keys]
-        else:
-            history = pd.DataFrame(columns=primary_keys)
+        # Master db history for this broker
+        history = history_index.get(site_name, EMPTY_HISTORY)
 
+        config: Dict[str, Any] = {
+            "listing_url": site_url,
+            "base_url": base_url,
+            "headers": headers,
+            "history": history,
+            "mode": mode,
+            "broker": contact,
+            "phase": token,
+            "contact_name": contact,
+            "contact_number": contact_num,
+            "fetch_engine": fetch_engine,
+            "rate_limiter": rate_limiter,
+            "parse_cache": parse_cache,
+            "html_parser": args.html_parser,
+            "partial_parse": not args.no_partial_parse,
+            "incremental": not args.full_details,
+            "refresh_days": args.refresh_days,
+        }
+        if spec.engine == "selenium":
+            if selenium_support is None:
+                # Imported here, so a run (or worker process) without Selenium sites never loads selenium
+                from browser_pool import BrowserPool
+                from waits import WaitTimes
+                from api_discovery import ApiRecipes
+                selenium_support = {
+                    # Browsers start on first use, one per concurrent Selenium site at most
+                    "browser_pool": BrowserPool(selenium_jobs, max_pages=args.browser_max_pages,
+                                                max_rss_mb=args.browser_max_rss_mb),
+                    # Selenium waits learn their timeouts from how long each site took in earlier runs
+                    "wait_times": WaitTimes(wait_times_path),
+                    # JSON endpoints found behind browser-rendered directories, replayed over plain HTTP
+                    "api_recipes": None if args.no_api_recipes else ApiRecipes(api_recipes_path),
+                }
+            # Only Selenium sites get the pool; HTTP sites' configs may be pickled to worker processes
+            config.update(selenium_support)
+        pending.append((idx, site_name, site_url, spec.engine, config))
+
+    if args.processes > 0:
+        http_sites = [p for p in pending if p[3] != "selenium"]
+        selenium_sites = [p for p in pending if p[3] == "selenium"]
+        logging.info(f"Scraping {len(http_sites)} sites in {args.processes} worker processes "
+                     f"and {len(selenium_sites)} sites with {selenium_jobs} Selenium workers")
+        pool = RecyclingPool(args.processes, args.max_sites_per_worker, args.max_worker_rss_mb)
+        with ThreadPoolExecutor(max_workers=selenium_jobs, thread_name_prefix="selenium") as selenium_pool:
+            for idx, site_name, site_url, engine, config in selenium_sites:
+                logging.info(f"Scraping {site_name} ({site_url})")
+                future = selenium_pool.submit(scrape_site, site_name, config, site_metrics[idx])
+                future.add_done_callback(lambda f, idx=idx, site_name=site_name: finish(idx, site_name, f.result()))
+            for idx, site_name, site_url, engine, config in http_sites:
+                logging.info(f"Scraping {site_name} ({site_url}) in a worker process")
+            tasks = [(site_name, config) for idx, site_name, site_url, engine, config in http_sites]
+            for task_id, ok, value in pool.run(scrape_site_columnar, tasks):
+                idx, site_name = http_sites[task_id][0], http_sites[task_id][1]
+                if ok:
+                    status, count, payload, raw_metrics = value
+                    site_metrics[idx] = SiteMetrics.from_dict(raw_metrics)
+                    finish(idx, site_name, (status, count, from_columnar(payload)))
+                else:
+                    logging.error(f"Worker failed while scraping {site_name}: {value}")
+                    finish(idx, site_name, ("exception", "0", None))
+    elif jobs == 1:
+        for idx, site_name, site_url, engine, config in pending:
+            logging.info(f"Scraping {site_name} ({site_url})")
+            finish(idx, site_name, scrape_site(site_name, config, site_metrics[idx]))
+    else:
+        logging.info(f"Scraping {len(pending)} sites with {jobs} HTTP and {selenium_jobs} Selenium workers")
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="http") as http_pool, \
+                ThreadPoolExecutor(max_workers=selenium_jobs, thread_name_prefix="selenium") as selenium_pool:
+            for idx, site_name, site_url, engine, config in pending:
+                pool = selenium_pool if engine == "selenium" else http_pool
+                logging.info(f"Scraping {site_name} ({site_url})")
+                future = pool.submit(scrape_site, site_name, config, site_metrics[idx])
+                future.add_done_callback(lambda f, idx=idx, site_name=site_name: finish(idx, site_name, f.result()))
+
+    if selenium_support is not None:
+        selenium_support["browser_pool"].close()
         try:
-            config: Dict[str, Any] = {
-                "listing_url": site_url,
-                "base_url": base_url,
-                "headers": headers,
-                "history": history,
-                "mode": mode,
-                "broker": contact,
-                "phase": token,
-                "contact_name": contact,
-                "contact_number": contact_num,
-            }
+            selenium_support["wait_times"].save()
+        except OSError as e:
+            logging.warning(f"Failed to save wait times to {wait_times_path}: {e}")
+    fetch_engine.close()
+    if http_cache is not None:
+        http_cache.close()
+    http_client.close()
+    if parse_cache is not None:
+        parse_cache.close()
 
-            new_listings = scraper_func(config)
-            if isinstance(new_listings, pd.DataFrame) and not new_listings.empty:
-                logging.debug(f"{site_name}: Scraped {len(new_listings)} listings")
-                new_rows.append(new_listings)
-                status_updates.append((idx, "success"))
-                update_counts.append(len(new_listings))
-            else:
-                logging.warning(f"{site_name}: No new listings or invalid result")
-                status_updates.append((idx, "no_new_listings"))
-                update_counts.append("0")
-        except Exception as e:
-            logging.exception(f"Exception during scraping {site_name}: {e}")
-            status_updates.append((idx, "exception"))
-            update_counts.append("0")
+    for idx in sitelist.index:
+        status, count, new_listings = results[idx]
+        status_updates.append((idx, status))
+        update_counts.append(count)
+        if new_listings is not None:
+            new_rows.append(new_listings)
+            if "Link to Deal" in new_listings.columns:
+                known = history_index.get(sitelist.at[idx, "Site Name"], EMPTY_HISTORY)
+                site_metrics[idx].listings_new = int(sum(link not in known for link in new_listings["Link to Deal"]))
+
+    report = run_metrics.build_report([site_metrics[idx] for idx in sitelist.index], now, datetime.now())
+    try:
+        run_metrics.write_json(report, metrics_path)
+        if args.prometheus_file:
+            run_metrics.write_prometheus(report, args.prometheus_file)
+    except Exception as e:
+        logging.error(f"Failed to write run metrics: {e}")
 
     # Save new listings for the month (only if new rows exist)
     if new_rows:
@@ -116,18 +351,21 @@ def main():
         all_new.to_excel(monthly_output_path, index=False)
         logging.info(f"Written {len(all_new)} new listings to {monthly_output_path}")
 
-        # Update master db: add new listings and drop duplicates
-        combined_master = pd.concat([master_db, all_new], ignore_index=True)
-        updated_master = combined_master.drop_duplicates(subset=primary_keys, keep='last')
-
+        # Update master db: upsert new listings on the primary keys
         try:
-            updated_master.to_excel(master_db_path, index=False)
-            logging.info(f"Updated master database written to {master_db_path}")
+            store.upsert(all_new)
         except Exception as e:
             logging.error(f"Failed to write master database: {e}")
     else:
         logging.info("No new listings this month. Master DB not updated.")
 
+    if args.export_excel:
+        try:
+            store.export_excel(args.export_excel)
+        except Exception as e:
+            logging.error(f"Failed to export master database: {e}")
+    store.close()
+
     # Update sitelist statuses and counts
     for idx, status in status_updates:
         sitelist.at[idx, "Status"] = status
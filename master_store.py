@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Master listing stores
+#
+# main talks to the master database through three calls: iter_keys() for the
+# primary keys of everything seen so far, upsert() for the month's new rows,
+# and export_excel(). ExcelMasterStore is the original master_db.xlsx
+# behaviour; SqliteMasterStore keeps the same data in an embedded database
+# with a unique index on the primary keys, so a run only writes its new rows.
+# iter_checked() reports when each listing was last written, which the
+# incremental detail-page policy uses to decide what is due for a re-check.
+# ---------------------------------------------------------------------------
+
+
+def _key_text(value) -> str:
+    """Normalise a primary-key cell so NaN, None and '' compare equal."""
+    if value is None:
+        return ""
+    try:
+        if pd.isna(value):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    return str(value)
+
+
+def _column_name(key: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", key.lower()).strip("_")
+
+
+class ExcelMasterStore:
+    """Whole-workbook master db: read everything, rewrite everything."""
+
+    def __init__(self, path: str, primary_keys: List[str]):
+        self.path = path
+        self.primary_keys = primary_keys
+        self._master: Optional[pd.DataFrame] = None
+
+    def _load(self) -> pd.DataFrame:
+        if self._master is None:
+            try:
+                self._master = pd.read_excel(self.path)
+            except FileNotFoundError:
+                logging.warning(f"{self.path} not found. Starting with empty master db.")
+                self._master = pd.DataFrame()
+        return self._master
+
+    def iter_keys(self) -> Iterator[Tuple[str, ...]]:
+        master = self._load()
+        if master.empty:
+            return
+        for row in master[self.primary_keys].itertuples(index=False, name=None):
+            yield tuple(_key_text(v) for v in row)
+
+    def iter_checked(self, broker_key: str = "Broker Name",
+                     link_key: str = "Link to Deal") -> Iterator[Tuple[str, str, str]]:
+        # The workbook keeps no write times, so every listing's age is unknown
+        return iter(())
+
+    def upsert(self, new_rows: pd.DataFrame) -> int:
+        combined_master = pd.concat([self._load(), new_rows], ignore_index=True)
+        self._master = combined_master.drop_duplicates(subset=self.primary_keys, keep='last')
+        self._master.to_excel(self.path, index=False)
+        logging.info(f"Updated master database written to {self.path}")
+        return len(new_rows)
+
+    def export_excel(self, path: str) -> None:
+        self._load().to_excel(path, index=False)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteMasterStore:
+    """
+    Master db in SQLite.
+
+    Each listing is one row: its primary-key columns (under a unique index)
+    plus the full record as JSON, so scrapers can keep adding columns
+    without schema changes.
+    """
+
+    def __init__(self, path: str, primary_keys: List[str]):
+        self.path = path
+        self.primary_keys = primary_keys
+        self.key_columns = [_column_name(k) for k in primary_keys]
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        cols = ", ".join(f"{c} TEXT NOT NULL" for c in self.key_columns)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS listings ({cols}, record TEXT NOT NULL, updated_at TEXT NOT NULL)")
+        self.conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS listings_pk ON listings ({', '.join(self.key_columns)})")
+        self.conn.commit()
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM listings LIMIT 1").fetchone() is None
+
+    def iter_keys(self) -> Iterator[Tuple[str, ...]]:
+        yield from self.conn.execute(f"SELECT {', '.join(self.key_columns)} FROM listings")
+
+    def iter_checked(self, broker_key: str = "Broker Name",
+                     link_key: str = "Link to Deal") -> Iterator[Tuple[str, str, str]]:
+        """(broker, link, last updated_at) for every listing with a link."""
+        broker, link = _column_name(broker_key), _column_name(link_key)
+        yield from self.conn.execute(
+            f"SELECT {broker}, {link}, MAX(updated_at) FROM listings WHERE {link} != '' GROUP BY {broker}, {link}")
+
+    def upsert(self, new_rows: pd.DataFrame) -> int:
+        """Insert new listings; a row whose primary key already exists replaces the old record."""
+        if new_rows.empty:
+            return 0
+        # to_json turns NaN/numpy/timestamps into plain JSON values
+        records = json.loads(new_rows.to_json(orient="records", date_format="iso"))
+        now = datetime.now().isoformat(timespec="seconds")
+        placeholders = ", ".join("?" for _ in range(len(self.key_columns) + 2))
+        updates = "record = excluded.record, updated_at = excluded.updated_at"
+        sql = (f"INSERT INTO listings ({', '.join(self.key_columns)}, record, updated_at) VALUES ({placeholders}) "
+               f"ON CONFLICT ({', '.join(self.key_columns)}) DO UPDATE SET {updates}")
+        params = [
+            [_key_text(rec.get(k)) for k in self.primary_keys] + [json.dumps(rec, ensure_ascii=False), now]
+            for rec in records
+        ]
+        with self.conn:
+            self.conn.executemany(sql, params)
+        logging.info(f"Upserted {len(params)} listings into {self.path}")
+        return len(params)
+
+    def import_excel(self, path: str) -> int:
+        """One-off migration from an existing master_db.xlsx."""
+        master = pd.read_excel(path)
+        logging.info(f"Importing {len(master)} rows from {path} into {self.path}")
+        return self.upsert(master)
+
+    def export_excel(self, path: str) -> None:
+        rows = self.conn.execute("SELECT record FROM listings ORDER BY rowid").fetchall()
+        pd.DataFrame([json.loads(r[0]) for r in rows]).to_excel(path, index=False)
+        logging.info(f"Exported {len(rows)} listings from {self.path} to {path}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_store(kind: str, path: str, primary_keys: List[str], excel_path: Optional[str] = None):
+    """
+    Open the master store named by ``kind`` ("sqlite" or "excel").
+
+    A new, empty SQLite store is seeded from ``excel_path`` when that
+    workbook exists, so switching backends keeps the listing history.
+    """
+    if kind == "excel":
+        return ExcelMasterStore(path, primary_keys)
+    if kind != "sqlite":
+        raise ValueError(f"Unknown master store: {kind}")
+    store = SqliteMasterStore(path, primary_keys)
+    if excel_path and store.is_empty() and os.path.exists(excel_path):
+        store.import_excel(excel_path)
+    return store
@@ -0,0 +1,113 @@
+import contextvars
+import logging
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+import requests
+
+import fetch_engine
+
+# ---------------------------------------------------------------------------
+# Paginated directory fetching
+#
+# iter_pages() fetches page 1, reads the highest page number its pager
+# links to, and then fetches every page up to it concurrently -- still
+# through the fetch engine, so the per-host cap and rate limit apply --
+# handing pages back in order as each arrives. Parsing page N overlaps the
+# download of the pages after it.
+#
+# That number is only the highest page the pager shows, not necessarily
+# the last: pagers elide ("1 2 3 ... Next"). So the last page of a batch
+# has its own pager read too, and any higher page it links to starts the
+# next batch. Past the highest page any pager showed, pages are fetched
+# one ahead: page N+1 is requested while the caller parses page N. The
+# caller decides when the directory has ended and simply stops iterating;
+# the one prefetched page is the only request wasted.
+# ---------------------------------------------------------------------------
+
+# Pager links on WordPress-style directories: "?paged=7", "&wpv_paged=7", "/page/7/"
+PAGE_LINK_PATTERNS = {
+    "paged": r"[?&](?:amp;)?paged=(\d+)",
+    "wpv_paged": r"[?&](?:amp;)?wpv_paged=(\d+)",
+    "path": r"/page/(\d+)/?[\"'?#]",
+}
+
+Page = Tuple[int, str, Union[requests.Response, BaseException]]
+
+
+def last_page_number(html: str, pattern: str) -> Optional[int]:
+    """Highest page number any link in ``html`` matching ``pattern`` points to, if any."""
+    numbers = [int(n) for n in re.findall(pattern, html or "")]
+    return max(numbers) if numbers else None
+
+
+def iter_pages(config: Dict[str, Any], page_url: Callable[[int], str], pattern: str,
+               max_pages: Optional[int] = None, headers: Optional[Dict[str, str]] = None,
+               timeout: Optional[float] = None) -> Iterator[Page]:
+    """
+    Yield ``(page, url, response)`` for each directory page, in page order.
+
+    Args:
+        config: The scraper config, for its fetch engine and headers.
+        page_url: Maps a page number (from 1) to that page's URL.
+        pattern: Regex whose group 1 is a page number in a pager link; one
+            of ``PAGE_LINK_PATTERNS`` fits most sites.
+        max_pages: Never go past this page.
+        headers: Request headers; defaults to ``config["headers"]``.
+        timeout: Per-request timeout handed to the fetch engine.
+
+    Yields:
+        One tuple per page; ``response`` is the exception instead when the
+        page could not be fetched. Below ``max_pages`` the pages never end
+        on their own: stop iterating once the directory runs out.
+    """
+    headers = headers if headers is not None else config.get("headers", {})
+    workers = max(1, getattr(fetch_engine.get_engine(config), "per_host", 1))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pages")
+
+    def submit(page: int) -> Future:
+        url = page_url(page)
+        # Fetches count toward the calling site's run metrics
+        context = contextvars.copy_context()
+        return executor.submit(context.run, fetch_engine.fetch, config, url, headers, timeout)
+
+    def result(future: Future) -> Union[requests.Response, BaseException]:
+        try:
+            return future.result()
+        except Exception as e:
+            return e
+
+    def highest_linked(response) -> int:
+        if isinstance(response, BaseException):
+            return 0
+        last = last_page_number(response.text, pattern) or 0
+        return min(last, max_pages) if max_pages else last
+
+    try:
+        page = 1
+        current = result(submit(1))
+        # Concurrent batches while the pager on a batch's last page links further
+        while highest_linked(current) > page:
+            last = highest_linked(current)
+            logging.info(f"{page_url(1)}: pager reaches page {last}, fetching pages {page + 1}-{last} concurrently")
+            pending = {p: submit(p) for p in range(page + 1, last + 1)}
+            yield page, page_url(page), current
+            for p in range(page + 1, last):
+                yield p, page_url(p), result(pending.pop(p))
+            page, current = last, result(pending.pop(last))
+        if max_pages and page >= max_pages:
+            yield page, page_url(page), current
+            return
+
+        # Past every page a pager showed: keep one page in flight ahead of the caller
+        ahead = submit(page + 1)
+        yield page, page_url(page), current
+        while not max_pages or page < max_pages:
+            page += 1
+            current = ahead
+            if not max_pages or page < max_pages:
+                ahead = submit(page + 1)
+            yield page, page_url(page), result(current)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
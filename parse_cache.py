@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import html_parser
+import run_metrics
+
+# ---------------------------------------------------------------------------
+# Parse cache keyed by page fingerprint
+#
+# A scraper hands cached_parse() the bytes of a page it fetched and a
+# zero-argument callable that parses them. The fingerprint covers the page
+# bytes, the scraper module's source (so editing a parser invalidates its
+# entries) and the config fields parsers copy into their posts. When the
+# fingerprint matches the one stored for that page, the posts stored with it
+# are returned and BeautifulSoup never runs.
+#
+# Only the latest parse of each (scraper, page) is kept. Filtering against
+# the master db history must happen after cached_parse(), never inside the
+# parse callable, or stale filtering would be replayed.
+# ---------------------------------------------------------------------------
+
+# Config fields scrapers copy into posts; a change to any of them must re-parse
+CONFIG_KEYS = ("listing_url", "base_url", "broker", "contact_name", "contact_number", "sold_keywords", "mode")
+
+_module_versions: Dict[str, str] = {}
+_version_lock = threading.Lock()
+
+
+def _module_version(module_name: str) -> str:
+    """Digest of the parser module's source file, computed once per process."""
+    with _version_lock:
+        if module_name not in _module_versions:
+            path = getattr(sys.modules.get(module_name), "__file__", None)
+            digest = hashlib.sha256()
+            if path and os.path.exists(path):
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            _module_versions[module_name] = digest.hexdigest()
+        return _module_versions[module_name]
+
+
+class ParseCache:
+    """SQLite table of (scraper, page) -> fingerprint and the posts it parsed into."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_runtime()
+
+    def _init_runtime(self) -> None:
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS parses (scraper TEXT NOT NULL, page TEXT NOT NULL, "
+                          "fingerprint TEXT NOT NULL, posts TEXT NOT NULL, parsed_at TEXT NOT NULL, "
+                          "PRIMARY KEY (scraper, page))")
+        self.conn.commit()
+
+    # Travels inside scraper configs to worker processes, which reconnect
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def get(self, scraper: str, page: str, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            row = self.conn.execute("SELECT fingerprint, posts FROM parses WHERE scraper = ? AND page = ?",
+                                    (scraper, page)).fetchone()
+        if row is None or row[0] != fingerprint:
+            return None
+        return json.loads(row[1])
+
+    def put(self, scraper: str, page: str, fingerprint: str, posts: List[Dict[str, Any]]) -> None:
+        data = json.dumps(posts, ensure_ascii=False, default=str)
+        with self._lock:
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO parses VALUES (?, ?, ?, ?, ?)",
+                                  (scraper, page, fingerprint, data, datetime.now().isoformat(timespec="seconds")))
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+def fingerprint(config: Dict[str, Any], module_name: str, body: bytes) -> str:
+    digest = hashlib.sha256(body)
+    digest.update(_module_version(module_name).encode("ascii"))
+    fields = {k: config.get(k) for k in CONFIG_KEYS}
+    # Backends may disagree on broken markup, so a parse is only reused on the same one
+    fields["html_parser"] = html_parser.backend_for(config)
+    fields["partial_parse"] = config.get("partial_parse", True)
+    digest.update(json.dumps(fields, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cached_parse(config: Dict[str, Any], page: str, body: bytes,
+                 parse: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Posts parsed from ``body``, reusing last run's result for identical bytes.
+
+    Args:
+        config: The scraper config; ``config["parse_cache"]`` holds the
+            ParseCache. Without one, ``parse`` simply runs.
+        page: URL (or other stable name) of the page.
+        body: The page's raw bytes.
+        parse: Zero-argument callable returning the page's posts. Its
+            module identifies the scraper.
+
+    Returns:
+        The posts, as ``parse`` returned them or as stored (JSON round-tripped).
+    """
+    cache: Optional[ParseCache] = config.get("parse_cache")
+    if cache is None or body is None:
+        return parse()
+    scraper = parse.__module__
+    key = fingerprint(config, scraper, body)
+    try:
+        posts = cache.get(scraper, page, key)
+    except sqlite3.Error as e:
+        logging.warning(f"Parse cache lookup failed for {page}: {e}")
+        posts = None
+    if posts is not None:
+        logging.info(f"{page} unchanged since last parse; reusing {len(posts)} posts")
+        run_metrics.record_parse(reused=True)
+        return posts
+
+    posts = parse()
+    run_metrics.record_parse(reused=False)
+    try:
+        cache.put(scraper, page, key, posts)
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logging.warning(f"Could not store parse of {page}: {e}")
+    return posts
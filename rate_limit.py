@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import run_metrics
+
+# ---------------------------------------------------------------------------
+# Per-host politeness limiter
+#
+# Each host gets a token bucket refilled at ``rate`` requests per second and
+# holding at most ``burst`` tokens. Taking a token never blocks inside the
+# bucket: reserve() books the next free slot and returns how long the caller
+# has to wait for it. Blocking callers sleep that long; the fetch engine
+# awaits it on its event loop instead, so a throttled host holds no worker
+# thread and requests to other hosts keep flowing in the meantime.
+#
+# The limiter is shared by every scraper thread in a process. Worker
+# processes get their own copy, which is fine as long as a site (and so a
+# host) is only ever scraped by one process at a time.
+# ---------------------------------------------------------------------------
+
+
+class TokenBucket:
+    """Reservation-based token bucket; thread-safe."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds until it may be used."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative books a future slot; later callers queue behind it
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """One TokenBucket per host, with optional per-host rate overrides."""
+
+    def __init__(self, rate: float = 1.0, burst: int = 2, overrides: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            rate: Requests per second allowed to any one host; 0 disables limiting.
+            burst: Requests a host may receive back to back after a quiet spell.
+            overrides: Host -> requests per second, for brokers that need a
+                gentler (or allow a faster) pace than ``rate``.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.overrides = {h.lower(): r for h, r in (overrides or {}).items()}
+        self._init_runtime()
+
+    def _init_runtime(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    # Limiters travel inside scraper configs to worker processes, which
+    # start with full buckets of their own.
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"rate": self.rate, "burst": self.burst, "overrides": self.overrides}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.overrides.get(host, self.rate), self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def reserve(self, url: str) -> float:
+        """Book the next request to ``url``'s host; returns the wait before sending it."""
+        delay = self._bucket(url).reserve()
+        if delay:
+            run_metrics.record_throttle(delay)
+        return delay
+
+    def wait(self, url: str) -> None:
+        """Block the calling thread until a request to ``url``'s host is allowed."""
+        delay = self.reserve(url)
+        if delay:
+            time.sleep(delay)
+
+    async def await_turn(self, url: str) -> None:
+        """Like ``wait`` but yields to the event loop instead of blocking a thread."""
+        delay = self.reserve(url)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def throttle(config: Dict[str, Any], url: str) -> None:
+    """
+    Wait for the politeness limiter before a request the fetch engine does not make.
+
+    Selenium scrapers call this before every ``driver.get``. Without a
+    ``config["rate_limiter"]`` (standalone runs) it returns immediately.
+    """
+    limiter: Optional[RateLimiter] = config.get("rate_limiter")
+    if limiter is not None and url:
+        limiter.wait(url)
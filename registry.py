@@ -0,0 +1,160 @@
+import importlib.util
+import logging
+import os
+import re
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import run_metrics
+
+# ---------------------------------------------------------------------------
+# Scraper registry
+#
+# Maps each sitelist "Site Name" to the file holding its scraper, the entry
+# point to call and the engine it needs. Nothing here imports a scraper:
+# modules (and with them selenium, webdriver_manager, bs4) are loaded only
+# when a site that needs them actually runs.
+# ---------------------------------------------------------------------------
+
+SCRAPER_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrapers"),
+    os.path.dirname(os.path.abspath(__file__)),
+]
+
+
+class ScraperSpec(NamedTuple):
+    module_file: str
+    engine: str = "http"          # "http", "selenium" or "local" (parses saved HTML)
+    entry_point: str = "scrape"
+    aliases: Tuple[str, ...] = ()
+    # Requests per second to the site's host; 0 leaves it unpaced. Set for the
+    # brokers whose scrapers used to sleep between requests, at that old pace.
+    rate: float = 0.0
+
+
+SCRAPERS: Dict[str, ScraperSpec] = {
+    "Atlantic Business Brokerage": ScraperSpec("atlantic_business_brokerage.py"),
+    "BC Business Brokers": ScraperSpec("BC_Business_Brokers.py", "selenium"),
+    "Benjamin Ross Group": ScraperSpec("benjamin_ross_group.py"),
+    "Best Business Brokers": ScraperSpec("Best_Business_Brokers.py", aliases=("B3 Brokers",), rate=0.5),
+    "BIR Business Brokers": ScraperSpec("BIR_Business_Brokers.py", "selenium", rate=0.5),
+    "BottomLine Business Brokers": ScraperSpec("BottomLine_Business_Brokers.py", "selenium"),
+    "Coast Business Brokerage": ScraperSpec("Coast_Busines_ Brokerage.py"),
+    "Empire Business Associates": ScraperSpec("Empire_Business_Associates.py"),
+    "Exit Consulting Group": ScraperSpec("Exit_Consulting_Group.py", "selenium", rate=0.5),
+    "First Street Business Brokers": ScraperSpec("First Street Business Brokers.py", "selenium", rate=1 / 3),
+    "Front Range Business": ScraperSpec("Front_Range_Business.py"),
+    "Golden Gate Business Advisors": ScraperSpec("Golden_Gate_Business_Advisors.py", "local"),
+    "Harvest Business Advisors": ScraperSpec("Harvest_Business_Advisors.py", "selenium"),
+    "Keystone Business Brokers": ScraperSpec("KeysTone_Bussiness_Brokers.py"),
+    "National Mergers and Acquisition Group": ScraperSpec("National_Mergers_and_Acquisition_Group.py", "selenium",
+                                                          aliases=("National M&A Group",), rate=1.0),
+    "Ontario Commercial Group": ScraperSpec("Ontario_Commercial_Group.py"),
+    "Phil Reese CBI": ScraperSpec("Phil_Reese_CBI.py"),
+    "Sigma Mergers Acquisitions": ScraperSpec("Sigma_Mergers_Acquisitions.py", "local",
+                                              aliases=("Sigma Mergers & Acquisitions",)),
+    "Southern Mergers & Acquisitions": ScraperSpec("Southern_Mergers & Acquisitions.py", "local"),
+    "TREP Advisors": ScraperSpec("TREP_Advisors.py"),
+    "The Saleh Group": ScraperSpec("The _Saleh_Group.py", "selenium", rate=1.0),
+}
+
+
+def _normalize(name: str) -> str:
+    """Case, spacing, underscores and punctuation insensitive key."""
+    return re.sub(r"[^0-9a-z]+", "", str(name).lower().replace("&", "and"))
+
+
+def _build_lookup() -> Dict[str, str]:
+    lookup: Dict[str, str] = {}
+    for site_name, spec in SCRAPERS.items():
+        for name in (site_name, os.path.splitext(spec.module_file)[0]) + spec.aliases:
+            lookup[_normalize(name)] = site_name
+    return lookup
+
+
+_LOOKUP = _build_lookup()
+_modules: Dict[str, Any] = {}
+_import_lock = threading.Lock()
+
+
+def find(site_name: str) -> Optional[ScraperSpec]:
+    """The ScraperSpec registered for ``site_name``, or None."""
+    key = _LOOKUP.get(_normalize(site_name))
+    return SCRAPERS[key] if key else None
+
+
+def engine(site_name: str) -> Optional[str]:
+    spec = find(site_name)
+    return spec.engine if spec else None
+
+
+def host_rates(sites: Iterable[Tuple[str, Iterable[str]]]) -> Dict[str, float]:
+    """
+    Host -> requests per second for the paced sites among ``sites``.
+
+    Args:
+        sites: (site name, URLs the site is fetched from) pairs, such as a
+            sitelist row's listing and base URL.
+    """
+    rates: Dict[str, float] = {}
+    for site_name, urls in sites:
+        spec = find(site_name)
+        if spec is None or spec.rate <= 0:
+            continue
+        for url in urls:
+            host = urlsplit(str(url)).netloc.lower()
+            if host:
+                rates[host] = min(rates.get(host, spec.rate), spec.rate)
+    return rates
+
+
+def _module_path(module_file: str) -> Optional[str]:
+    for directory in SCRAPER_DIRS:
+        path = os.path.join(directory, module_file)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_scraper(site_name: str) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """
+    Import the scraper registered for ``site_name`` and return its entry point.
+
+    File names need not be valid module names ("The _Saleh_Group.py"), so
+    modules are loaded from their path. Returns None (and logs why) when the
+    site is unknown or its module cannot be loaded.
+    """
+    spec = find(site_name)
+    if spec is None:
+        logging.error(f"No scraper registered for {site_name}")
+        return None
+    path = _module_path(spec.module_file)
+    if path is None:
+        logging.error(f"{spec.module_file} not found for {site_name}")
+        return None
+
+    with _import_lock:
+        module = _modules.get(path)
+        if module is None:
+            module_name = "scraper_" + re.sub(r"\W+", "_", os.path.splitext(spec.module_file)[0]).strip("_").lower()
+            module_spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(module_spec)
+            sys.modules[module_name] = module
+            try:
+                module_spec.loader.exec_module(module)
+            except Exception as e:
+                del sys.modules[module_name]
+                logging.error(f"Failed to import {spec.module_file} for {site_name}: {e}")
+                return None
+            # scrape() looks get_list_links up at call time, so wrapping the
+            # module attribute is enough to time collection separately from build
+            if callable(getattr(module, "get_list_links", None)):
+                module.get_list_links = run_metrics.timed_collection(module.get_list_links)
+            _modules[path] = module
+
+    entry = getattr(module, spec.entry_point, None)
+    if entry is None:
+        logging.error(f"{spec.module_file} has no {spec.entry_point}() for {site_name}")
+    return entry
@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from worker_pool import to_columnar, from_columnar
+
+# ---------------------------------------------------------------------------
+# Run journal
+#
+# One JSON line per finished site, appended and fsynced the moment the site
+# completes, so a crash at site 18 loses only site 18. A later invocation of
+# the same monthly run reads the journal back to skip (--resume) or reuse
+# (--reuse-ttl) sites that already finished.
+# ---------------------------------------------------------------------------
+
+COMPLETED_STATUSES = ("success", "no_new_listings")
+
+
+class RunJournal:
+    """Append-only journal of site outcomes for one monthly run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves at most one torn line
+                    logging.warning(f"Ignoring unreadable line {line_no} in {self.path}")
+                    continue
+                self.entries[entry["site"]] = entry
+        logging.info(f"Loaded {len(self.entries)} site results from {self.path}")
+
+    def record(self, site_name: str, status: str, count: Any, listings: Optional[pd.DataFrame]) -> None:
+        """Durably append one site's outcome."""
+        entry = {
+            "site": site_name,
+            "status": status,
+            "count": count,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "listings": to_columnar(listings),
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[site_name] = entry
+
+    def reusable(self, site_name: str, resume: bool, ttl_hours: float,
+                 now: Optional[datetime] = None) -> Optional[Tuple[str, Any, Optional[pd.DataFrame]]]:
+        """
+        A previous (status, count, listings) for ``site_name`` that may stand in
+        for scraping it again, or None.
+
+        With ``resume`` any completed result of this run qualifies; otherwise
+        only one that finished less than ``ttl_hours`` ago.
+        """
+        entry = self.entries.get(site_name)
+        if entry is None or entry["status"] not in COMPLETED_STATUSES:
+            return None
+        if not resume:
+            if ttl_hours <= 0:
+                return None
+            age = (now or datetime.now()) - datetime.fromisoformat(entry["finished_at"])
+            if age > timedelta(hours=ttl_hours):
+                return None
+        return entry["status"], entry["count"], from_columnar(entry["listings"])
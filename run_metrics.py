@@ -0,0 +1,364 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# ---------------------------------------------------------------------------
+# Per-site run metrics
+#
+# scrape_site() runs each scraper inside collecting(), which makes a
+# SiteMetrics the "current" one for that thread (and for fetches it hands to
+# the fetch engine). The fetch engine adds pages, bytes and request time;
+# registry wraps every scraper's get_list_links() so the time spent
+# collecting listings is split from the time spent building records.
+#
+# Stages, in seconds:
+#     fetch   -- blocking HTTP requests made through the fetch engine
+#     parse   -- CPU time of the site's thread while collecting listings
+#                (HTML parsing and regex work dominate it)
+#     render  -- the rest of the collection time on Selenium sites: page
+#                loads, script execution and waits in the browser (the
+#                waits alone are also reported as browser_wait_seconds)
+#     other   -- the same remainder on HTTP sites (sleeps, local file I/O)
+#     build   -- turning collected posts into the listings DataFrame
+# ---------------------------------------------------------------------------
+
+_current: contextvars.ContextVar[Optional["SiteMetrics"]] = contextvars.ContextVar("site_metrics", default=None)
+
+
+class SiteMetrics:
+    """Counters for one site's scrape."""
+
+    def __init__(self, site: str, engine: str = "http"):
+        self.site = site
+        self.engine = engine
+        self.status = ""
+        self.wall = 0.0
+        self.fetch = 0.0
+        self.collect = 0.0
+        self.collect_cpu = 0.0
+        self.build = 0.0
+        self.pages = 0
+        self.bytes = 0
+        self.fetch_errors = 0
+        self.retries = 0
+        self.retry_wait = 0.0
+        self.retries_exhausted = 0
+        self.throttled = 0
+        self.throttle_wait = 0.0
+        self.browser_waits = 0
+        self.browser_wait = 0.0
+        self.browser_bytes = 0
+        self.blocked_requests = 0
+        self.blocked_bytes = 0
+        self.blocked_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.pages_parsed = 0
+        self.parses_reused = 0
+        self.listings_found = 0
+        self.listings_skipped = 0
+        self.listings_new = 0
+        self.reused = False
+        self.collected_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_fetch(self, seconds: float, nbytes: int, ok: bool = True) -> None:
+        with self._lock:
+            self.fetch += seconds
+            self.pages += 1
+            self.bytes += nbytes
+            if not ok:
+                self.fetch_errors += 1
+
+    def add_retry(self, wait: float, gave_up: bool = False) -> None:
+        with self._lock:
+            if gave_up:
+                self.retries_exhausted += 1
+            else:
+                self.retries += 1
+                self.retry_wait += wait
+
+    def add_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def stages(self) -> Dict[str, float]:
+        parse = min(self.collect_cpu, self.collect)
+        # Concurrent fetches can add up to more than the collection wall time
+        fetch = min(self.fetch, max(0.0, self.collect - parse)) if self.collect else self.fetch
+        rest = max(0.0, self.collect - parse - fetch)
+        return {
+            "fetch": round(fetch, 3),
+            "render": round(rest if self.engine == "selenium" else 0.0, 3),
+            "parse": round(parse, 3),
+            "other": round(0.0 if self.engine == "selenium" else rest, 3),
+            "build": round(self.build, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        found = self.listings_found + self.listings_skipped
+        return {
+            "site": self.site,
+            "engine": self.engine,
+            "status": self.status,
+            "reused": self.reused,
+            "wall_seconds": round(self.wall, 3),
+            "stages": self.stages(),
+            "fetch_request_seconds": round(self.fetch, 3),
+            "pages_fetched": self.pages,
+            "fetch_errors": self.fetch_errors,
+            "retries": self.retries,
+            "retry_wait_seconds": round(self.retry_wait, 3),
+            "retries_exhausted": self.retries_exhausted,
+            "throttled": self.throttled,
+            "throttle_wait_seconds": round(self.throttle_wait, 3),
+            "browser_waits": self.browser_waits,
+            "browser_wait_seconds": round(self.browser_wait, 3),
+            "browser_bytes_downloaded": self.browser_bytes,
+            "browser_requests_blocked": self.blocked_requests,
+            "browser_bytes_saved_estimate": self.blocked_bytes,
+            "browser_seconds_saved_estimate": round(self.blocked_seconds, 3),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "pages_parsed": self.pages_parsed,
+            "parses_reused": self.parses_reused,
+            "bytes_downloaded": self.bytes,
+            "listings_found": found,
+            "listings_returned": self.listings_found,
+            "listings_new": self.listings_new,
+            "seconds_per_listing": round(self.wall / found, 3) if found else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SiteMetrics":
+        """Rebuild the raw counters a worker process sent back with ``raw()``."""
+        metrics = cls(data["site"], data.get("engine", "http"))
+        for key, value in data.items():
+            if key not in ("site", "engine"):
+                setattr(metrics, key, value)
+        return metrics
+
+    def raw(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
+
+
+def current() -> Optional[SiteMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def collecting(metrics: SiteMetrics) -> Iterator[SiteMetrics]:
+    """Make ``metrics`` current for the scrape running in this block and time it."""
+    token = _current.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.wall += time.perf_counter() - started
+        _current.reset(token)
+
+
+def timed_collection(get_list_links: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a scraper's ``get_list_links`` so its wall and CPU time count as
+    collection and everything after it, up to the scraper's return, as build.
+    """
+    if getattr(get_list_links, "_run_metrics", False):
+        return get_list_links
+
+    @functools.wraps(get_list_links)
+    def wrapper(*args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return get_list_links(*args, **kwargs)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            return get_list_links(*args, **kwargs)
+        finally:
+            metrics.collect += time.perf_counter() - wall
+            metrics.collect_cpu += time.thread_time() - cpu
+            metrics.collected_at = time.perf_counter()
+
+    wrapper._run_metrics = True
+    return wrapper
+
+
+def record_fetch(seconds: float, nbytes: int, ok: bool = True) -> None:
+    """Called by the fetch engine after every request made for the current site."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_fetch(seconds, nbytes, ok)
+
+
+def record_retry(wait: float, gave_up: bool = False) -> None:
+    """Called by the HTTP client before each retry, and once when it gives up."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_retry(wait, gave_up)
+
+
+def record_throttle(wait: float) -> None:
+    """Called by the rate limiter whenever a request has to wait for its host's bucket."""
+    metrics = _current.get()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.throttled += 1
+            metrics.throttle_wait += wait
+
+
+def record_wait(seconds: float) -> None:
+    """Called by the Selenium wait helpers after every wait, met or timed out."""
+    metrics = _current.get()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.browser_waits += 1
+            metrics.browser_wait += seconds
+
+
+def record_browser_traffic(downloaded: int, blocked: int, blocked_bytes: int, blocked_seconds: float) -> None:
+    """Called by the browser pool when a site gives its browser back."""
+    metrics = _current.get()
+    if metrics is not None:
+        with metrics._lock:
+            metrics.browser_bytes += downloaded
+            metrics.blocked_requests += blocked
+            metrics.blocked_bytes += blocked_bytes
+            metrics.blocked_seconds += blocked_seconds
+
+
+def record_cache(hit: bool) -> None:
+    """Called by the HTTP cache for every GET it handles: a 304 served from disk is a hit."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_cache(hit)
+
+
+def record_parse(reused: bool) -> None:
+    """Called by the parse cache for every page: reused when its fingerprint matched."""
+    metrics = _current.get()
+    if metrics is not None:
+        with metrics._lock:
+            if reused:
+                metrics.parses_reused += 1
+            else:
+                metrics.pages_parsed += 1
+
+
+def record_skipped(count: int) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.listings_skipped += count
+
+
+def finish_scrape(metrics: SiteMetrics, returned: int) -> None:
+    """Close the build stage once the scraper has returned ``returned`` listings."""
+    if metrics.collected_at is not None:
+        metrics.build += time.perf_counter() - metrics.collected_at
+        metrics.collected_at = None
+    metrics.listings_found = returned
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+def build_report(sites: List[SiteMetrics], started: datetime, finished: datetime) -> Dict[str, Any]:
+    rows = [m.to_dict() for m in sites]
+    ranked = sorted((r for r in rows if r["seconds_per_listing"] is not None),
+                    key=lambda r: r["seconds_per_listing"], reverse=True)
+    totals = {
+        "wall_seconds": round((finished - started).total_seconds(), 3),
+        "pages_fetched": sum(r["pages_fetched"] for r in rows),
+        "bytes_downloaded": sum(r["bytes_downloaded"] for r in rows),
+        "listings_found": sum(r["listings_found"] for r in rows),
+        "listings_new": sum(r["listings_new"] for r in rows),
+        "cache_hits": sum(r["cache_hits"] for r in rows),
+        "cache_misses": sum(r["cache_misses"] for r in rows),
+    }
+    return {
+        "started_at": started.isoformat(timespec="seconds"),
+        "finished_at": finished.isoformat(timespec="seconds"),
+        "totals": totals,
+        "sites": rows,
+        "slowest_per_listing": [r["site"] for r in ranked],
+    }
+
+
+def write_json(report: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logging.info(f"Run metrics written to {path}")
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def prometheus_text(report: Dict[str, Any]) -> str:
+    """The report in the Prometheus text exposition format, one gauge per figure."""
+    gauges = [
+        ("scraper_site_wall_seconds", "Wall time of the site's scrape.", lambda r: r["wall_seconds"]),
+        ("scraper_site_pages_fetched", "HTTP pages fetched through the fetch engine.", lambda r: r["pages_fetched"]),
+        ("scraper_site_bytes_downloaded", "Response bytes downloaded.", lambda r: r["bytes_downloaded"]),
+        ("scraper_site_http_cache_hits", "GETs answered from the HTTP cache after a 304.", lambda r: r["cache_hits"]),
+        ("scraper_site_http_cache_misses", "GETs that downloaded a body.", lambda r: r["cache_misses"]),
+        ("scraper_site_parses_reused", "Pages whose fingerprint matched, so their stored posts were reused.",
+         lambda r: r["parses_reused"]),
+        ("scraper_site_http_retries", "HTTP requests retried after a transient failure.", lambda r: r["retries"]),
+        ("scraper_site_http_retries_exhausted", "HTTP requests that failed after every retry.",
+         lambda r: r["retries_exhausted"]),
+        ("scraper_site_throttle_wait_seconds", "Time requests waited on the per-host rate limit.",
+         lambda r: r["throttle_wait_seconds"]),
+        ("scraper_site_browser_wait_seconds", "Time Selenium scrapers spent waiting for pages to react.",
+         lambda r: r["browser_wait_seconds"]),
+        ("scraper_site_browser_bytes_downloaded", "Bytes the browser downloaded.",
+         lambda r: r["browser_bytes_downloaded"]),
+        ("scraper_site_browser_bytes_saved_estimate", "Estimated bytes not downloaded thanks to resource blocking.",
+         lambda r: r["browser_bytes_saved_estimate"]),
+        ("scraper_site_browser_seconds_saved_estimate", "Estimated download time saved by resource blocking.",
+         lambda r: r["browser_seconds_saved_estimate"]),
+        ("scraper_site_listings_found", "Listings seen on the site.", lambda r: r["listings_found"]),
+        ("scraper_site_listings_new", "Listings not yet in the master db.", lambda r: r["listings_new"]),
+        ("scraper_site_seconds_per_listing", "Wall seconds per listing found.", lambda r: r["seconds_per_listing"]),
+    ]
+    lines = []
+    lines.append("# HELP scraper_site_stage_seconds Time spent per scrape stage.")
+    lines.append("# TYPE scraper_site_stage_seconds gauge")
+    for row in report["sites"]:
+        for stage, seconds in row["stages"].items():
+            lines.append(f'scraper_site_stage_seconds{{site="{_label(row["site"])}",stage="{stage}"}} {seconds}')
+    for name, help_text, value in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for row in report["sites"]:
+            v = value(row)
+            if v is not None:
+                lines.append(f'{name}{{site="{_label(row["site"])}",status="{_label(row["status"])}"}} {v}')
+    lines.append("# HELP scraper_run_wall_seconds Wall time of the whole run.")
+    lines.append("# TYPE scraper_run_wall_seconds gauge")
+    lines.append(f"scraper_run_wall_seconds {report['totals']['wall_seconds']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(report: Dict[str, Any], path: str) -> None:
+    """Write atomically, so a textfile collector never reads half a file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(report))
+    os.replace(tmp_path, path)
+    logging.info(f"Prometheus metrics written to {path}")
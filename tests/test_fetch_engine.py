@@ -0,0 +1,146 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fetch_engine  # noqa: E402
+from fetch_engine import FetchEngine  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+
+# ---------------------------------------------------------------------------
+# FetchEngine against a real HTTP server on 127.0.0.1
+#
+# The server answers "/page?n=3&delay=0.2" with the body "page 3" after
+# sleeping ``delay`` seconds, and counts how many requests it is serving
+# at once, so the tests see the engine from the wire's side.
+# ---------------------------------------------------------------------------
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlsplit(self.path).query)
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        try:
+            time.sleep(float(query.get("delay", ["0"])[0]))
+            body = f"page {query.get('n', ['0'])[0]}".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on a request the test made it time out on
+            pass
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchEngineTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.lock = threading.Lock()
+        cls.server.in_flight = 0
+        cls.server.peak = 0
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        host, port = cls.server.server_address[:2]
+        cls.base = f"http://{host}:{port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        # Let requests a previous test timed out on finish before counting again
+        for _ in range(50):
+            with self.server.lock:
+                if not self.server.in_flight:
+                    break
+            time.sleep(0.1)
+        with self.server.lock:
+            self.server.peak = 0
+        # No retries: a timed-out request should fail once, not back off and retry
+        self.engine = FetchEngine(transport=HttpClient(retries=0), per_host=2, timeout=5.0)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def url(self, n, delay=0.0):
+        return f"{self.base}/page?n={n}&delay={delay}"
+
+    def test_per_host_cap(self):
+        results = self.engine.get_all([self.url(n, 0.15) for n in range(8)])
+        self.assertTrue(all(isinstance(r, requests.Response) for r in results))
+        self.assertEqual(self.server.peak, 2)
+
+    def test_results_in_input_order(self):
+        # Later URLs answer sooner, so completion order is the reverse of input order
+        self.engine.per_host = 4
+        urls = [self.url(n, 0.05 * (4 - n)) for n in range(4)]
+        results = self.engine.get_all(urls)
+        self.assertEqual([r.text for r in results], [f"page {n}" for n in range(4)])
+
+    def test_read_timeout_is_returned_in_place(self):
+        results = self.engine.get_all([self.url(0), self.url(1, 2.0), self.url(2)], timeout=0.3)
+        self.assertEqual(results[0].text, "page 0")
+        self.assertIsInstance(results[1], requests.Timeout)
+        self.assertEqual(results[2].text, "page 2")
+
+    def test_deadline_is_returned_in_place(self):
+        self.engine.deadline = 0.3
+        results = self.engine.get_all([self.url(0), self.url(1, 1.0)])
+        self.assertEqual(results[0].text, "page 0")
+        # The transport's own timeout is capped at the deadline, so either may fire first
+        self.assertIsInstance(results[1], (asyncio.TimeoutError, requests.Timeout))
+
+    def test_deadline_starts_once_sent(self):
+        # Six 0.2 s pages through one slot: the last waits 1 s in the queue,
+        # well past a 0.5 s deadline, but only its 0.2 s on the wire counts
+        self.engine.per_host = 1
+        self.engine.deadline = 0.5
+        results = self.engine.get_all([self.url(n, 0.2) for n in range(6)])
+        self.assertEqual([r.text for r in results], [f"page {n}" for n in range(6)])
+        self.assertEqual(self.server.peak, 1)
+
+    def test_fetch_all_uses_the_config_engine(self):
+        config = {"fetch_engine": self.engine, "headers": {"User-Agent": "test"}}
+        results = fetch_engine.fetch_all(config, [self.url(n) for n in range(3)])
+        self.assertEqual([r.text for r in results], ["page 0", "page 1", "page 2"])
+        self.assertEqual(fetch_engine.fetch(config, self.url(7)).text, "page 7")
+
+    def test_fan_out_keeps_order_and_exceptions(self):
+        config = {"fetch_engine": self.engine}
+
+        def work(n):
+            if n == 1:
+                raise ValueError("bad item")
+            return fetch_engine.fetch(config, self.url(n, 0.05)).text
+
+        results = fetch_engine.fan_out(config, work, [0, 1, 2, 3])
+        self.assertEqual(results[0], "page 0")
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2:], ["page 2", "page 3"])
+        self.assertLessEqual(self.server.peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_scrapers  # noqa: E402
+from benchmarks.fixtures import FIXTURE_ROOT, StandInServer, load_corpus  # noqa: E402
+
+# ---------------------------------------------------------------------------
+# Replay every scraper that has a fixture
+#
+# Two corpora:
+#
+#     benchmarks/fixtures/  pages captured from the live sites with
+#                           ``bench_scrapers --capture``; the benchmark's
+#                           numbers and the parser differential come from
+#                           these. Every HTTP scraper must have one.
+#     tests/fixtures/       a few small hand-built pages that keep the
+#                           replay machinery (transports, stand-in server,
+#                           local inputs, pagination) covered offline.
+#                           They only match the scrapers' own selectors and
+#                           say nothing about performance or real markup.
+#
+# Each fixture is replayed from disk and through the stand-in server and
+# must return the listing count stored in its manifest without asking for
+# a page the fixture lacks.
+# ---------------------------------------------------------------------------
+
+SMOKE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class _Replay:
+    root = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.corpus = load_corpus(cls.root)
+        if not cls.corpus:
+            raise unittest.SkipTest(f"No fixtures under {cls.root}; record them with bench_scrapers --capture")
+        # Some local-file scrapers write their CSV to the working directory
+        cls._cwd = os.getcwd()
+        cls._tmp = tempfile.TemporaryDirectory()
+        os.chdir(cls._tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls._cwd)
+        cls._tmp.cleanup()
+
+    def test_replay_from_disk(self):
+        for site, fixture in self.corpus.items():
+            with self.subTest(site=site):
+                result = bench_scrapers.bench_site(fixture, repeat=1, server_url=None, per_host=4)
+                self.assertNotIn("skipped", result)
+                self.assertEqual(result["listings"], fixture.manifest["listings"])
+                self.assertEqual(result["missing_pages"], 0)
+
+    def test_replay_through_stand_in_server(self):
+        http_sites = {site: f for site, f in self.corpus.items() if f.manifest["pages"]}
+        with StandInServer(self.root) as server:
+            for site, fixture in http_sites.items():
+                with self.subTest(site=site):
+                    result = bench_scrapers.bench_site(fixture, repeat=1, server_url=server.url, per_host=4)
+                    self.assertEqual(result["listings"], fixture.manifest["listings"])
+                    self.assertEqual(result["missing_pages"], 0)
+
+    def test_parsers_agree(self):
+        backends = bench_scrapers.html_parser.available_backends()
+        for site, fixture in self.corpus.items():
+            with self.subTest(site=site):
+                result = bench_scrapers.parser_diff_site(fixture, backends)
+                self.assertEqual(result["differences"], {})
+
+
+class CapturedReplayTest(_Replay, unittest.TestCase):
+    root = FIXTURE_ROOT
+
+    def test_every_http_scraper_is_captured(self):
+        wanted = {site for site, spec in bench_scrapers.registry.SCRAPERS.items()
+                  if spec.engine == "http" or site in bench_scrapers.HTTP_PATHS}
+        self.assertEqual(sorted(wanted - set(self.corpus)), [])
+
+
+class SmokeReplayTest(_Replay, unittest.TestCase):
+    root = SMOKE_ROOT
+
+    def test_records(self):
+        fixture = self.corpus["Best Business Brokers"]
+        scraper = bench_scrapers.registry.load_scraper(fixture.site)
+        records = bench_scrapers._records(fixture, scraper, "html.parser")
+        first = records[0]
+        self.assertEqual(first["Listing ID"], "B3-2201")
+        self.assertEqual(first["Link to Deal"], "https://b3brokers.com/listing/auto-repair-shop/")
+        self.assertEqual(first["Asking Price"], "$725,000")
+        self.assertEqual(records[-1]["Status"], "Sold")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cassette import make_response  # noqa: E402
+from http_cache import HttpCache  # noqa: E402
+
+# ---------------------------------------------------------------------------
+# HttpCache over a scripted transport
+#
+# Each GET pops the next (status, body, headers) off ``replies`` and records
+# the request headers it was sent, so the tests see which validators the
+# cache attached and what it kept on disk.
+# ---------------------------------------------------------------------------
+
+URL = "https://example.com/listings/"
+
+
+class _Transport:
+
+    def __init__(self):
+        self.replies = []
+        self.sent = []
+
+    def __call__(self, url, headers=None, timeout=None, **kwargs):
+        self.sent.append(dict(headers or {}))
+        status, body, headers = self.replies.pop(0)
+        return make_response(url, body, status, "utf-8", headers)
+
+
+class HttpCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.transport = _Transport()
+        self.cache = HttpCache(self._tmp.name, self.transport)
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def test_304_is_answered_from_the_stored_body(self):
+        self.transport.replies = [(200, b"v1", {"ETag": '"a"'}), (304, b"", {})]
+        self.cache(URL)
+        response = self.cache(URL)
+        self.assertEqual(self.transport.sent[1]["If-None-Match"], '"a"')
+        self.assertEqual(response.content, b"v1")
+        self.assertTrue(response.from_cache)
+
+    def test_200_without_validators_drops_the_stored_entry(self):
+        self.transport.replies = [(200, b"v1", {"ETag": '"a"'}), (200, b"v2", {}), (200, b"v3", {})]
+        self.cache(URL)
+        body = self.cache._body_path(URL)
+        self.assertTrue(os.path.exists(body))
+
+        self.assertEqual(self.cache(URL).content, b"v2")
+        self.assertIsNone(self.cache._lookup(URL))
+        self.assertFalse(os.path.exists(body))
+        self.assertEqual(self.cache._total, 0)
+
+        # Nothing left to revalidate against
+        self.cache(URL)
+        self.assertNotIn("If-None-Match", self.transport.sent[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
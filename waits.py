@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import run_metrics
+
+# ---------------------------------------------------------------------------
+# Event-driven waits for the Selenium scrapers
+#
+# Each wait returns as soon as the page shows what the scraper is waiting
+# for -- more cards, a taller page, a quiet network -- instead of sleeping
+# a fixed worst case. A wait that times out returns False and the scraper
+# carries on, exactly as it did after its old sleep.
+#
+# Timeouts adapt: with ``config["wait_times"]`` set, every wait records how
+# long it took, per site and wait name, and the next run's timeout becomes a
+# multiple of the slowest recent time (bounded by the caller's timeout).
+# Time spent waiting is added to the site's run metrics.
+# ---------------------------------------------------------------------------
+
+Locator = Tuple[str, str]
+
+POLL = 0.1
+SAMPLES_KEPT = 20
+HEADROOM = 3.0
+MIN_TIMEOUT = 2.0
+
+
+class WaitTimes:
+    """Recent durations of each (site, wait) pair, kept between runs in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._samples = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable wait times {path}: {e}")
+
+    def timeout(self, key: str, ceiling: float) -> float:
+        with self._lock:
+            samples = self._samples.get(key)
+        if not samples or len(samples) < 3:
+            return ceiling
+        return min(ceiling, max(MIN_TIMEOUT, HEADROOM * max(samples)))
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(key, [])
+            samples.append(round(seconds, 3))
+            del samples[:-SAMPLES_KEPT]
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self._samples, indent=1, sort_keys=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+def _until(config: Dict[str, Any], driver, name: str, timeout: float, condition: Callable[[Any], Any],
+           floor: float = 0.0, timeout_expected: bool = False) -> Any:
+    """
+    Poll ``condition`` until truthy; returns its value, or None on timeout.
+
+    ``floor`` keeps the adaptive timeout from dropping below it. With
+    ``timeout_expected`` a timeout is a normal answer (the end of a list),
+    so it is not recorded as a slow sample.
+    """
+    stats: Optional[WaitTimes] = config.get("wait_times")
+    key = f"{urlsplit(config.get('listing_url', '')).netloc}:{name}"
+    limit = stats.timeout(key, timeout) if stats is not None else timeout
+    limit = min(timeout, max(floor, limit))
+    started = time.perf_counter()
+    try:
+        value = WebDriverWait(driver, limit, poll_frequency=POLL,
+                              ignored_exceptions=(WebDriverException,)).until(condition)
+    except TimeoutException:
+        value = None
+        logging.debug(f"Wait '{name}' gave up after {limit:.1f}s")
+    waited = time.perf_counter() - started
+    run_metrics.record_wait(waited)
+    if stats is not None and (value is not None or not timeout_expected):
+        # A timeout counts as the full ceiling, so the next run waits longer
+        stats.observe(key, waited if value is not None else timeout)
+    return value
+
+
+def present(config: Dict[str, Any], driver, locator: Locator, name: str = "present",
+            timeout: float = 15.0) -> bool:
+    """Wait until at least one element matches ``locator``."""
+    return _until(config, driver, name, timeout, lambda d: len(d.find_elements(*locator)) > 0) is not None
+
+
+def stale(config: Dict[str, Any], driver, element, name: str = "navigate", timeout: float = 15.0) -> bool:
+    """Wait until ``element`` has left the DOM, i.e. the page it was on was replaced."""
+    return _until(config, driver, name, timeout, EC.staleness_of(element)) is not None
+
+
+def count_increase(config: Dict[str, Any], driver, locator: Locator, previous: int, name: str = "more",
+                   timeout: float = 15.0) -> int:
+    """Wait until more than ``previous`` elements match ``locator``; returns the count."""
+    def grown(d):
+        count = len(d.find_elements(*locator))
+        return count if count > previous else False
+    count = _until(config, driver, name, timeout, grown)
+    return count if count is not None else len(driver.find_elements(*locator))
+
+
+def network_idle(config: Dict[str, Any], driver, idle: float = 0.5, name: str = "load",
+                 timeout: float = 20.0) -> bool:
+    """
+    Wait until the document has loaded and no new resource has finished for
+    ``idle`` seconds (resource timing entries are the browser's own log of
+    completed requests, XHR and fetch included).
+    """
+    state = {"count": -1, "since": time.perf_counter()}
+
+    def quiet(d):
+        ready, count = d.execute_script(
+            "return [document.readyState, performance.getEntriesByType('resource').length];")
+        now = time.perf_counter()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        return ready == "complete" and now - state["since"] >= idle
+    return _until(config, driver, name, timeout, quiet) is not None
+
+
+def scroll_grew(config: Dict[str, Any], driver, locator: Optional[Locator] = None, name: str = "scroll",
+                timeout: float = 15.0, floor: float = 3.0) -> bool:
+    """
+    Scroll to the bottom and wait until lazily loaded content arrives: more
+    elements match ``locator``, or (without one) the page gets taller.
+
+    A quiet DOM is not proof of the end of the list -- the next batch may
+    still be in flight -- so only growth counts. Returns False when nothing
+    grew within the adaptive timeout, which never drops below ``floor``
+    (the 3 s the scrapers used to sleep per scroll).
+    """
+    def size(d):
+        if locator is not None:
+            return len(d.find_elements(*locator))
+        return d.execute_script("return document.body.scrollHeight;")
+
+    before = size(driver)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    return _until(config, driver, name, timeout, lambda d: size(d) > before,
+                  floor=floor, timeout_expected=True) is not None
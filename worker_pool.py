@@ -0,0 +1,153 @@
+import logging
+import multiprocessing
+import os
+import queue
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# ---------------------------------------------------------------------------
+# Process pool that recycles its workers
+#
+# Every task runs in a child process. A worker retires after
+# ``max_tasks_per_worker`` tasks or once its resident memory passes
+# ``max_rss_mb``, and the pool starts a fresh one while work is left, so
+# parser garbage from one site never accumulates across a whole sitelist.
+# ---------------------------------------------------------------------------
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux; the best we have elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def to_columnar(df: Optional[pd.DataFrame]) -> Optional[Dict[str, List[Any]]]:
+    """Turn a DataFrame into plain column lists that pickle small and fast."""
+    if df is None:
+        return None
+    columns = [str(c) for c in df.columns]
+    return {"columns": columns, "data": [df[c].tolist() for c in df.columns]}
+
+
+def from_columnar(payload: Optional[Dict[str, List[Any]]]) -> Optional[pd.DataFrame]:
+    """Rebuild the DataFrame produced by ``to_columnar``."""
+    if payload is None:
+        return None
+    columns = payload["columns"]
+    return pd.DataFrame(dict(zip(columns, payload["data"])), columns=columns)
+
+
+def _worker_loop(func, tasks, results, max_tasks: Optional[int], max_rss: Optional[float]) -> None:
+    pid = os.getpid()
+    done = 0
+    while True:
+        item = tasks.get()
+        if item is None:
+            return
+        task_id, args = item
+        try:
+            ok, value = True, func(*args)
+        except BaseException as e:
+            ok, value = False, repr(e)
+        done += 1
+        retiring = bool(max_tasks and done >= max_tasks)
+        if not retiring and max_rss and rss_mb() > max_rss:
+            logging.info("Worker %d at %.0f MiB after %d tasks, retiring", pid, rss_mb(), done)
+            retiring = True
+        results.put((task_id, pid, ok, value, retiring))
+        if retiring:
+            return
+
+
+class RecyclingPool:
+    """Run callables in child processes that are replaced as they wear out."""
+
+    def __init__(self, processes: int, max_tasks_per_worker: Optional[int] = None,
+                 max_rss_mb: Optional[float] = None):
+        self.processes = max(1, processes)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_rss_mb = max_rss_mb
+
+    def run(self, func: Callable[..., Any], tasks: List[Tuple]) -> Iterator[Tuple[int, bool, Any]]:
+        """
+        Run ``func(*args)`` for every args tuple in ``tasks``.
+
+        Yields (task index, ok, value) in completion order. ``value`` is the
+        return value when ``ok`` is True and an error description otherwise;
+        a worker that dies mid-task reports its task as failed.
+        """
+        # spawn, not fork: the orchestrator may have browser threads running
+        ctx = multiprocessing.get_context("spawn")
+        result_q = ctx.Queue()
+        backlog = list(enumerate(tasks))
+        backlog.reverse()
+        # pid -> (process, its private task queue, task id it is running)
+        workers: Dict[int, Tuple[Any, Any, Optional[int]]] = {}
+        remaining = len(tasks)
+
+        def dispatch(pid: int) -> None:
+            proc, inbox, _ = workers[pid]
+            task_id, args = backlog.pop()
+            inbox.put((task_id, args))
+            workers[pid] = (proc, inbox, task_id)
+
+        def top_up() -> None:
+            idle = [pid for pid, (_, _, running) in workers.items() if running is None]
+            for pid in idle:
+                if not backlog:
+                    return
+                dispatch(pid)
+            while backlog and len(workers) < self.processes:
+                inbox = ctx.SimpleQueue()
+                proc = ctx.Process(
+                    target=_worker_loop,
+                    args=(func, inbox, result_q, self.max_tasks_per_worker, self.max_rss_mb),
+                    daemon=True,
+                )
+                proc.start()
+                workers[proc.pid] = (proc, inbox, None)
+                dispatch(proc.pid)
+
+        def retire(pid: int) -> None:
+            proc, _, _ = workers.pop(pid)
+            proc.join()
+
+        try:
+            top_up()
+            while remaining:
+                try:
+                    task_id, pid, ok, value, retiring = result_q.get(timeout=1.0)
+                except queue.Empty:
+                    for pid, (proc, _, running) in list(workers.items()):
+                        if proc.is_alive():
+                            continue
+                        retire(pid)
+                        if running is not None:
+                            remaining -= 1
+                            yield running, False, f"worker {pid} exited with code {proc.exitcode}"
+                    top_up()
+                    continue
+
+                if pid not in workers or workers[pid][2] != task_id:
+                    continue  # already reported as lost when its worker was reaped
+                remaining -= 1
+                proc, inbox, _ = workers[pid]
+                workers[pid] = (proc, inbox, None)
+                if retiring:
+                    retire(pid)
+                top_up()
+                yield task_id, ok, value
+        finally:
+            for proc, inbox, _ in workers.values():
+                inbox.put(None)
+            for proc, _, _ in workers.values():
+                proc.join(timeout=5)
+                if proc.is_alive():
+                    proc.terminate()